@@ -0,0 +1,431 @@
+"""
+Alpha-cut Inference
+===============================================================================
+
+A fuzzy set can be represented by its alpha-cuts, the sets of points where the
+membership is greater than or equal to a level alpha. This module represents
+each fuzzy set by the cuts at a fixed number of levels, where each cut is a
+union of disjoint intervals stored as an (n_intervals x 2) array. Memory and
+computation time depend on the number of levels and not on the size of the
+universe.
+
+"""
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+import numpy.typing as npt
+
+from fuzzy_expert.inference import DecompositionalInference
+
+AlphaCuts = List[np.ndarray]
+
+
+def levels(n_levels: int) -> np.ndarray:
+    """Returns the alpha levels of the cuts (midpoints of n_levels equal bands of [0, 1]).
+
+    >>> from fuzzy_expert.alphacut import levels
+    >>> levels(4)
+    array([0.125, 0.375, 0.625, 0.875])
+
+    """
+    return (np.arange(n_levels) + 0.5) / n_levels
+
+
+def _cut(x: np.ndarray, y: np.ndarray, alpha: float) -> np.ndarray:
+    """Returns the intervals where the piecewise linear function (x, y) is at least alpha."""
+
+    inside = y >= alpha
+
+    if not np.any(inside):
+        return np.empty((0, 2))
+
+    edges = np.diff(inside.astype(int))
+
+    i = np.nonzero(edges == 1)[0]
+    starts = x[i] + (alpha - y[i]) * (x[i + 1] - x[i]) / (y[i + 1] - y[i])
+    i = np.nonzero(edges == -1)[0]
+    ends = x[i] + (y[i] - alpha) * (x[i + 1] - x[i]) / (y[i] - y[i + 1])
+
+    if inside[0]:
+        starts = np.concatenate(([x[0]], starts))
+    if inside[-1]:
+        ends = np.concatenate((ends, [x[-1]]))
+
+    return np.stack((starts, ends), axis=1)
+
+
+def alpha_cuts(x: npt.ArrayLike, y: npt.ArrayLike, n_levels: int) -> AlphaCuts:
+    """Returns the alpha-cuts of a piecewise linear membership function.
+
+    :param x: Sorted points of the universe of discourse (or breakpoints).
+    :param y: Membership values at the points.
+    :param n_levels: Number of alpha levels.
+
+    >>> from fuzzy_expert.alphacut import alpha_cuts
+    >>> alpha_cuts([0, 2, 4], [0, 1, 0], n_levels=2)
+    [array([[0.5, 3.5]]), array([[1.5, 2.5]])]
+
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    return [_cut(x, y, alpha) for alpha in levels(n_levels)]
+
+
+def union(intervals: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Returns the union of two sets of intervals as disjoint sorted intervals.
+
+    >>> import numpy as np
+    >>> from fuzzy_expert.alphacut import union
+    >>> union(np.array([[0.0, 2.0], [5.0, 6.0]]), np.array([[1.0, 3.0]]))
+    array([[0., 3.],
+           [5., 6.]])
+
+    """
+    intervals = np.concatenate((intervals, other))
+
+    if len(intervals) == 0:
+        return intervals
+
+    intervals = intervals[np.argsort(intervals[:, 0], kind="stable")]
+    ends = np.maximum.accumulate(intervals[:, 1])
+    first = np.concatenate(([True], intervals[1:, 0] > ends[:-1]))
+    last = np.concatenate((first[1:], [True]))
+
+    return np.stack((intervals[first, 0], ends[last]), axis=1)
+
+
+def intersects(intervals: np.ndarray, other: np.ndarray) -> bool:
+    """Returns True if two sets of intervals have a common point."""
+    return bool(
+        np.any(
+            (intervals[:, np.newaxis, 0] <= other[np.newaxis, :, 1])
+            & (other[np.newaxis, :, 0] <= intervals[:, np.newaxis, 1])
+        )
+    )
+
+
+def defuzzificate(cuts: AlphaCuts, operator: str = "cog") -> float:
+    """Computes a representative crisp value of a fuzzy set from its alpha-cuts.
+
+    :param cuts: Alpha-cuts of the fuzzy set at the levels returned by `levels`.
+    :param operator: `"cog"`, `"boa"`, `"mom"`, `"lom"` or `"som"` (see `fuzzy_expert.operators.defuzzificate`).
+
+    The area and the moment of the fuzzy set are integrated over the levels (the
+    layer-cake representation); `"mom"`, `"lom"` and `"som"` use the highest
+    non-empty cut.
+
+    >>> from fuzzy_expert.alphacut import alpha_cuts, defuzzificate
+    >>> defuzzificate(alpha_cuts([0, 1, 4], [0, 1, 0], n_levels=8), "cog")
+    1.6640625
+
+    """
+    intervals = np.concatenate(cuts)
+
+    if operator == "cog":
+        lengths = intervals[:, 1] - intervals[:, 0]
+        moments = (intervals[:, 1] ** 2 - intervals[:, 0] ** 2) / 2
+        return float(np.sum(moments) / np.sum(lengths))
+
+    if operator == "boa":
+        #
+        # The area at the left of x is piecewise linear between the endpoints
+        #
+        points = np.unique(intervals)
+        areas = np.sum(
+            np.clip(
+                points[:, np.newaxis] - intervals[np.newaxis, :, 0],
+                0,
+                intervals[np.newaxis, :, 1] - intervals[np.newaxis, :, 0],
+            ),
+            axis=1,
+        )
+        return float(np.interp(areas[-1] / 2, areas, points))
+
+    top = [cut for cut in cuts if len(cut) > 0][-1]
+
+    if operator == "som":
+        return float(top[0, 0])
+
+    if operator == "lom":
+        return float(top[-1, 1])
+
+    if operator == "mom":
+        lengths = top[:, 1] - top[:, 0]
+        if np.sum(lengths) > 0:
+            return float(np.sum(lengths * np.mean(top, axis=1)) / np.sum(lengths))
+        return float(np.mean(top))
+
+    raise ValueError("Unknown defuzzification operator: {}".format(operator))
+
+
+class AlphaCutInference:
+    """Decompositional inference computed on the alpha-cuts of the fuzzy sets.
+
+    The parameters are the ones of `fuzzy_expert.inference.DecompositionalInference`,
+    restricted to the Mamdani configuration, where the composition of a fact with
+    a rule clips the consequence at the height of the intersection of the fact
+    and the premise:
+
+    :param and_operator: `"min"`.
+    :param or_operator: `"max"`.
+    :param implication_operator: `"Rc"`.
+    :param composition_operator: `"max-min"`.
+    :param production_link: `"max"`.
+    :param defuzzification_operator: `"cog"`, `"boa"`, `"mom"`, `"lom"` or `"som"`.
+    :param n_levels: Number of alpha levels.
+
+    Facts can be crisp values or lists of points `[(x, u), ...]`. The height of the
+    intersection of a fuzzy fact and a premise is the highest level where their
+    cuts intersect, and the aggregation of the rules is the union of the cuts at
+    each level. Heights are resolved to the levels, so the results approximate
+    `DecompositionalInference` with an error that decreases with `n_levels`;
+    `approximation_error` measures it. After each call, `aggregated_cuts` holds
+    the alpha-cuts of the output fuzzy sets. The cuts of the terms are kept
+    between calls until the variable changes (its `version` counter), so the
+    cost of a call does not depend on the size of the universe. Connectives
+    other than `"AND"` and `"OR"` raise `ValueError`.
+
+    >>> from fuzzy_expert.alphacut import AlphaCutInference
+    >>> from fuzzy_expert.rule import FuzzyRule
+    >>> from fuzzy_expert.variable import FuzzyVariable
+    >>> variables = {
+    ...     "x": FuzzyVariable(
+    ...         universe_range=(0, 10),
+    ...         terms={"Low": [(0, 1), (10, 0)], "High": [(0, 0), (10, 1)]},
+    ...     ),
+    ...     "y": FuzzyVariable(
+    ...         universe_range=(0, 10),
+    ...         terms={"Low": [(0, 1), (10, 0)], "High": [(0, 0), (10, 1)]},
+    ...     ),
+    ... }
+    >>> rules = [FuzzyRule(premise=[("x", "High")], consequence=[("y", "High")])]
+    >>> model = AlphaCutInference(
+    ...     and_operator="min",
+    ...     or_operator="max",
+    ...     implication_operator="Rc",
+    ...     composition_operator="max-min",
+    ...     production_link="max",
+    ...     defuzzification_operator="cog",
+    ...     n_levels=4,
+    ... )
+    >>> model(variables, rules, x=[(4, 0), (6, 1), (8, 0)])
+    ({'y': 6.541666666666667}, 1.0)
+    >>> [cut.round(6).tolist() for cut in model.aggregated_cuts["y"]]
+    [[[1.25, 10.0]], [[3.75, 10.0]], [[6.25, 10.0]], []]
+
+    """
+
+    def __init__(
+        self,
+        and_operator,
+        or_operator,
+        implication_operator,
+        composition_operator,
+        production_link,
+        defuzzification_operator,
+        n_levels=32,
+    ):
+        supported = {
+            "and_operator": (and_operator, "min"),
+            "or_operator": (or_operator, "max"),
+            "implication_operator": (implication_operator, "Rc"),
+            "composition_operator": (composition_operator, "max-min"),
+            "production_link": (production_link, "max"),
+        }
+        for name, (operator, expected) in supported.items():
+            if operator != expected:
+                raise ValueError(
+                    "Alpha-cut inference requires {}='{}'".format(name, expected)
+                )
+
+        self.and_operator = and_operator
+        self.or_operator = or_operator
+        self.implication_operator = implication_operator
+        self.composition_operator = composition_operator
+        self.production_link = production_link
+        self.defuzzification_operator = defuzzification_operator
+        self.n_levels = n_levels
+        self.levels = levels(n_levels)
+        self.term_cuts: dict = {}
+
+    def __call__(self, variables, rules, **input_values):
+
+        self.variables = variables
+        self.rules = list(rules)
+        self.input_values: dict = input_values
+
+        self._convert_inputs_to_facts()
+
+        self.aggregated_cuts: dict = {}
+        self.infered_cf = None
+
+        for rule in self.rules:
+
+            rule_cf = self._compute_rule_infered_cf(rule)
+
+            if self.infered_cf is None:
+                self.infered_cf = rule_cf
+            else:
+                self.infered_cf = max(self.infered_cf, rule_cf)
+
+            consequence = rule.parse_consequence()
+
+            for fuzzyvar, _, _ in consequence:
+                if fuzzyvar not in self.aggregated_cuts.keys():
+                    self.aggregated_cuts[fuzzyvar] = [
+                        np.empty((0, 2)) for _ in range(self.n_levels)
+                    ]
+
+            if rule_cf < rule.threshold_cf:
+                continue
+
+            n_cuts = self._compute_rule_height(rule)
+
+            for key in consequence:
+                cuts = self._get_term_cuts(key)
+                aggregated = self.aggregated_cuts[key[0]]
+                for i_level in range(n_cuts):
+                    aggregated[i_level] = union(aggregated[i_level], cuts[i_level])
+
+        self.defuzzificated_infered_memberships = {}
+
+        for fuzzyvar, cuts in self.aggregated_cuts.items():
+
+            if all(len(cut) == 0 for cut in cuts):
+                value = float(np.mean(self.variables[fuzzyvar].universe))
+            else:
+                value = defuzzificate(cuts, self.defuzzification_operator)
+
+            self.defuzzificated_infered_memberships[fuzzyvar] = value
+
+        return self.defuzzificated_infered_memberships, self.infered_cf
+
+    def _convert_inputs_to_facts(self):
+        """
+        Converts input values to facts. Fuzzy facts are converted to alpha-cuts.
+
+        """
+        self.fact_values: dict = {}
+        self.fact_cf: dict = {}
+
+        for key, input_value in self.input_values.items():
+            if isinstance(input_value, tuple):
+                value, cf = input_value
+            else:
+                value, cf = input_value, 1.0
+            if isinstance(value, list):
+                xp = [xp for xp, _ in value]
+                fp = [fp for _, fp in value]
+                value = alpha_cuts(xp, fp, self.n_levels)
+            self.fact_values[key] = value
+            self.fact_cf[key] = cf
+
+    def _compute_rule_infered_cf(self, rule) -> float:
+        """Computes the certainty factor inferred by the rule."""
+
+        aggregated_premise_cf = None
+
+        for connective, fuzzyvar, _, _ in rule.parse_premise():
+
+            premise_cf = self.fact_cf[fuzzyvar]
+
+            if connective is None:
+                aggregated_premise_cf = premise_cf
+            elif connective == "AND":
+                aggregated_premise_cf = min(aggregated_premise_cf, premise_cf)
+            elif connective == "OR":
+                aggregated_premise_cf = max(aggregated_premise_cf, premise_cf)
+            else:
+                raise ValueError(
+                    "Alpha-cut inference requires connectives 'AND' or 'OR', "
+                    "got '{}'".format(connective)
+                )
+
+        return aggregated_premise_cf * rule.rule_cf
+
+    def _get_term_cuts(self, key: tuple) -> AlphaCuts:
+        """Returns the alpha-cuts of the modified membership of a (variable, modifiers, term) proposition."""
+
+        fuzzyvar, modifiers, term = key
+        variable = self.variables[fuzzyvar]
+        stamp = (id(variable), variable.version)
+
+        if key not in self.term_cuts.keys() or self.term_cuts[key][0] != stamp:
+            membership = variable.get_modified_membeship(
+                term=term, modifiers=modifiers or None
+            )
+            self.term_cuts[key] = (
+                stamp,
+                alpha_cuts(variable.universe, membership, self.n_levels),
+            )
+        return self.term_cuts[key][1]
+
+    def _compute_premise_height(self, key: tuple) -> int:
+        """Returns the number of levels where the fact matches the premise proposition."""
+
+        fuzzyvar, modifiers, term = key
+        variable = self.variables[fuzzyvar]
+        value = self.fact_values[fuzzyvar]
+
+        if isinstance(value, list):
+            cuts = self._get_term_cuts(key)
+            return sum(
+                1
+                for fact_cut, term_cut in zip(value, cuts)
+                if intersects(fact_cut, term_cut)
+            )
+
+        if not variable.min_u <= value <= variable.max_u:
+            return 0
+
+        degree = variable.get_modified_membership_at(
+            term=term, value=value, modifiers=modifiers
+        )
+        return int(np.sum(self.levels <= degree))
+
+    def _compute_rule_height(self, rule) -> int:
+        """Returns the number of levels of the consequence kept by the rule."""
+
+        n_cuts = None
+
+        for connective, fuzzyvar, modifiers, term in rule.parse_premise():
+
+            height = self._compute_premise_height((fuzzyvar, modifiers, term))
+
+            if connective is None:
+                n_cuts = height
+            elif connective == "AND":
+                n_cuts = min(n_cuts, height)
+            elif connective == "OR":
+                n_cuts = max(n_cuts, height)
+            else:
+                raise ValueError(
+                    "Alpha-cut inference requires connectives 'AND' or 'OR', "
+                    "got '{}'".format(connective)
+                )
+
+        return n_cuts
+
+    def approximation_error(self, variables, rules, **input_values) -> dict:
+        """Returns the absolute difference with the outputs of `DecompositionalInference`.
+
+        :param variables: Dictionary of fuzzy variables.
+        :param rules: List of fuzzy rules.
+        :param input_values: Facts, as in a call to the engine.
+
+        """
+        result, _ = self(variables, rules, **input_values)
+
+        reference = DecompositionalInference(
+            and_operator=self.and_operator,
+            or_operator=self.or_operator,
+            implication_operator=self.implication_operator,
+            composition_operator=self.composition_operator,
+            production_link=self.production_link,
+            defuzzification_operator=self.defuzzification_operator,
+        )
+        expected, _ = reference(variables, rules, **input_values)
+
+        return {key: abs(result[key] - expected[key]) for key in result.keys()}
@@ -0,0 +1,291 @@
+"""
+Computational backends
+===============================================================================
+
+The inference engine delegates its numerical kernels (composition of facts
+with fuzzy relations, combination of memberships and defuzzification) to a
+backend. The `"numpy"` backend is the reference implementation. The `"numba"`
+backend runs fused, allocation-free compiled loops when `numba` is installed
+(``pip install fuzzy_expert[numba]``), and falls back to NumPy otherwise.
+
+"""
+from __future__ import annotations
+
+from typing import List, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from fuzzy_expert.operators import (
+    bounded_prod,
+    bounded_sum,
+    defuzzificate,
+    drastic_prod,
+    drastic_sum,
+    maximum,
+    minimum,
+    prob_or,
+    product,
+)
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA_AVAILABLE: bool = numba is not None
+
+
+OPERATORS = {
+    "min": minimum,
+    "prod": product,
+    "bunded_prod": bounded_prod,
+    "bounded_prod": bounded_prod,
+    "drastic_prod": drastic_prod,
+    "max": maximum,
+    "prob_or": prob_or,
+    "bounded_sum": bounded_sum,
+    "drastic_sum": drastic_sum,
+}
+
+#
+# Operator codes used by the compiled kernels
+#
+_OPERATOR_CODES = {
+    "min": 0,
+    "prod": 1,
+    "bunded_prod": 2,
+    "bounded_prod": 2,
+    "drastic_prod": 3,
+    "max": 4,
+    "prob_or": 5,
+    "bounded_sum": 6,
+    "drastic_sum": 7,
+}
+
+
+# #############################################################################
+#
+#
+# Loop kernels
+#
+#
+# #############################################################################
+
+
+def _compose_loop(fact, implication, use_prod, out):
+    """Max-min (or max-prod) composition of a fact with a fuzzy relation."""
+    n_rows, n_cols = implication.shape
+    for j in range(n_cols):
+        result = 0.0
+        for i in range(n_rows):
+            if use_prod:
+                value = fact[i] * implication[i, j]
+            else:
+                value = min(fact[i], implication[i, j])
+            if value > result:
+                result = value
+        out[j] = result
+    return out
+
+
+def _fold_loop(memberships, code, out):
+    """Fold of the rows of memberships with the operator code.
+
+    Sums and products are accumulated row by row and closed as in
+    `fuzzy_expert.operators` (e.g., 1 - prod(1 - u) for `prob_or`), so both
+    backends give the same values.
+
+    """
+    n_rows, n_cols = memberships.shape
+    for j in range(n_cols):
+        u = memberships[0, j]
+        if code == 5:
+            u = 1.0 - u
+        for i in range(1, n_rows):
+            v = memberships[i, j]
+            if code == 0:
+                u = min(u, v)
+            elif code == 1:
+                u = u * v
+            elif code == 2 or code == 6:
+                u = u + v
+            elif code == 3:
+                if v != 0.0:
+                    u = v if u == 1.0 else 0.0
+            elif code == 4:
+                u = max(u, v)
+            elif code == 5:
+                u = u * (1.0 - v)
+            else:
+                if v != 0.0:
+                    u = v if u == 0.0 else 1.0
+        if code == 2:
+            u = max(0.0, u - (n_rows - 1))
+        elif code == 5:
+            u = max(0.0, min(1.0, 1.0 - u))
+        elif code == 6:
+            u = min(1.0, u)
+        out[j] = u
+    return out
+
+
+def _cog_loop(universe, membership):
+    """Center of gravity of a piecewise linear membership function."""
+    num = 0.0
+    den = 0.0
+    for i in range(len(universe) - 1):
+        base = universe[i + 1] - universe[i]
+        left = membership[i]
+        right = membership[i + 1]
+        area_rect = min(left, right) * base
+        centr_rect = universe[i] + base / 2.0
+        area_tria = base * abs(right - left) / 2.0
+        if right > left:
+            centr_tri = universe[i] + 2.0 / 3.0 * base
+        else:
+            centr_tri = universe[i] + 1.0 / 3.0 * base
+        area = area_rect + area_tria
+        if area != 0.0:
+            num += area * ((area_rect * centr_rect + area_tria * centr_tri) / area)
+        den += area
+    return num / den
+
+
+def _boa_loop(universe, membership):
+    """Bisector of area of a piecewise linear membership function."""
+    n_areas = len(universe) - 1
+    total_area = 0.0
+    for i in range(n_areas):
+        base = universe[i + 1] - universe[i]
+        total_area += (membership[i] + membership[i + 1]) * base / 2.0
+    target = total_area / 2.0
+    cum_area = 0.0
+    for i in range(n_areas):
+        base = universe[i + 1] - universe[i]
+        area = (membership[i] + membership[i + 1]) * base / 2.0
+        cum_area += area
+        if cum_area >= target:
+            if target >= cum_area:
+                return universe[i + 1]
+            return universe[i] + base / area * (target - (cum_area - area))
+    return universe[n_areas]
+
+
+if NUMBA_AVAILABLE:
+    _compose_kernel = numba.njit(cache=True)(_compose_loop)
+    _fold_kernel = numba.njit(cache=True)(_fold_loop)
+    _cog_kernel = numba.njit(cache=True)(_cog_loop)
+    _boa_kernel = numba.njit(cache=True)(_boa_loop)
+
+
+# #############################################################################
+#
+#
+# Backends
+#
+#
+# #############################################################################
+
+
+class NumpyBackend:
+    """Reference backend built on NumPy array operations."""
+
+    name: str = "numpy"
+
+    def compose(
+        self,
+        fact: np.ndarray,
+        implication: np.ndarray,
+        operator: str,
+        out: Union[np.ndarray, None] = None,
+    ) -> np.ndarray:
+        """Computes the composition of a fact with a fuzzy relation.
+
+        :param fact: Membership of the fact on the premise universe.
+        :param implication: Fuzzy relation (premise universe x consequence universe).
+        :param operator: `"max-min"` or `"max-prod"`.
+        :param out: Optional array where the result is stored.
+
+        """
+        fact = fact.reshape((len(fact), 1))
+        if operator == "max-prod":
+            composition = fact * implication
+        else:
+            composition = np.minimum(fact, implication)
+        return np.max(composition, axis=0, out=out)
+
+    def combine(
+        self,
+        memberships: Union[List[npt.ArrayLike], np.ndarray],
+        operator: str,
+        out: Union[np.ndarray, None] = None,
+    ) -> np.ndarray:
+        """Combines memberships with one of the operators of `fuzzy_expert.operators`.
+
+        :param memberships: List of arrays of membership values, or an array of stacked memberships.
+        :param operator: Name of the operator (e.g. `"min"`, `"max"`, `"prob_or"`).
+        :param out: Optional array where the result is stored.
+
+        """
+        return OPERATORS[operator](memberships, out=out)
+
+    def defuzzificate(
+        self, universe: np.ndarray, membership: np.ndarray, operator: str
+    ) -> float:
+        """Computes a representative crisp value for the fuzzy set (see `fuzzy_expert.operators.defuzzificate`)."""
+        return defuzzificate(
+            universe=universe, membership=membership, operator=operator
+        )
+
+
+class NumbaBackend(NumpyBackend):
+    """Backend running compiled loops generated with numba."""
+
+    name: str = "numba"
+
+    def compose(self, fact, implication, operator, out=None):
+        if out is None:
+            out = np.empty(implication.shape[1])
+        return _compose_kernel(
+            np.asarray(fact, dtype=np.float64),
+            np.asarray(implication, dtype=np.float64),
+            operator == "max-prod",
+            out,
+        )
+
+    def combine(self, memberships, operator, out=None):
+        memberships = np.asarray(memberships, dtype=np.float64)
+        if memberships.ndim != 2:
+            return super().combine(memberships, operator, out=out)
+        if out is None:
+            out = np.empty(memberships.shape[1])
+        return _fold_kernel(memberships, _OPERATOR_CODES[operator], out)
+
+    def defuzzificate(self, universe, membership, operator):
+        universe = np.asarray(universe, dtype=np.float64)
+        membership = np.asarray(membership, dtype=np.float64)
+        if membership.ndim != 1 or np.sum(membership) == 0.0:
+            return super().defuzzificate(universe, membership, operator)
+        if operator == "cog":
+            return _cog_kernel(universe, membership)
+        if operator == "boa":
+            return _boa_kernel(universe, membership)
+        return super().defuzzificate(universe, membership, operator)
+
+
+def get_backend(name: str = "numpy") -> NumpyBackend:
+    """Returns the backend with the specified name.
+
+    :param name: `"numpy"` or `"numba"`. When numba is not installed, the `"numba"` backend falls back to NumPy.
+
+    >>> from fuzzy_expert.backend import get_backend
+    >>> get_backend("numpy").name
+    'numpy'
+
+    """
+    if name == "numba" and NUMBA_AVAILABLE:
+        return NumbaBackend()
+    if name in ("numpy", "numba"):
+        return NumpyBackend()
+    raise ValueError("Unknown backend: {}".format(name))
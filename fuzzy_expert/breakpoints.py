@@ -0,0 +1,506 @@
+"""
+Breakpoint Inference
+===============================================================================
+
+Fuzzy sets defined by lists of points are piecewise linear. This module keeps
+them as sorted breakpoint arrays `(x, y)` and implements the set operations and
+the defuzzification methods on the breakpoints, so the cost of the inference
+depends on the number of breakpoints and not on the resolution of the universe.
+
+"""
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+PiecewiseLinear = Tuple[np.ndarray, np.ndarray]
+
+
+def from_samples(
+    universe: npt.ArrayLike, membership: npt.ArrayLike, rtol: float = 1e-9
+) -> PiecewiseLinear:
+    """Returns the breakpoints of a membership function sampled on a universe.
+
+    :param universe: Sorted points of the universe of discourse.
+    :param membership: Membership values at the points of the universe.
+    :param rtol: Relative tolerance of the comparisons of points and slopes.
+
+    Points closer than a fraction `rtol` of the range of the universe are merged,
+    and points aligned with their neighbours (slopes equal up to `rtol`) are
+    dropped.
+
+    >>> from fuzzy_expert.breakpoints import from_samples
+    >>> from_samples([0, 1, 2, 3, 4], [0, 0.5, 1, 1, 0])
+    (array([0., 2., 3., 4.]), array([0., 1., 1., 0.]))
+
+    """
+    x = np.array(universe, dtype=np.float64)
+    y = np.array(membership, dtype=np.float64)
+
+    if len(x) <= 2:
+        return x, y
+
+    #
+    # Merges the points that differ by rounding errors (e.g., a term point
+    # added to a universe that already contains it up to the last digit)
+    #
+    unique = np.concatenate(([True], np.diff(x) > rtol * (x[-1] - x[0])))
+    x, y = x[unique], y[unique]
+
+    while len(x) > 2:
+
+        dx0 = x[1:-1] - x[:-2]
+        dx1 = x[2:] - x[1:-1]
+        dy0 = y[1:-1] - y[:-2]
+        dy1 = y[2:] - y[1:-1]
+
+        #
+        # dy0 / dx0 == dy1 / dx1 up to rtol, multiplied by dx0 * dx1
+        #
+        aligned = np.abs(dy0 * dx1 - dy1 * dx0) <= rtol * (
+            np.abs(dy0) * dx1 + np.abs(dy1) * dx0 + dx0 * dx1
+        )
+        if not np.any(aligned):
+            break
+
+        #
+        # Drops every other point of each run of aligned points, so that each
+        # dropped point was tested against the neighbours that are kept
+        #
+        i_point = np.arange(len(aligned))
+        run_start = np.maximum.accumulate(np.where(aligned, 0, i_point + 1))
+        drop = aligned & ((i_point - run_start) % 2 == 0)
+        keep = np.concatenate(([True], ~drop, [True]))
+        x, y = x[keep], y[keep]
+
+    return x, y
+
+
+def constant(x_range: Tuple[float, float], value: float) -> PiecewiseLinear:
+    """Returns a constant membership function over the range of a universe.
+
+    :param x_range: Limits of the universe of discourse.
+    :param value: Membership value.
+
+    """
+    return np.array(x_range, dtype=np.float64), np.full(2, value, dtype=np.float64)
+
+
+def _crossings(x: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """Returns the points where the piecewise linear function (x, d) changes of sign."""
+    i = np.nonzero(d[:-1] * d[1:] < 0)[0]
+    return x[i] + d[i] * (x[i + 1] - x[i]) / (d[i] - d[i + 1])
+
+
+#
+# Operators that are piecewise linear on piecewise linear sets: each operator is
+# computed point-wise, and its kinks are the roots of the second function
+#
+_SET_OPERATORS = {
+    "min": (np.minimum, lambda u, v: u - v),
+    "max": (np.maximum, lambda u, v: u - v),
+    "bounded_sum": (lambda u, v: np.minimum(1, u + v), lambda u, v: u + v - 1),
+    "bounded_prod": (lambda u, v: np.maximum(0, u + v - 1), lambda u, v: u + v - 1),
+    "bunded_prod": (lambda u, v: np.maximum(0, u + v - 1), lambda u, v: u + v - 1),
+}
+
+
+def combine(
+    fuzzyset: PiecewiseLinear, other: PiecewiseLinear, operator: str
+) -> PiecewiseLinear:
+    """Combines two piecewise linear fuzzy sets.
+
+    :param fuzzyset: Breakpoints of the first fuzzy set.
+    :param other: Breakpoints of the second fuzzy set.
+    :param operator: `"min"`, `"max"`, `"bounded_sum"` or `"bounded_prod"`.
+
+    The breakpoints of the result are the union of the breakpoints of the sets
+    and the points where the operator changes of branch (e.g., where the sets
+    cross for `"min"` and `"max"`).
+
+    >>> from fuzzy_expert.breakpoints import combine
+    >>> combine(([0, 2], [0, 1]), ([0, 2], [1, 0]), "min")
+    (array([0., 1., 2.]), array([0. , 0.5, 0. ]))
+
+    """
+    if operator not in _SET_OPERATORS.keys():
+        raise ValueError(
+            "Operator '{}' is not piecewise linear; use one of {}".format(
+                operator, list(_SET_OPERATORS.keys())
+            )
+        )
+    fn, kink = _SET_OPERATORS[operator]
+
+    x = np.union1d(fuzzyset[0], other[0])
+    u = np.interp(x, *fuzzyset)
+    v = np.interp(x, *other)
+
+    xc = _crossings(x, kink(u, v))
+    if len(xc) > 0:
+        x = np.union1d(x, xc)
+        u = np.interp(x, *fuzzyset)
+        v = np.interp(x, *other)
+
+    return from_samples(x, fn(u, v))
+
+
+def clip(fuzzyset: PiecewiseLinear, value: float) -> PiecewiseLinear:
+    """Returns the fuzzy set truncated at the specified membership value."""
+    x_range = (fuzzyset[0][0], fuzzyset[0][-1])
+    return combine(fuzzyset, constant(x_range, value), "min")
+
+
+#
+# Number of pieces per unit of membership in which the segments of a term are
+# divided before applying hedges, which are not linear
+#
+_HEDGE_PIECES = 64
+
+
+#
+# Implication operators that are piecewise linear for a crisp premise membership
+#
+_IMPLICATIONS = ["Ra", "Rm", "Rc", "Rb"]
+
+
+def _implication(u: float, fuzzyset: PiecewiseLinear, operator: str) -> PiecewiseLinear:
+    """Computes the relation R(u, v) of a premise membership u with a consequence."""
+
+    x, v = fuzzyset
+    x_range = (x[0], x[-1])
+
+    if operator == "Rc":
+        return clip(fuzzyset, u)
+    if operator == "Rb":
+        return combine(fuzzyset, constant(x_range, 1 - u), "max")
+    if operator == "Ra":
+        return combine((x, 1 - u + v), constant(x_range, 1), "min")
+    if operator == "Rm":
+        return combine(clip(fuzzyset, u), constant(x_range, 1 - u), "max")
+
+    raise ValueError(
+        "Implication operator '{}' is not piecewise linear; use one of {}".format(
+            operator, _IMPLICATIONS
+        )
+    )
+
+
+def defuzzificate(fuzzyset: PiecewiseLinear, operator: str = "cog") -> float:
+    """Computes a representative crisp value of a piecewise linear fuzzy set.
+
+    :param fuzzyset: Breakpoints of the fuzzy set.
+    :param operator: `"cog"`, `"boa"`, `"mom"`, `"lom"` or `"som"` (see `fuzzy_expert.operators.defuzzificate`).
+
+    The center of gravity and the bisector of area are computed exactly from the
+    polygon; the mean of maximum is the center of the set of points where the
+    membership is maximum.
+
+    >>> from fuzzy_expert.breakpoints import defuzzificate
+    >>> defuzzificate(([0, 1, 4], [0, 1, 0]), "cog")
+    1.6666666666666667
+    >>> defuzzificate(([0, 2], [1, 1]), "boa")
+    1.0
+
+    """
+    x = np.asarray(fuzzyset[0], dtype=np.float64)
+    y = np.asarray(fuzzyset[1], dtype=np.float64)
+
+    if operator in ("cog", "boa"):
+
+        x0, x1, y0, y1 = x[:-1], x[1:], y[:-1], y[1:]
+        base = x1 - x0
+        areas = (y0 + y1) * base / 2
+
+        if operator == "cog":
+            moments = base * (x0 * (2 * y0 + y1) + x1 * (y0 + 2 * y1)) / 6
+            return float(np.sum(moments) / np.sum(areas))
+
+        cum_areas = np.cumsum(areas)
+        target = cum_areas[-1] / 2
+        i = min(np.searchsorted(cum_areas, target), len(areas) - 1)
+        rest = target - (cum_areas[i] - areas[i])
+
+        #
+        # Solves y0 t + (y1 - y0) t^2 / (2 base) = rest in the segment i
+        #
+        slope = (y1[i] - y0[i]) / (2 * base[i])
+        den = y0[i] + np.sqrt(y0[i] ** 2 + 4 * slope * rest)
+        return float(x0[i] + (2 * rest / den if den > 0 else 0.0))
+
+    is_max = y == np.max(y)
+
+    if operator == "som":
+        return float(x[is_max][0])
+
+    if operator == "lom":
+        return float(x[is_max][-1])
+
+    if operator == "mom":
+        plateaus = is_max[:-1] & is_max[1:]
+        lengths = np.where(plateaus, x[1:] - x[:-1], 0)
+        if np.sum(lengths) > 0:
+            return float(np.sum(lengths * (x[:-1] + x[1:]) / 2) / np.sum(lengths))
+        return float(np.mean(x[is_max]))
+
+    raise ValueError("Unknown defuzzification operator: {}".format(operator))
+
+
+class BreakpointInference:
+    """Decompositional inference computed on the breakpoints of the fuzzy sets.
+
+    The parameters are the ones of `fuzzy_expert.inference.DecompositionalInference`,
+    restricted to the operators that keep the fuzzy sets piecewise linear:
+
+    :param and_operator: `"min"`, `"max"`, `"bounded_sum"` or `"bounded_prod"`.
+    :param or_operator: `"min"`, `"max"`, `"bounded_sum"` or `"bounded_prod"`.
+    :param implication_operator: `"Ra"`, `"Rm"`, `"Rc"` or `"Rb"`.
+    :param composition_operator: `"max-min"` or `"max-prod"`.
+    :param production_link: `"min"`, `"max"`, `"bounded_sum"` or `"bounded_prod"`.
+    :param defuzzification_operator: `"cog"`, `"boa"`, `"mom"`, `"lom"` or `"som"`.
+
+    Facts must be crisp. The consequences are the memberships on the universe
+    of each variable reduced to their breakpoints; as the universe contains the
+    points of the terms, unmodified terms are represented exactly. Hedges are
+    applied on the breakpoints of the term, each segment being divided in pieces
+    of at most 1/64 of membership. The breakpoints are kept between calls until
+    the variable changes (its `version` counter), so the cost of a call does not
+    depend on the resolution of the universe. Results match `DecompositionalInference` up to the discretization of its
+    universe, and `boa` is computed exactly instead of by linear interpolation.
+    After each call, `aggregated_sets` holds the breakpoints of the output fuzzy
+    sets, and `diagnostics["breakpoints"]` their total number.
+
+    >>> from fuzzy_expert.breakpoints import BreakpointInference
+    >>> from fuzzy_expert.rule import FuzzyRule
+    >>> from fuzzy_expert.variable import FuzzyVariable
+    >>> variables = {
+    ...     "x": FuzzyVariable(
+    ...         universe_range=(0, 10),
+    ...         terms={"Low": [(0, 1), (10, 0)], "High": [(0, 0), (10, 1)]},
+    ...     ),
+    ...     "y": FuzzyVariable(
+    ...         universe_range=(0, 10),
+    ...         terms={"Low": [(0, 1), (10, 0)], "High": [(0, 0), (10, 1)]},
+    ...     ),
+    ... }
+    >>> rules = [FuzzyRule(premise=[("x", "High")], consequence=[("y", "High")])]
+    >>> model = BreakpointInference(
+    ...     and_operator="min",
+    ...     or_operator="max",
+    ...     implication_operator="Rc",
+    ...     composition_operator="max-min",
+    ...     production_link="max",
+    ...     defuzzification_operator="cog",
+    ... )
+    >>> model(variables, rules, x=5)
+    ({'y': 6.111111111111112}, 1.0)
+    >>> model.aggregated_sets["y"]
+    (array([ 0.,  5., 10.]), array([0. , 0.5, 0.5]))
+
+    """
+
+    def __init__(
+        self,
+        and_operator,
+        or_operator,
+        implication_operator,
+        composition_operator,
+        production_link,
+        defuzzification_operator,
+    ):
+        for operator in (and_operator, or_operator, production_link):
+            if operator not in _SET_OPERATORS.keys():
+                raise ValueError(
+                    "Operator '{}' is not piecewise linear; use one of {}".format(
+                        operator, list(_SET_OPERATORS.keys())
+                    )
+                )
+        if implication_operator not in _IMPLICATIONS:
+            raise ValueError(
+                "Implication operator '{}' is not piecewise linear; use one of {}".format(
+                    implication_operator, _IMPLICATIONS
+                )
+            )
+
+        self.and_operator = and_operator
+        self.or_operator = or_operator
+        self.implication_operator = implication_operator
+        self.composition_operator = composition_operator
+        self.production_link = production_link
+        self.defuzzification_operator = defuzzification_operator
+        self.consequences: dict = {}
+
+    def __call__(self, variables, rules, **input_values):
+
+        self.variables = variables
+        self.rules = list(rules)
+        self.input_values: dict = input_values
+        self.diagnostics: dict = {}
+
+        self._convert_inputs_to_facts()
+
+        self.aggregated_sets: dict = {}
+        self.infered_cf = None
+
+        for rule in self.rules:
+
+            rule_cf = self._compute_rule_infered_cf(rule)
+
+            if self.infered_cf is None:
+                self.infered_cf = rule_cf
+            else:
+                self.infered_cf = max(self.infered_cf, rule_cf)
+
+            for fuzzyvar, modifiers, term in rule.parse_consequence():
+
+                if fuzzyvar not in self.aggregated_sets.keys():
+                    self.aggregated_sets[fuzzyvar] = None
+
+                if rule_cf < rule.threshold_cf:
+                    continue
+
+                fuzzyset = self._compute_rule_consequence(
+                    rule, (fuzzyvar, modifiers, term)
+                )
+
+                if self.aggregated_sets[fuzzyvar] is None:
+                    self.aggregated_sets[fuzzyvar] = fuzzyset
+                else:
+                    self.aggregated_sets[fuzzyvar] = combine(
+                        self.aggregated_sets[fuzzyvar], fuzzyset, self.production_link
+                    )
+
+        self.defuzzificated_infered_memberships = {}
+
+        for fuzzyvar, fuzzyset in self.aggregated_sets.items():
+
+            universe = self.variables[fuzzyvar].universe
+
+            if fuzzyset is None:
+                fuzzyset = constant((universe[0], universe[-1]), 0)
+                self.aggregated_sets[fuzzyvar] = fuzzyset
+
+            if np.all(fuzzyset[1] == 0):
+                value = float(np.mean(universe))
+            else:
+                value = defuzzificate(fuzzyset, self.defuzzification_operator)
+
+            self.defuzzificated_infered_memberships[fuzzyvar] = value
+
+        self.diagnostics["breakpoints"] = sum(
+            len(x) for x, _ in self.aggregated_sets.values()
+        )
+
+        return self.defuzzificated_infered_memberships, self.infered_cf
+
+    def _convert_inputs_to_facts(self):
+        """
+        Converts input values to crisp facts (fact_values, fact_cf=1.0).
+
+        """
+        self.fact_values: dict = {}
+        self.fact_cf: dict = {}
+
+        for key, input_value in self.input_values.items():
+            if isinstance(input_value, tuple):
+                value, cf = input_value
+            else:
+                value, cf = input_value, 1.0
+            if not isinstance(value, (int, float, np.number)):
+                raise ValueError("Fact '{}' must be a crisp value".format(key))
+            self.fact_values[key] = value
+            self.fact_cf[key] = cf
+
+    def _compute_rule_infered_cf(self, rule) -> float:
+        """Computes the certainty factor inferred by the rule."""
+
+        aggregated_premise_cf = None
+
+        for connective, fuzzyvar, _, _ in rule.parse_premise():
+
+            premise_cf = self.fact_cf[fuzzyvar]
+
+            if connective is None:
+                aggregated_premise_cf = premise_cf
+            elif connective == "AND":
+                aggregated_premise_cf = min(aggregated_premise_cf, premise_cf)
+            elif connective == "OR":
+                aggregated_premise_cf = max(aggregated_premise_cf, premise_cf)
+
+        return aggregated_premise_cf * rule.rule_cf
+
+    def _get_consequence(self, key: tuple) -> PiecewiseLinear:
+        """Returns the breakpoints of the modified membership of a (variable, modifiers, term) proposition."""
+
+        fuzzyvar, modifiers, term = key
+        variable = self.variables[fuzzyvar]
+        stamp = (id(variable), variable.version)
+
+        if key in self.consequences.keys() and self.consequences[key][0] == stamp:
+            return self.consequences[key][1]
+
+        if not modifiers:
+            fuzzyset = from_samples(variable.universe, variable.terms[term])
+        else:
+            #
+            # Divides each segment of the term in pieces of at most
+            # 1 / _HEDGE_PIECES of membership, and applies the hedges there
+            #
+            x, y = self._get_consequence((fuzzyvar, (), term))
+            pieces = np.maximum(1, np.ceil(_HEDGE_PIECES * np.abs(np.diff(y))))
+            pieces = pieces.astype(int)
+            starts = np.repeat(np.cumsum(pieces) - pieces, pieces)
+            steps = np.repeat(np.diff(x) / pieces, pieces)
+            x = np.append(
+                np.repeat(x[:-1], pieces) + steps * (np.arange(len(steps)) - starts),
+                x[-1],
+            )
+            fuzzyset = from_samples(
+                x,
+                variable.get_modified_membership_at(
+                    term=term, value=x, modifiers=modifiers
+                ),
+            )
+
+        self.consequences[key] = (stamp, fuzzyset)
+        return fuzzyset
+
+    def _compute_rule_consequence(self, rule, key: tuple) -> PiecewiseLinear:
+        """Computes the compositions of the premises and combines them with the connectives.
+
+        Connectives given as operator names (e.g., `"bounded_prod"`) are applied
+        directly; `combine` raises `ValueError` for the ones that are not
+        piecewise linear.
+
+        """
+
+        consequence = self._get_consequence(key)
+        combined = None
+
+        for connective, fuzzyvar, modifiers, term in rule.parse_premise():
+
+            variable = self.variables[fuzzyvar]
+            value = self.fact_values[fuzzyvar]
+
+            if variable.min_u <= value <= variable.max_u:
+                degree = float(
+                    variable.get_modified_membership_at(
+                        term=term, value=value, modifiers=modifiers
+                    )
+                )
+            else:
+                degree = 0.0
+
+            composition = _implication(degree, consequence, self.implication_operator)
+
+            if connective is None:
+                combined = composition
+            else:
+                operator = {
+                    "AND": self.and_operator,
+                    "OR": self.or_operator,
+                }.get(connective, connective)
+                combined = combine(combined, composition, operator)
+
+        return combined
@@ -0,0 +1,181 @@
+"""
+Result Cache
+===============================================================================
+
+"""
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from typing import Callable, Union
+
+from fuzzy_expert.rulebase import RuleBase
+
+
+class ResultCache:
+    """Bounded cache of the results of an inference engine for crisp facts.
+
+    :param maxsize: Maximum number of results; the least recently used result is evicted first.
+    :param ttl: Optional time to live of the results, in seconds.
+    :param resolution: Optional dictionary with the resolution used for quantizing the facts of each variable. By default, the step of the universe of the variable.
+    :param clock: Function returning the current time, in seconds.
+
+    Crisp facts are rounded to the nearest multiple of the resolution of their
+    variable (measured from the lower limit of the universe), and the engine
+    computes the result for the rounded values, so facts in the same cell share a
+    result. The key of a result is made of the rounded facts, their certainty
+    factors and the requested outputs. Calls with fuzzy facts are not cached.
+
+    All the results are dropped when the variables or the rules change (their
+    identity or their `version` counter) or when the cache is used with another
+    engine configuration. A list of rules is identified by its rules, so copies
+    of the list share the results. For a `fuzzy_expert.rulebase.RuleBase`, its
+    `version` counter is used, so a lookup does not visit the rules. The counters
+    `hits`, `misses`, `evictions`, `expirations` and `invalidations` report the
+    use of the cache.
+
+    >>> from fuzzy_expert.cache import ResultCache
+    >>> from fuzzy_expert.variable import FuzzyVariable
+    >>> cache = ResultCache(maxsize=2)
+    >>> variables = {"x": FuzzyVariable(universe_range=(0, 10), step=0.5)}
+    >>> cache.quantize(variables, {"x": (3.3, 0.8)})
+    {'x': (3.5, 0.8)}
+
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Union[float, None] = None,
+        resolution: Union[dict, None] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize: int = maxsize
+        self.ttl: Union[float, None] = ttl
+        self.resolution: dict = {} if resolution is None else dict(resolution)
+        self.clock: Callable[[], float] = clock
+
+        self.entries: collections.OrderedDict = collections.OrderedDict()
+        self.fingerprint: Union[tuple, None] = None
+        self.lock = threading.Lock()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+        self.invalidations: int = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of the lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def clear(self) -> None:
+        """Drops all the results."""
+        with self.lock:
+            self.entries.clear()
+
+    def quantize(self, variables: dict, input_values: dict) -> Union[dict, None]:
+        """Returns the facts with the crisp values rounded to the resolution of their variables.
+
+        :param variables: Dictionary of fuzzy variables.
+        :param input_values: Facts, given as in a call to the engine.
+
+        Returns None when a fact is not crisp.
+
+        """
+        result: dict = {}
+        for name, input_value in input_values.items():
+            value, cf = (
+                input_value if isinstance(input_value, tuple) else (input_value, 1.0)
+            )
+            if not isinstance(value, (int, float)):
+                return None
+            fuzzyvar = variables[name]
+            resolution = self.resolution.get(name, fuzzyvar.step)
+            value = (
+                fuzzyvar.min_u
+                + round((value - fuzzyvar.min_u) / resolution) * resolution
+            )
+            result[name] = (value, cf) if isinstance(input_value, tuple) else value
+        return result
+
+    def __call__(
+        self,
+        compute: Callable,
+        variables: dict,
+        rules,
+        outputs,
+        input_values: dict,
+        config: tuple = (),
+    ) -> tuple:
+        """Returns the cached result of the facts, or computes and stores it.
+
+        :param compute: Function called as compute(variables, rules, outputs, input_values) on a miss.
+        :param variables: Dictionary of fuzzy variables.
+        :param rules: List of fuzzy rules, or a `fuzzy_expert.rulebase.RuleBase`.
+        :param outputs: List with the names of the output variables to compute, or None.
+        :param input_values: Facts, given as in a call to the engine.
+        :param config: Configuration of the engine.
+
+        """
+        quantized = self.quantize(variables, input_values)
+        if quantized is None:
+            return compute(variables, rules, outputs, input_values)
+
+        if isinstance(rules, RuleBase):
+            rules_version = (id(rules), rules.version)
+        else:
+            rules_version = tuple((id(rule), rule.version) for rule in rules)
+
+        fingerprint = (
+            config,
+            tuple(
+                (name, id(fuzzyvar), fuzzyvar.version)
+                for name, fuzzyvar in variables.items()
+            ),
+            rules_version,
+        )
+        key = (
+            None if outputs is None else tuple(outputs),
+            tuple(sorted(quantized.items())),
+        )
+
+        with self.lock:
+            if fingerprint != self.fingerprint:
+                if self.entries:
+                    self.invalidations += 1
+                self.entries.clear()
+                self.fingerprint = fingerprint
+
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl is not None and entry[0] <= self.clock():
+                del self.entries[key]
+                self.expirations += 1
+                entry = None
+
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                outputs_values, infered_cf = entry[1]
+                return dict(outputs_values), infered_cf
+
+            self.misses += 1
+
+        outputs_values, infered_cf = compute(variables, rules, outputs, quantized)
+        expires = None if self.ttl is None else self.clock() + self.ttl
+
+        with self.lock:
+            if fingerprint == self.fingerprint:
+                self.entries[key] = (expires, (dict(outputs_values), infered_cf))
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+
+        return outputs_values, infered_cf
@@ -11,24 +11,87 @@ import matplotlib.pyplot as plt
 import numpy as np
 from ipywidgets import interact, widgets
 
-from fuzzy_expert.operators import (
-    bounded_prod,
-    bounded_sum,
-    defuzzificate,
-    drastic_prod,
-    drastic_sum,
-    maximum,
-    minimum,
-    prob_or,
-    product,
-)
+from fuzzy_expert.backend import get_backend
 from fuzzy_expert.plots import plot_crisp_input, plot_fuzzy_input
-from fuzzy_expert.variable import FuzzyVariable
+from fuzzy_expert.rulebase import RuleBase, can_skip_rules
+from fuzzy_expert.workspace import Workspace
 
 # from fuzzy_expert.operators import get_modified_membership, probor, defuzzificate
 #
 
 
+#
+# Implication operators. See Kasabov, pag. 185
+#
+# Each operator computes the fuzzy relation for the premise memberships u and
+# the consequence memberships v (broadcastable) and stores it in out.
+#
+def _Ra(u, v, out):
+    np.subtract(1, u, out=out)
+    np.add(out, v, out=out)
+    return np.minimum(1, out, out=out)
+
+
+def _Rm(u, v, out):
+    np.minimum(u, v, out=out)
+    return np.maximum(out, 1 - u, out=out)
+
+
+def _Rc(u, v, out):
+    return np.minimum(u, v, out=out)
+
+
+def _Rb(u, v, out):
+    return np.maximum(1 - u, v, out=out)
+
+
+def _Rs(u, v, out):
+    out[...] = np.less_equal(u, v)
+    return out
+
+
+def _Rg(u, v, out):
+    np.copyto(out, np.broadcast_to(v, out.shape))
+    np.copyto(out, 1, where=np.less_equal(u, v))
+    return out
+
+
+def _Rsg(u, v, out):
+    _Rg(1 - u, 1 - v, out)
+    np.copyto(out, 0, where=np.logical_not(np.less_equal(u, v)))
+    return out
+
+
+def _Rgs(u, v, out):
+    _Rg(u, v, out)
+    np.copyto(out, 0, where=np.logical_not(np.less_equal(1 - u, 1 - v)))
+    return out
+
+
+def _Rgg(u, v, out):
+    _Rg(u, v, out)
+    return np.minimum(out, np.where(1 - u <= 1 - v, 1, 1 - v), out=out)
+
+
+def _Rss(u, v, out):
+    out[...] = np.less_equal(u, v) & np.less_equal(1 - u, 1 - v)
+    return out
+
+
+_IMPLICATIONS = {
+    "Ra": _Ra,
+    "Rm": _Rm,
+    "Rc": _Rc,
+    "Rb": _Rb,
+    "Rs": _Rs,
+    "Rg": _Rg,
+    "Rsg": _Rsg,
+    "Rgs": _Rgs,
+    "Rgg": _Rgg,
+    "Rss": _Rss,
+}
+
+
 class DecompositionalInference:
     """
     Decompositional inference method.
@@ -142,6 +205,39 @@ class DecompositionalInference:
         * `"som"`: Smallest value for which the membership function is minimum.
 
 
+    :param backend: Backend used for the numerical kernels (see `fuzzy_expert.backend`), specified as one of the following:
+
+
+        * `"numpy"`: Reference implementation.
+
+
+        * `"numba"`: Compiled loops; falls back to `"numpy"` when numba is not installed.
+
+
+    :param trace: When True, the intermediate results of each rule (modified memberships, fuzzy implications, compositions and combined compositions) are kept as attributes of the rules after the call. By default, only the results needed to compute the outputs and the certainty factor are kept, and the fuzzy relations of fuzzy facts share a single scratch buffer. `plot()` always traces.
+
+
+    :param cache: Optional `fuzzy_expert.cache.ResultCache` with the results of previous calls with crisp facts. The facts are quantized to the resolution of the cache, and the attributes with intermediate results (e.g., `aggregated_memberships`) are not updated when a result is taken from the cache.
+
+
+    The optional argument `outputs` of a call is a list with the names of the output
+    variables to compute. Rules without a consequence on them, and the consequences
+    on other variables, are discarded before any computation; the certainty factor
+    is then aggregated over the remaining rules.
+
+    Propositions `(variable, modifiers, term)` and pairs of premise and consequence
+    propositions that appear in several rules are computed once per call. After each
+    call, the `diagnostics` dictionary reports the number of propositions and pairs,
+    the number of distinct ones, and the resulting `deduplication_ratio`.
+
+    Intermediate arrays are stored in a `fuzzy_expert.workspace.Workspace` owned by
+    the engine and reused across calls; `diagnostics["allocations"]` reports the
+    number of buffers allocated during the call. Arrays exposed as attributes
+    (e.g., `aggregated_memberships`) are overwritten by the next call. Without
+    trace, the premises of each rule are combined in one buffer per output
+    variable, so the size of the workspace does not grow with the number of rules.
+
+
     """
 
     def __init__(
@@ -152,6 +248,9 @@ class DecompositionalInference:
         composition_operator,
         production_link,
         defuzzification_operator,
+        backend="numpy",
+        trace=False,
+        cache=None,
     ):
         self.and_operator = and_operator
         self.or_operator = or_operator
@@ -159,17 +258,50 @@ class DecompositionalInference:
         self.production_link = production_link
         self.defuzzification_operator = defuzzification_operator
         self.implication_operator = implication_operator
+        self.backend = get_backend(backend)
+        self.workspace = Workspace()
+        self.trace = trace
+        self.cache = cache
+
+    def __call__(self, variables, rules, outputs=None, **input_values):
+
+        if self.cache is not None:
+            config = (
+                self.and_operator,
+                self.or_operator,
+                self.implication_operator,
+                self.composition_operator,
+                self.production_link,
+                self.defuzzification_operator,
+            )
+            return self.cache(
+                self._infer, variables, rules, outputs, input_values, config
+            )
+
+        return self._infer(variables, rules, outputs, input_values)
 
-    def __call__(self, variables, rules, **input_values):
+    def _infer(self, variables, rules, outputs, input_values):
 
         #
-        # Components of a fis.
+        # Components of a fis. Rules can be given as a list of FuzzyRule or
+        # as a RuleBase.
         #
         self.variables = variables
-        self.rules = rules
+        if isinstance(rules, RuleBase):
+            self.rulebase = rules
+            self.rules = rules.rules
+        else:
+            self.rulebase = None
+            self.rules = list(rules)
         self.input_values: dict = input_values
+        self.outputs = None if outputs is None else list(outputs)
+        self.diagnostics: dict = {}
+        allocations = self.workspace.allocations
+        self.workspace.release()
 
         self._convert_inputs_to_facts()
+        self._select_candidate_rules()
+        self._select_output_rules()
         self._fuzzificate_facts()
         self._compute_modified_premise_memberships()
         self._compute_modified_consequence_memberships()
@@ -177,13 +309,232 @@ class DecompositionalInference:
         self._compute_fuzzy_composition()
         self._combine_antecedents()
         self._compute_rule_infered_cf()
-        self._collect_rule_memberships()
-        self._aggregate_collected_memberships()
+        self._aggregate_rule_memberships()
         self._aggregate_production_cf()
         self._defuzzificate()
 
+        if not self.trace:
+            self._release_intermediates()
+
+        self.diagnostics["allocations"] = self.workspace.allocations - allocations
+
         return self.defuzzificated_infered_memberships, self.infered_cf
 
+    def compute_cf(self, variables, rules, **input_values):
+        """Computes the certainty factors of the rules and the system without computing any membership function.
+
+        :param variables: Dictionary of fuzzy variables.
+        :param rules: List of fuzzy rules, or a `fuzzy_expert.rulebase.RuleBase` (preferred for repeated calls).
+        :param input_values: Facts of the premise variables, given as in a call to the engine. The certainty factors can be arrays for a batch of facts.
+
+        Returns a tuple with the certainty factor inferred by each rule (one row per
+        rule, and one column per fact for batches) and the certainty factor of the
+        system, equal to the one returned by a call over the same rules.
+
+        """
+        rulebase = rules if isinstance(rules, RuleBase) else RuleBase(rules, variables)
+
+        names = list(input_values.keys())
+        fact_cf = [
+            input_values[name][1] if isinstance(input_values[name], tuple) else 1.0
+            for name in names
+        ]
+        fact_cf = np.broadcast_arrays(
+            *[np.asarray(cf, dtype=np.float64) for cf in fact_cf]
+        )
+
+        rule_cf = rulebase.infered_cf(dict(zip(names, fact_cf)))
+        infered_cf = np.max(rule_cf, axis=0) if len(rule_cf) > 0 else None
+
+        return rule_cf, infered_cf
+
+    def evaluate_batch(self, variables, rules, outputs=None, **input_values):
+        """Computes the outputs of the system for a batch of crisp facts.
+
+        :param variables: Dictionary of fuzzy variables.
+        :param rules: List of fuzzy rules, or a `fuzzy_expert.rulebase.RuleBase`.
+        :param outputs: Optional list with the names of the output variables to compute.
+        :param input_values: Arrays of crisp values of the premise variables, or tuples (values, cf) where the certainty factors can also be arrays. Scalars are broadcast to the batch.
+
+        Returns a tuple with a dictionary of arrays of defuzzificated outputs and the
+        array of certainty factors of the system, equal to calling the engine on each
+        fact. The compositions of a rule are computed for the whole batch at once (as a
+        (n_facts x n_universe) array) and folded into the outputs, so memory grows with
+        the size of the batch but not with the number of rules.
+
+        """
+        rulebase = rules if isinstance(rules, RuleBase) else RuleBase(rules, variables)
+
+        names = list(input_values.keys())
+        values = [
+            input_values[name][0]
+            if isinstance(input_values[name], tuple)
+            else input_values[name]
+            for name in names
+        ]
+        fact_cf = [
+            input_values[name][1] if isinstance(input_values[name], tuple) else 1.0
+            for name in names
+        ]
+        arrays = np.broadcast_arrays(
+            *[np.asarray(value, dtype=np.float64) for value in values + fact_cf]
+        )
+        arrays = [np.atleast_1d(array) for array in arrays]
+        fact_values = dict(zip(names, arrays[: len(names)]))
+        fact_cf = dict(zip(names, arrays[len(names) :]))
+        n_facts = len(arrays[0]) if arrays else 1
+
+        if outputs is not None:
+            unknown = [name for name in outputs if name not in variables.keys()]
+            if unknown:
+                raise ValueError("Unknown output variables: {}".format(unknown))
+
+        rule_cf = rulebase.infered_cf(fact_cf)
+        implication_fn = _IMPLICATIONS[self.implication_operator]
+        degrees: dict = {}
+
+        def get_degree(fuzzyvar, modifiers, term):
+            key = (fuzzyvar, modifiers, term)
+            if key not in degrees.keys():
+                value = fact_values[fuzzyvar]
+                fuzzyset = variables[fuzzyvar]
+                degree = fuzzyset.get_modified_membership_at(
+                    term=term, value=value, modifiers=modifiers
+                )
+                inside = (fuzzyset.min_u <= value) & (value <= fuzzyset.max_u)
+                degrees[key] = (degree.reshape((-1, 1)), inside.reshape((-1, 1)))
+            return degrees[key]
+
+        aggregated_memberships: dict = {}
+        started: dict = {}
+
+        for i_rule, rule in enumerate(rulebase.rules):
+
+            fired = (rule_cf[i_rule] >= rule.threshold_cf).reshape((-1, 1))
+            premise = rule.parse_premise()
+
+            for fuzzyvar, modifiers, term in rule.parse_consequence():
+
+                if outputs is not None and fuzzyvar not in outputs:
+                    continue
+
+                consequence_membership = variables[fuzzyvar].get_modified_membeship(
+                    term=term, modifiers=list(modifiers) or None
+                )
+                shape = (n_facts, len(consequence_membership))
+
+                if fuzzyvar not in aggregated_memberships.keys():
+                    aggregated_memberships[fuzzyvar] = np.zeros(shape)
+                    started[fuzzyvar] = np.zeros((n_facts, 1), dtype=bool)
+
+                combined_composition = None
+                for connective, premise_var, premise_modifiers, premise_term in premise:
+                    degree, inside = get_degree(
+                        premise_var, premise_modifiers, premise_term
+                    )
+                    composition = implication_fn(
+                        degree, consequence_membership, out=np.empty(shape)
+                    )
+                    np.copyto(composition, 0, where=np.logical_not(inside))
+
+                    if combined_composition is None:
+                        combined_composition = composition
+                    else:
+                        operator = {
+                            "AND": self.and_operator,
+                            "OR": self.or_operator,
+                        }.get(connective, connective)
+                        self.backend.combine(
+                            [combined_composition, composition],
+                            operator,
+                            out=combined_composition,
+                        )
+
+                #
+                # Rows where the rule fires for the first time take the
+                # composition; the others are folded with the production link
+                #
+                aggregated = aggregated_memberships[fuzzyvar]
+                folded = self.backend.combine(
+                    [aggregated, combined_composition], self.production_link
+                )
+                np.copyto(aggregated, folded, where=fired & started[fuzzyvar])
+                np.copyto(
+                    aggregated,
+                    combined_composition,
+                    where=fired & np.logical_not(started[fuzzyvar]),
+                )
+                started[fuzzyvar] |= fired
+
+        self.aggregated_memberships = aggregated_memberships
+
+        defuzzificated_infered_memberships = {
+            fuzzyvar: self.backend.defuzzificate(
+                universe=variables[fuzzyvar].universe,
+                membership=membership,
+                operator=self.defuzzification_operator,
+            )
+            for fuzzyvar, membership in aggregated_memberships.items()
+        }
+        infered_cf = np.max(rule_cf, axis=0) if len(rule_cf) > 0 else None
+
+        return defuzzificated_infered_memberships, infered_cf
+
+    def predict(
+        self, df, variables, rules, cf_columns=None, outputs=None, chunk_size=1024
+    ):
+        """Computes the outputs of the system for each row of a pandas DataFrame.
+
+        :param df: DataFrame with one column of crisp values named after each premise variable.
+        :param variables: Dictionary of fuzzy variables.
+        :param rules: List of fuzzy rules, or a `fuzzy_expert.rulebase.RuleBase`.
+        :param cf_columns: Optional dictionary with the name of the column holding the certainty factors of the facts of each variable (1.0 by default).
+        :param outputs: Optional list with the names of the output variables to compute.
+        :param chunk_size: Number of rows computed at once with `evaluate_batch`.
+
+        Returns a DataFrame with the same index as df, one column with each output,
+        and a `"cf"` column with the certainty factor of the system.
+
+        """
+        import pandas as pd
+
+        rulebase = rules if isinstance(rules, RuleBase) else RuleBase(rules, variables)
+        if cf_columns is None:
+            cf_columns = {}
+
+        names = []
+        for rule in rulebase.rules:
+            for _, fuzzyvar, _, _ in rule.parse_premise():
+                if fuzzyvar not in names:
+                    names.append(fuzzyvar)
+
+        columns = {name: df[name].to_numpy(dtype=np.float64) for name in names}
+        cf = {
+            name: df[column].to_numpy(dtype=np.float64)
+            for name, column in cf_columns.items()
+        }
+
+        results: dict = {}
+        for start in range(0, len(df), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            input_values = {
+                name: (values[chunk], cf[name][chunk]) if name in cf else values[chunk]
+                for name, values in columns.items()
+            }
+            chunk_outputs, chunk_cf = self.evaluate_batch(
+                variables, rulebase, outputs=outputs, **input_values
+            )
+            for name, value in dict(chunk_outputs, cf=chunk_cf).items():
+                results.setdefault(name, []).append(value)
+
+        return pd.DataFrame(
+            {
+                name: np.concatenate(value) if value else np.empty(0)
+                for name, value in results.items()
+            },
+            index=df.index,
+        )
+
     def _convert_inputs_to_facts(self):
         """
         Converts input values to FIS facts (fact_values, fact_cf=1.0).
@@ -201,15 +552,64 @@ class DecompositionalInference:
                 self.fact_values[key] = input_value
                 self.fact_cf[key] = 1.0
 
+    def _select_candidate_rules(self):
+        """
+        Keeps only the rules of a rule base that can fire for the facts, when
+        the operators allow skipping the other ones (see
+        `fuzzy_expert.rulebase.can_skip_rules`).
+
+        """
+        if self.rulebase is None:
+            self.rule_ids = None
+            return
+
+        if can_skip_rules(
+            self.and_operator, self.implication_operator, self.production_link
+        ):
+            self.rule_ids = self.rulebase.candidates(self.fact_values)
+            self.rules = [self.rulebase.rules[i_rule] for i_rule in self.rule_ids]
+        else:
+            self.rule_ids = np.arange(len(self.rulebase))
+
+        self.diagnostics["candidate_rules"] = len(self.rules)
+
+    def _select_output_rules(self):
+        """
+        Keeps only the rules with a consequence on the requested outputs.
+
+        """
+        if self.outputs is None:
+            return
+
+        unknown = [name for name in self.outputs if name not in self.variables.keys()]
+        if unknown:
+            raise ValueError("Unknown output variables: {}".format(unknown))
+
+        selected = [
+            i_rule
+            for i_rule, rule in enumerate(self.rules)
+            if any(
+                fuzzyvar in self.outputs for fuzzyvar, _, _ in rule.parse_consequence()
+            )
+        ]
+        self.rules = [self.rules[i_rule] for i_rule in selected]
+        if self.rule_ids is not None:
+            self.rule_ids = self.rule_ids[selected]
+
     def _fuzzificate_crisp_fact(self, fact_name: str) -> None:
         """
         Fuzzificate a fact with a crisp value (i.e., fact: float)
 
+        The composition of a crisp fact x with a fuzzy relation R(u, v) is R(x, v),
+        so the premise memberships are evaluated at x when the compositions are
+        computed, and the universe of the variable is not modified. Values outside
+        the universe do not match any premise.
+
         """
         fact_value = self.fact_values[fact_name]
-        self.variables[fact_name].add_points_to_universe([fact_value])
-        self.fact_values[fact_name] = np.array(
-            [1 if u == fact_value else 0 for u in self.variables[fact_name].universe]
+        fuzzyvar = self.variables[fact_name]
+        self.fact_in_universe[fact_name] = (
+            fuzzyvar.min_u <= fact_value <= fuzzyvar.max_u
         )
 
     def _fuzzificate_fuzzy_fact(self, fact_name: str) -> None:
@@ -220,7 +620,7 @@ class DecompositionalInference:
         fact_value = self.fact_values[fact_name]
         xp = [xp for xp, _ in fact_value]
         fp = [fp for _, fp in fact_value]
-        self.variables[fact_name]._add_points_to_universe(xp)
+        self.variables[fact_name].add_points_to_universe(xp)
         self.fact_values[fact_name] = np.interp(
             x=self.variables[fact_name].universe, xp=xp, fp=fp
         )
@@ -231,6 +631,7 @@ class DecompositionalInference:
 
         """
         self.fact_types = {}
+        self.fact_in_universe = {}
         for key in self.fact_values.keys():
             if isinstance(self.fact_values[key], (float, int)):
                 self._fuzzificate_crisp_fact(fact_name=key)
@@ -239,80 +640,97 @@ class DecompositionalInference:
                 self._fuzzificate_fuzzy_fact(fact_name=key)
                 self.fact_types[key] = "fuzzy"
 
+    def _get_modified_membership(self, key: tuple) -> np.ndarray:
+        """Returns the modified membership of a (variable, modifiers, term) proposition, computing it once per call."""
+
+        if key not in self.shared_memberships.keys():
+            fuzzyvar, modifiers, term = key
+            self.shared_memberships[key] = self.variables[
+                fuzzyvar
+            ].get_modified_membeship(term=term, modifiers=modifiers or None)
+        return self.shared_memberships[key]
+
     def _compute_modified_premise_memberships(self):
 
+        self.shared_memberships = {}
+        self.premise_keys = []
+        n_propositions = 0
+
         for rule in self.rules:
 
             rule.modified_premise_memberships = {}
+            premise_keys = {}
 
-            for i_proposition, proposition in enumerate(rule.premise):
+            for _, fuzzyvar, modifiers, term in rule.parse_premise():
 
-                if i_proposition != 0:
-                    proposition = proposition[1:]
+                key = (fuzzyvar, modifiers, term)
+                premise_keys[fuzzyvar] = key
+                rule.modified_premise_memberships[
+                    fuzzyvar
+                ] = self._get_modified_membership(key)
+                n_propositions += 1
 
-                if len(proposition) == 2:
-                    fuzzyvar, term = proposition
-                    modifiers = None
-                else:
-                    fuzzyvar = proposition[0]
-                    term = proposition[-1]
-                    modifiers = proposition[1:-1]
+            self.premise_keys.append(premise_keys)
 
-                rule.modified_premise_memberships[fuzzyvar] = self.variables[
-                    fuzzyvar
-                ].get_modified_membeship(term=term, modifiers=modifiers)
+        self.diagnostics["propositions"] = n_propositions
 
     def _compute_modified_consequence_memberships(self):
 
+        self.consequence_keys = []
+        n_propositions = 0
+
         for rule in self.rules:
 
             rule.modified_consequence_memberships = {}
+            consequence_keys = {}
 
-            for premise in rule.consequence:
+            for fuzzyvar, modifiers, term in rule.parse_consequence():
 
-                if len(premise) == 2:
-                    fuzzyvar, term = premise
-                    modifiers = None
-                else:
-                    fuzzyvar = premise[0]
-                    term = premise[-1]
-                    modifiers = premise[1:-1]
+                if self.outputs is not None and fuzzyvar not in self.outputs:
+                    continue
 
-                rule.modified_consequence_memberships[fuzzyvar] = self.variables[
+                key = (fuzzyvar, modifiers, term)
+                consequence_keys[fuzzyvar] = key
+                rule.modified_consequence_memberships[
                     fuzzyvar
-                ].get_modified_membeship(term=term, modifiers=modifiers)
+                ] = self._get_modified_membership(key)
+                n_propositions += 1
+
+            self.consequence_keys.append(consequence_keys)
+
+        self.diagnostics["propositions"] += n_propositions
+        self.diagnostics["distinct_propositions"] = len(self.shared_memberships)
+
+    def _compute_relation(
+        self, premise_membership, consequence_membership, name=None
+    ) -> np.ndarray:
+        """Computes the fuzzy relation of the implication in the workspace buffer with the specified name, or in a scratch buffer."""
+
+        shape = (len(premise_membership), len(consequence_membership))
+        if name is None:
+            out = self.workspace.take(shape)
+        else:
+            out = self.workspace.get(name, shape)
+
+        return _IMPLICATIONS[self.implication_operator](
+            premise_membership.reshape((-1, 1)), consequence_membership, out=out
+        )
 
     def _compute_fuzzy_implication(self):
 
         #
-        # Implication operators
-        # See Kasabov, pag. 185
+        # Each distinct (premise, consequence) pair of propositions is
+        # computed once and shared by the rules. Crisp facts do not need the
+        # fuzzy relation (see _compute_fuzzy_composition). Without trace, the
+        # relations are computed in a scratch buffer when they are composed.
+        # Relations are keyed by the membership arrays, so interned variables
+        # with the same terms share them.
         #
-        Ra = lambda u, v: np.minimum(1, 1 - u + v)
-        Rm = lambda u, v: np.maximum(np.minimum(u, v), 1 - u)
-        Rc = lambda u, v: np.minimum(u, v)
-        Rb = lambda u, v: np.maximum(1 - u, v)
-        Rs = lambda u, v: np.where(u <= v, 1, 0)
-        Rg = lambda u, v: np.where(u <= v, 1, v)
-        Rsg = lambda u, v: np.minimum(Rs(u, v), Rg(1 - u, 1 - v))
-        Rgs = lambda u, v: np.minimum(Rg(u, v), Rs(1 - u, 1 - v))
-        Rgg = lambda u, v: np.minimum(Rg(u, v), Rg(1 - u, 1 - v))
-        Rss = lambda u, v: np.minimum(Rs(u, v), Rs(1 - u, 1 - v))
-
-        implication_fn = {
-            "Ra": Ra,
-            "Rm": Rm,
-            "Rc": Rc,
-            "Rb": Rb,
-            "Rs": Rs,
-            "Rg": Rg,
-            "Rsg": Rsg,
-            "Rgs": Rgs,
-            "Rgg": Rgg,
-            "Rss": Rss,
-        }[self.implication_operator]
+        self.shared_implications = {}
+        distinct_pairs = set()
+        n_pairs = 0
 
-        for rule in self.rules:
+        for i_rule, rule in enumerate(self.rules):
 
             rule.fuzzy_implications = {}
 
@@ -320,18 +738,45 @@ class DecompositionalInference:
 
                 for consequence_name in rule.modified_consequence_memberships.keys():
 
+                    key = (
+                        self.premise_keys[i_rule][premise_name],
+                        self.consequence_keys[i_rule][consequence_name],
+                    )
+                    n_pairs += 1
+                    distinct_pairs.add(key)
+
+                    if self.fact_types.get(premise_name) == "crisp" or not self.trace:
+                        continue
+
                     premise_membership = rule.modified_premise_memberships[premise_name]
                     consequence_membership = rule.modified_consequence_memberships[
                         consequence_name
                     ]
-                    V, U = np.meshgrid(consequence_membership, premise_membership)
+                    relation_key = (id(premise_membership), id(consequence_membership))
+
+                    if relation_key not in self.shared_implications.keys():
+                        self.shared_implications[relation_key] = self._compute_relation(
+                            premise_membership, consequence_membership
+                        )
+
                     rule.fuzzy_implications[
                         (premise_name, consequence_name)
-                    ] = implication_fn(U, V)
+                    ] = self.shared_implications[relation_key]
+
+        n_propositions = self.diagnostics["propositions"]
+        n_distinct = self.diagnostics["distinct_propositions"]
+        self.diagnostics["pairs"] = n_pairs
+        self.diagnostics["distinct_pairs"] = len(distinct_pairs)
+        self.diagnostics["deduplication_ratio"] = (n_propositions + n_pairs) / max(
+            1, n_distinct + len(distinct_pairs)
+        )
 
     def _compute_fuzzy_composition(self):
 
-        for rule in self.rules:
+        implication_fn = _IMPLICATIONS[self.implication_operator]
+        shared_compositions = {}
+
+        for i_rule, rule in enumerate(self.rules):
 
             rule.fuzzy_compositions = {}
 
@@ -339,72 +784,118 @@ class DecompositionalInference:
 
                 for consequence_name in rule.modified_consequence_memberships.keys():
 
-                    implication = rule.fuzzy_implications[
-                        (premise_name, consequence_name)
-                    ]
-                    fact_value = self.fact_values[premise_name]
-                    n_dim = len(fact_value)
-                    fact_value = fact_value.reshape((n_dim, 1))
-                    fact_value = np.tile(fact_value, (1, implication.shape[1]))
+                    premise_key = self.premise_keys[i_rule][premise_name]
+                    consequence_key = self.consequence_keys[i_rule][consequence_name]
+                    key = (premise_key, consequence_key)
 
-                    if self.composition_operator == "max-min":
-                        composition = np.minimum(fact_value, implication)
+                    if key not in shared_compositions.keys():
 
-                    if self.composition_operator == "max-prod":
-                        composition = fact_value * implication
+                        consequence_membership = rule.modified_consequence_memberships[
+                            consequence_name
+                        ]
+                        out = self.workspace.take(consequence_membership.shape)
+
+                        if self.fact_types.get(premise_name) == "crisp":
+                            if self.fact_in_universe[premise_name]:
+                                fuzzyvar, modifiers, term = premise_key
+                                degree = self.variables[
+                                    fuzzyvar
+                                ].get_modified_membership_at(
+                                    term=term,
+                                    value=self.fact_values[premise_name],
+                                    modifiers=modifiers,
+                                )
+                                implication_fn(degree, consequence_membership, out=out)
+                            else:
+                                out.fill(0)
+                        else:
+                            if self.trace:
+                                implication = rule.fuzzy_implications[
+                                    (premise_name, consequence_name)
+                                ]
+                            else:
+                                implication = self._compute_relation(
+                                    rule.modified_premise_memberships[premise_name],
+                                    consequence_membership,
+                                    name="implication",
+                                )
+                            self.backend.compose(
+                                fact=self.fact_values[premise_name],
+                                implication=implication,
+                                operator=self.composition_operator,
+                                out=out,
+                            )
+
+                        shared_compositions[key] = out
 
                     rule.fuzzy_compositions[
                         (premise_name, consequence_name)
-                    ] = composition.max(axis=0)
+                    ] = shared_compositions[key]
 
     def _combine_antecedents(self):
 
+        #
+        # Without trace, the premises of each rule are combined when the rule
+        # is aggregated (see _aggregate_rule_memberships), in one buffer per
+        # output variable shared by all the rules.
+        #
+        if not self.trace:
+            return
+
         for rule in self.rules:
 
             rule.combined_composition = {}
 
             for consequence_name in rule.modified_consequence_memberships.keys():
+                rule.combined_composition[
+                    consequence_name
+                ] = self._combine_rule_antecedents(rule, consequence_name)
 
-                combined_composition = None
+    def _combine_rule_antecedents(self, rule, consequence_name) -> np.ndarray:
+        """Combines the compositions of the premises of a rule for a consequence."""
 
-                for proposition in rule.premise:
+        combined_composition = None
 
-                    if combined_composition is None:
-                        combined_composition = rule.fuzzy_compositions[
-                            (proposition[0], consequence_name)
-                        ]
-                    else:
-                        other_composition = rule.fuzzy_compositions[
-                            (proposition[1], consequence_name)
-                        ]
+        for proposition in rule.premise:
+
+            if combined_composition is None:
+                combined_composition = rule.fuzzy_compositions[
+                    (proposition[0], consequence_name)
+                ]
+            else:
+                other_composition = rule.fuzzy_compositions[
+                    (proposition[1], consequence_name)
+                ]
 
-                        operator = proposition[0]
+                operator = proposition[0]
 
-                        if operator == "AND":
-                            operator = self.and_operator
+                if operator == "AND":
+                    operator = self.and_operator
 
-                        if operator == "OR":
-                            operator = self.or_operator
+                if operator == "OR":
+                    operator = self.or_operator
 
-                        operator_fn = {
-                            "min": minimum,
-                            "prod": product,
-                            "bunded_prod": bounded_prod,
-                            "drastic_prod": drastic_prod,
-                            "max": maximum,
-                            "prob_or": prob_or,
-                            "bounded_sum": bounded_sum,
-                            "drastic_sum": drastic_sum,
-                        }[operator]
+                if self.trace:
+                    out = self.workspace.take(combined_composition.shape)
+                else:
+                    out = self.workspace.get(
+                        ("combined", consequence_name), combined_composition.shape
+                    )
 
-                        combined_composition = operator_fn(
-                            [combined_composition, other_composition]
-                        )
+                combined_composition = self.backend.combine(
+                    [combined_composition, other_composition], operator, out=out
+                )
 
-                rule.combined_composition[consequence_name] = combined_composition
+        return combined_composition
 
     def _compute_rule_infered_cf(self):
 
+        if self.rulebase is not None:
+            infered_cf = self.rulebase.infered_cf(self.fact_cf, self.rule_ids)
+            for rule, rule_infered_cf in zip(self.rules, infered_cf):
+                rule.infered_cf = rule_infered_cf
+            return
+
         for rule in self.rules:
 
             aggregated_premise_cf = None
@@ -428,60 +919,66 @@ class DecompositionalInference:
 
             rule.infered_cf = aggregated_premise_cf * rule.rule_cf
 
-    def _collect_rule_memberships(self):
+    def _aggregate_rule_memberships(self):
+        """Computes the output fuzzy set of the inference system.
 
-        self.collected_rule_memberships = {}
+        The composition of each rule above its threshold is folded with the
+        production link into one accumulator per output variable, so memory
+        does not grow with the number of rules.
 
-        for i_rule, rule in enumerate(self.rules):
-
-            for key in rule.combined_composition.keys():
-
-                if key not in self.collected_rule_memberships.keys():
+        """
 
-                    self.collected_rule_memberships[key] = FuzzyVariable(
-                        universe_range=(
-                            min(self.variables[key].universe),
-                            max(self.variables[key].universe),
-                        )
-                    )
-                    self.collected_rule_memberships[key].universe = self.variables[
-                        key
-                    ].universe
+        aggregated_memberships = {}
 
-                if rule.infered_cf >= rule.threshold_cf:
+        for rule in self.rules:
 
-                    self.collected_rule_memberships[key].terms[
-                        "Rule-{}".format(i_rule)
-                    ] = rule.combined_composition[key]
+            fired = rule.infered_cf >= rule.threshold_cf
 
-    def _aggregate_collected_memberships(self):
-        """Computes the output fuzzy set of the inference system."""
+            for key in rule.modified_consequence_memberships.keys():
 
-        operator_fn = {
-            "min": minimum,
-            "prod": product,
-            "bunded_prod": bounded_prod,
-            "drastic_prod": drastic_prod,
-            "max": maximum,
-            "prob_or": prob_or,
-            "bounded_sum": bounded_sum,
-            "drastic_sum": drastic_sum,
-        }[self.production_link]
+                if key not in aggregated_memberships.keys():
+                    aggregated_memberships[key] = None
 
-        aggregated_memberships = {}
+                if not fired:
+                    continue
 
-        for key in self.collected_rule_memberships.keys():
+                if self.trace:
+                    combined_composition = rule.combined_composition[key]
+                else:
+                    combined_composition = self._combine_rule_antecedents(rule, key)
 
-            fuzzyvar = self.collected_rule_memberships[key]
-            memberships = [fuzzyvar.terms[term] for term in fuzzyvar.terms.keys()]
+                if aggregated_memberships[key] is None:
+                    aggregated_memberships[key] = self.workspace.get(
+                        ("aggregated", key), combined_composition.shape
+                    )
+                    np.copyto(aggregated_memberships[key], combined_composition)
+                else:
+                    self.backend.combine(
+                        [aggregated_memberships[key], combined_composition],
+                        self.production_link,
+                        out=aggregated_memberships[key],
+                    )
 
-            aggregated_memberships[key] = operator_fn(memberships)
+        for key in aggregated_memberships.keys():
+            if aggregated_memberships[key] is None:
+                aggregated_memberships[key] = self.workspace.get(
+                    ("aggregated", key), self.variables[key].universe.shape
+                )
+                aggregated_memberships[key].fill(0)
 
         self.aggregated_memberships = aggregated_memberships
 
     def _aggregate_production_cf(self):
         """Computes the output fuzzy set of the inference system."""
 
+        #
+        # The certainty factor of a rule base is aggregated over all its rules,
+        # including the ones skipped by _select_candidate_rules
+        #
+        if self.rulebase is not None:
+            self.infered_cf = self.rulebase.aggregated_cf(self.fact_cf, self.outputs)
+            return
+
         infered_cf = None
 
         for rule in self.rules:
@@ -498,25 +995,56 @@ class DecompositionalInference:
 
         for key in self.aggregated_memberships.keys():
 
-            self.defuzzificated_infered_memberships[key] = defuzzificate(
+            self.defuzzificated_infered_memberships[key] = self.backend.defuzzificate(
                 universe=self.variables[key].universe,
                 membership=self.aggregated_memberships[key],
                 operator=self.defuzzification_operator,
             )
 
+    def _release_intermediates(self):
+        """
+        Drops the intermediate results that are not needed after the call.
+
+        """
+        for rule in self.rules:
+            for name in (
+                "modified_premise_memberships",
+                "modified_consequence_memberships",
+                "fuzzy_implications",
+                "fuzzy_compositions",
+                "combined_composition",
+            ):
+                rule.__dict__.pop(name, None)
+
+        self.shared_memberships = {}
+        self.shared_implications = {}
+        self.premise_keys = []
+        self.consequence_keys = []
+
+        #
+        # Scratch buffers left by a previous call with trace (e.g., plot) or
+        # with more rules are not needed anymore
+        #
+        self.workspace.release(trim=True)
+
     def plot(self, variables, rules, **facts):
         def get_position():
             position = {name: i_name for i_name, name in enumerate(variables.keys())}
             return position
 
         # computation
-        self.__call__(variables, rules, **facts)
+        trace = self.trace
+        self.trace = True
+        try:
+            self._infer(variables, rules, None, facts)
+        finally:
+            self.trace = trace
 
         n_rows = len(self.rules) + 1
         n_variables = len(variables)
         position = get_position()
 
-        for i_rule, rule in enumerate(rules):
+        for i_rule, rule in enumerate(self.rules):
 
             #
             # Plot premises
@@ -541,7 +1069,7 @@ class DecompositionalInference:
                     i_rule * n_variables + i_col + 1,
                 )
 
-                view_xaxis = True if i_rule + 1 == len(rules) else False
+                view_xaxis = True if i_rule + 1 == len(self.rules) else False
                 title = varname if i_rule == 0 else None
 
                 if self.fact_types[varname] == "crisp":
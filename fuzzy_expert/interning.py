@@ -0,0 +1,128 @@
+"""
+Interning
+===============================================================================
+
+"""
+from __future__ import annotations
+
+import hashlib
+import weakref
+from typing import Callable, List
+
+import numpy as np
+import numpy.typing as npt
+
+
+class InternRegistry:
+    """Registry of read-only arrays shared by content.
+
+    Arrays with the same shape and values are stored once: `intern` returns the
+    array already registered with the same content, or registers a read-only
+    copy of the array. The rows of a matrix are shared the same way with
+    `intern_rows`, and arrays computed from a shared array (e.g., modified
+    memberships) with `derive`. The arrays are held by weak references, so they
+    are released when no object uses them.
+
+    >>> import numpy as np
+    >>> from fuzzy_expert.interning import InternRegistry
+    >>> registry = InternRegistry()
+    >>> a = registry.intern(np.linspace(0, 1, 11))
+    >>> b = registry.intern(np.linspace(0, 1, 11))
+    >>> a is b
+    True
+    >>> a.flags.writeable
+    False
+    >>> registry.hits, len(registry)
+    (1, 1)
+
+    """
+
+    def __init__(self) -> None:
+        self.arrays: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self.derived: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self.arrays)
+
+    def _key(self, array: np.ndarray) -> tuple:
+        """Returns the key of the content of a contiguous array of floats."""
+        digest = hashlib.blake2b(array.tobytes(), digest_size=16).digest()
+        return (array.shape, digest)
+
+    def intern(self, array: npt.ArrayLike) -> np.ndarray:
+        """Returns the shared read-only array with the content of the specified array.
+
+        :param array: Array of floats.
+
+        """
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        key = self._key(array)
+
+        interned = self.arrays.get(key)
+        if interned is not None and np.array_equal(interned, array):
+            self.hits += 1
+            return interned
+
+        self.misses += 1
+        interned = array.copy()
+        interned.flags.writeable = False
+        self.arrays[key] = interned
+        return interned
+
+    def intern_rows(self, matrix: np.ndarray) -> List[np.ndarray]:
+        """Returns the shared read-only arrays with the content of each row of an interned matrix.
+
+        :param matrix: Two-dimensional array returned by `intern`.
+
+        Rows with a new content are registered as views of the matrix, so no
+        memory is copied; the other rows are the arrays already registered.
+
+        """
+        rows: list = []
+        for row in matrix:
+            key = self._key(row)
+            interned = self.arrays.get(key)
+            if interned is not None and np.array_equal(interned, row):
+                self.hits += 1
+            else:
+                self.misses += 1
+                interned = row
+                self.arrays[key] = interned
+            rows.append(interned)
+        return rows
+
+    def derive(self, array: np.ndarray, tag: tuple, fn: Callable) -> np.ndarray:
+        """Returns the shared result of fn(array), computed once per content of the array and tag.
+
+        :param array: Contiguous array of floats.
+        :param tag: Hashable description of fn (e.g., a chain of hedges).
+        :param fn: Function computing an array of floats from the array.
+
+        """
+        key = (self._key(array), tag)
+        derived = self.derived.get(key)
+        if derived is not None:
+            self.hits += 1
+            return derived
+
+        derived = self.intern(fn(array))
+        self.derived[key] = derived
+        return derived
+
+    def clear(self) -> None:
+        """Forgets the registered arrays (the arrays in use are not modified)."""
+        self.arrays = weakref.WeakValueDictionary()
+        self.derived = weakref.WeakValueDictionary()
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the registered arrays in bytes."""
+        return sum(array.nbytes for array in self.arrays.values())
+
+
+#
+# Registry shared by all the fuzzy variables created with interned=True
+#
+registry = InternRegistry()
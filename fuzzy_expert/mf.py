@@ -6,28 +6,161 @@ Functions in this module returns a standard membership function specificaion as
 
 """
 from __future__ import annotations
-from typing import Tuple, List
+from typing import Tuple, List, Union
 import numpy as np
+import numpy.typing as npt
 
 
 ## pag. 27, FuzzyCLIPS
 
 
+# #############################################################################
+#
+#
+# Analytic formulas
+#
+#
+# #############################################################################
+
+
+def _gaussmf(x, center, sigma):
+    return np.exp(-((x - center) ** 2) / (2 * sigma))
+
+
+def _gbellmf(x, center, width, shape):
+    return 1 / (1 + np.abs((x - center) / width) ** (2 * shape))
+
+
+def _sigmf(x, center, width):
+    return 1 / (1 + np.exp(-np.abs(width) * (x - center)))
+
+
+def _smf(x, foot, shoulder):
+    return np.where(
+        x <= foot,
+        0.0,
+        np.where(
+            x <= (foot + shoulder) / 2,
+            2 * ((x - foot) / (shoulder - foot)) ** 2,
+            np.where(
+                x <= shoulder, 1 - 2 * ((x - shoulder) / (shoulder - foot)) ** 2, 1.0
+            ),
+        ),
+    )
+
+
+def _zmf(x, shoulder, feet):
+    return np.where(
+        x <= shoulder,
+        1.0,
+        np.where(
+            x <= (shoulder + feet) / 2,
+            1 - 2 * ((x - shoulder) / (feet - shoulder)) ** 2,
+            np.where(x <= feet, 2 * ((x - feet) / (feet - shoulder)) ** 2, 0.0),
+        ),
+    )
+
+
+def _pimf(x, left_feet, left_peak, right_peak, right_feet):
+    return np.minimum(_smf(x, left_feet, left_peak), _zmf(x, right_peak, right_feet))
+
+
+def _trapmf(x, left_feet, left_peak, right_peak, right_feet):
+    left_feet = np.where(left_feet == left_peak, left_feet - 1e-4, left_feet)
+    right_feet = np.where(right_feet == right_peak, right_feet + 1e-4, right_feet)
+    return np.maximum(
+        0.0,
+        np.minimum(
+            np.minimum((x - left_feet) / (left_peak - left_feet), 1.0),
+            (right_feet - x) / (right_feet - right_peak),
+        ),
+    )
+
+
+def _trimf(x, left_feet, peak, right_feet):
+    left_feet = np.where(left_feet == peak, left_feet - 1e-4, left_feet)
+    right_feet = np.where(peak == right_feet, right_feet + 1e-4, right_feet)
+    return np.maximum(
+        0.0,
+        np.minimum(
+            (x - left_feet) / (peak - left_feet), (right_feet - x) / (right_feet - peak)
+        ),
+    )
+
+
+_FORMULAS = {
+    "gaussmf": _gaussmf,
+    "gbellmf": _gbellmf,
+    "pimf": _pimf,
+    "sigmf": _sigmf,
+    "smf": _smf,
+    "trapmf": _trapmf,
+    "trimf": _trimf,
+    "zmf": _zmf,
+}
+
+#
+# Number of leading parameters of each function that are locations in the
+# universe of discourse (i.e., the points where the shape changes).
+#
+_N_KNOTS = {
+    "gaussmf": 1,
+    "gbellmf": 1,
+    "pimf": 4,
+    "sigmf": 1,
+    "smf": 2,
+    "trapmf": 4,
+    "trimf": 3,
+    "zmf": 2,
+}
+
+
+def _limits(fn: str, params: list, tol: float) -> List[float]:
+    #
+    # Limits of the part of the function where the membership is not within
+    # tol of 0 or 1.
+    #
+    if fn == "gaussmf":
+        center, sigma = params
+        delta = np.sqrt(-2 * sigma * np.log(tol))
+    elif fn == "gbellmf":
+        center, width, shape = params
+        delta = np.abs(width) * ((1 - tol) / tol) ** (1 / (2 * shape))
+    elif fn == "sigmf":
+        center, width = params
+        delta = np.log((1 - tol) / tol) / np.abs(width)
+    else:
+        return []
+    return [center - delta, center + delta]
+
+
 class MembershipFunction:
     """Membership function constructor.
 
     :param n_points: Number base point for building the approximations.
 
+    :param tol:
+        When specified, the points are placed adaptively instead of with a fixed
+        number of points: the segments between the knots are bisected until the
+        error of the linear interpolation with respect to the analytic formula is
+        less than `tol`, and the tails of the functions are replaced by their
+        asymptotic values where the membership is within `tol` of 0 or 1.
+
     >>> from fuzzy_expert.mf import MembershipFunction
     >>> mf = MembershipFunction(n_points=3)
     >>> mf(('gaussmf', 5, 1))
     [(2, 0), (3.0, 0.1353352832366127), (3.8, 0.48675225595997157), (4.6, 0.9231163463866356), (5.0, 1.0), (5.4, 0.9231163463866356), (6.2, 0.48675225595997157), (7.0, 0.1353352832366127), (8, 0)]
 
+    >>> mf = MembershipFunction(tol=0.05)
+    >>> len(mf(('gaussmf', 5, 1)))
+    9
+
 
     """
 
-    def __init__(self, n_points: int = 9):
+    def __init__(self, n_points: int = 9, tol: Union[float, None] = None):
         self.n_points: int = n_points
+        self.tol: Union[float, None] = tol
 
     def __call__(self, mfspec: tuple):
         """Generates a list of poinnts representing the membership function.
@@ -41,6 +174,9 @@ class MembershipFunction:
         """
         fn, *params = mfspec
 
+        if self.tol is not None and fn not in ("trapmf", "trimf"):
+            return self.adaptive((fn, *params))
+
         fn = {
             "gaussmf": self.gaussmf,
             "gbellmf": self.gbellmf,
@@ -54,6 +190,156 @@ class MembershipFunction:
 
         return fn(*params)
 
+    def evaluate(self, mfspec: tuple, x: npt.ArrayLike) -> np.ndarray:
+        """Evaluates the analytic formula of the membership function at the points x.
+
+        Unlike the point lists returned when the object is called, the values are
+        computed exactly, with a single vectorized pass over x.
+
+        :param mfspec: Membership function specification, e.g. ("gaussmf", 5, 1).
+        :param x: Points of the universe of discourse (a crisp value or an array).
+
+        >>> from fuzzy_expert.mf import MembershipFunction
+        >>> mf = MembershipFunction()
+        >>> mf.evaluate(('trimf', 1, 2, 4), [0, 1.5, 2, 3, 5])
+        array([0. , 0.5, 1. , 0.5, 0. ])
+
+        """
+        fn, *params = mfspec
+        return _FORMULAS[fn](np.asarray(x, dtype=np.float64), *params)
+
+    def evaluate_array(
+        self, fn: str, params: npt.ArrayLike, x: npt.ArrayLike
+    ) -> np.ndarray:
+        """Evaluates a family of membership functions with the same shape at the points x.
+
+        :param fn: Name of the membership function, e.g. "gaussmf".
+        :param params: Array with the parameters of each membership function in a row, in the order of the specification (e.g. [[center, sigma], ...]).
+        :param x: Points of the universe of discourse.
+
+        Returns an (n_functions x len(x)) array computed in a single vectorized pass.
+
+        >>> from fuzzy_expert.mf import MembershipFunction
+        >>> mf = MembershipFunction()
+        >>> mf.evaluate_array('trimf', [[1, 2, 4], [0, 1, 2]], [0, 1.5, 2, 3, 5])
+        array([[0. , 0.5, 1. , 0.5, 0. ],
+               [0. , 0.5, 0. , 0. , 0. ]])
+
+        """
+        params = np.asarray(params, dtype=np.float64)
+        x = np.asarray(x, dtype=np.float64).reshape((1, -1))
+        columns = [params[:, i_param, np.newaxis] for i_param in range(params.shape[1])]
+        values = _FORMULAS[fn](x, *columns)
+        return np.broadcast_to(values, (len(params), x.shape[1])).copy()
+
+    def evaluate_all(self, mfspecs: List[tuple], x: npt.ArrayLike) -> np.ndarray:
+        """Evaluates several membership functions at the points x.
+
+        :param mfspecs: List of membership function specifications.
+        :param x: Points of the universe of discourse.
+
+        Specifications with the same shape are evaluated together with
+        `evaluate_array`. Returns an (n_functions x len(x)) array.
+
+        >>> from fuzzy_expert.mf import MembershipFunction
+        >>> mf = MembershipFunction()
+        >>> mf.evaluate_all([('trimf', 1, 2, 4), ('smf', 0, 2), ('trimf', 0, 1, 2)], [0, 1, 2])
+        array([[0. , 0. , 1. ],
+               [0. , 0.5, 1. ],
+               [0. , 1. , 0. ]])
+
+        """
+        x = np.asarray(x, dtype=np.float64).reshape(-1)
+        values = np.empty((len(mfspecs), len(x)))
+
+        groups: dict = {}
+        for i_spec, (fn, *params) in enumerate(mfspecs):
+            groups.setdefault(fn, []).append((i_spec, params))
+
+        for fn, group in groups.items():
+            rows = [i_spec for i_spec, _ in group]
+            values[rows] = self.evaluate_array(fn, [params for _, params in group], x)
+
+        return values
+
+    def knots(self, mfspec: tuple) -> List[float]:
+        """Returns the points of the universe where the shape of the membership function changes.
+
+        :param mfspec: Membership function specification, e.g. ("gaussmf", 5, 1).
+
+        >>> from fuzzy_expert.mf import MembershipFunction
+        >>> mf = MembershipFunction()
+        >>> mf.knots(('trapmf', 1, 2, 3, 4))
+        [1, 2, 3, 4]
+
+        """
+        fn, *params = mfspec
+        return list(params[: _N_KNOTS[fn]])
+
+    def adaptive(self, mfspec: tuple) -> List[Tuple[float, float]]:
+        """Returns the fewest points approximating the membership function within the tolerance `tol`.
+
+        :param mfspec: Membership function specification, e.g. ("gaussmf", 5, 1).
+
+        The sampling starts with the knots and the limits of the non-constant
+        part of the function; each segment is bisected while the maximum
+        difference between the linear interpolation of its ends and the
+        analytic formula is more than `tol`. The maximum is searched on nine
+        evenly spaced points, refined around the largest one. The ends of the
+        sampling take the asymptotic values of the function.
+
+        >>> from fuzzy_expert.mf import MembershipFunction
+        >>> mf = MembershipFunction(tol=0.1)
+        >>> mf.adaptive(('smf', 0, 2))
+        [(0.0, 0.0), (0.5, 0.125), (1.0, 0.5), (1.5, 0.875), (2.0, 1.0)]
+
+        """
+        fn, *params = mfspec
+        tol = self.tol if self.tol is not None else 1e-3
+        formula = _FORMULAS[fn]
+
+        #
+        # Beyond the limits the function is within tol / 2 of its asymptotic
+        # values (0 or 1), which are pinned at the limits (as the fixed sampling
+        # does at center -/+ 3 sigma) so that the interpolation reaches them.
+        #
+        limits = _limits(fn, params, tol / 2)
+        xp = np.array(limits + self.knots(mfspec), dtype=np.float64)
+        xp = np.unique(xp)
+
+        def sample(x: np.ndarray) -> np.ndarray:
+            fp = formula(x, *params)
+            if limits:
+                fp[[0, -1]] = np.round(fp[[0, -1]])
+            return fp
+
+        def max_errors(x0, x1, f0, f1) -> np.ndarray:
+            #
+            # Maximum of the interpolation error in each segment: the best of
+            # nine evenly spaced points is refined by zooming three times on
+            # the interval between its neighbours
+            #
+            lo, hi = np.zeros_like(x0), np.ones_like(x0)
+            for _ in range(4):
+                t = lo + np.linspace(0, 1, 9)[:, np.newaxis] * (hi - lo)
+                xs = x0 + t * (x1 - x0)
+                errors = np.abs(formula(xs, *params) - (f0 + t * (f1 - f0)))
+                i_max = np.argmax(errors, axis=0)
+                i_seg = np.arange(len(x0))
+                lo = t[np.maximum(i_max - 1, 0), i_seg]
+                hi = t[np.minimum(i_max + 1, 8), i_seg]
+            return errors[i_max, i_seg]
+
+        for _ in range(64):
+            fp = sample(xp)
+            x0, x1, f0, f1 = xp[:-1], xp[1:], fp[:-1], fp[1:]
+            split = max_errors(x0, x1, f0, f1) > tol
+            if not split.any():
+                break
+            xp = np.sort(np.append(xp, (x0[split] + x1[split]) / 2))
+
+        return list(zip(xp.tolist(), sample(xp).tolist()))
+
     def gaussmf(self, center: float, sigma: float) -> List[Tuple[float, float]]:
         """Gaussian membership function.
 
@@ -7,7 +7,8 @@ from __future__ import annotations
 
 import numpy as np
 import numpy.typing as npt
-from typing import List
+from functools import lru_cache
+from typing import Callable, List, Tuple, Union
 
 # #############################################################################
 #
@@ -26,6 +27,8 @@ def apply_modifiers(membership: npt.ArrayLike, modifiers: List[str]) -> npt.Arra
 
     :param modifiers: List of modifiers or hedges.
 
+    Consecutive power hedges are applied as a single power (see `compile_modifiers`).
+
     >>> from fuzzy_expert.operators import apply_modifiers
     >>> x = [0.0, 0.25, 0.5, 0.75, 1]
     >>> apply_modifiers(x, ('not', 'very'))
@@ -35,28 +38,67 @@ def apply_modifiers(membership: npt.ArrayLike, modifiers: List[str]) -> npt.Arra
     if modifiers is None:
         return membership
 
-    fn = {
-        "EXTREMELY": extremely,
-        "INTENSIFY": intensify,
-        "MORE_OR_LESS": more_or_less,
-        "NORM": norm,
-        "NOT": not_,
-        "PLUS": plus,
-        "SLIGHTLY": slightly,
-        "SOMEWHAT": somewhat,
-        "VERY": very,
-    }
-
-    membership = membership.copy()
-    modifiers = list(modifiers)
-    modifiers.reverse()
-
-    for modifier in modifiers:
-        membership = fn[modifier.upper()](membership)
+    membership = np.array(membership)
+
+    for step in compile_modifiers(tuple(modifiers)):
+        if callable(step):
+            membership = step(membership)
+        else:
+            membership = np.power(membership, step)
 
     return membership
 
 
+def apply_modifiers_at(
+    membership: npt.ArrayLike, reference: npt.ArrayLike, modifiers: List[str]
+) -> npt.ArrayLike:
+    """
+    Apply a list of modifiers or hedges to membership values at points of a universe.
+
+    :param membership: Membership values at the points to be modified.
+
+    :param reference: Membership values on the whole universe.
+
+    :param modifiers: List of modifiers or hedges.
+
+    The hedges that normalize the membership (`norm` and `slightly`) divide each
+    value by the maximum of the reference and of the value, as if the point were
+    added to the universe; the other hedges are applied point-wise.
+
+    >>> from fuzzy_expert.operators import apply_modifiers_at
+    >>> apply_modifiers_at([0.25, 0.75], [0, 0.5, 0.25], ['very', 'norm'])
+    array([0.25, 1.  ])
+
+    """
+    membership = np.array(membership, dtype=np.float64)
+    reference = np.array(reference, dtype=np.float64)
+    pending: list = []
+
+    for modifier in reversed(modifiers):
+
+        if modifier.upper() not in ("NORM", "SLIGHTLY"):
+            pending.insert(0, modifier)
+            continue
+
+        membership = apply_modifiers(membership, pending)
+        reference = apply_modifiers(reference, pending)
+        pending = []
+
+        if modifier.upper() == "SLIGHTLY":
+            membership = _plus_or_not_very(membership)
+            reference = _plus_or_not_very(reference)
+
+        peak = np.max(reference)
+        membership = membership / np.maximum(peak, membership)
+        reference = reference / peak
+
+        if modifier.upper() == "SLIGHTLY":
+            membership = intensify(membership)
+            reference = intensify(reference)
+
+    return apply_modifiers(membership, pending)
+
+
 def extremely(membership: npt.ArrayLike) -> npt.ArrayLike:
     """
     Applies the element-wise function fn(u) = u^3.
@@ -186,13 +228,71 @@ def slightly(membership: npt.ArrayLike) -> npt.ArrayLike:
     array([0.        , 0.16326531, 0.99696182, 1.        , 0.        ])
 
     """
+    membership: npt.ArrayLike = _plus_or_not_very(membership)
+    membership: npt.ArrayLike = membership / np.max(membership)
+    return np.where(membership <= 0.5, membership ** 2, 1 - 2 * (1 - membership) ** 2)
+
+
+def _plus_or_not_very(membership: npt.ArrayLike) -> npt.ArrayLike:
+    """Applies `plus` where u < 1 - u^2 and `not very` elsewhere (first step of `slightly`)."""
     plus_membership: npt.ArrayLike = np.power(membership, 1.25)
     not_very_membership: npt.ArrayLike = 1 - np.power(membership, 2)
-    membership: npt.ArrayLike = np.where(
+    return np.where(
         membership < not_very_membership, plus_membership, not_very_membership
     )
-    membership: npt.ArrayLike = membership / np.max(membership)
-    return np.where(membership <= 0.5, membership ** 2, 1 - 2 * (1 - membership) ** 2)
+
+
+_MODIFIERS = {
+    "EXTREMELY": extremely,
+    "INTENSIFY": intensify,
+    "MORE_OR_LESS": more_or_less,
+    "NORM": norm,
+    "NOT": not_,
+    "PLUS": plus,
+    "SLIGHTLY": slightly,
+    "SOMEWHAT": somewhat,
+    "VERY": very,
+}
+
+_POWERS = {
+    "EXTREMELY": 3.0,
+    "MORE_OR_LESS": 0.5,
+    "PLUS": 1.25,
+    "SOMEWHAT": 1.0 / 3.0,
+    "VERY": 2.0,
+}
+
+
+@lru_cache(maxsize=None)
+def compile_modifiers(
+    modifiers: Tuple[str, ...]
+) -> Tuple[Union[float, Callable], ...]:
+    """
+    Compiles a chain of modifiers or hedges into the sequence of steps applied by `apply_modifiers`.
+
+    Modifiers are applied from right to left. Each run of consecutive power hedges
+    (`very`, `extremely`, `plus`, `somewhat`, `more_or_less`) is merged into a single
+    exponent; the remaining hedges are kept as functions.
+
+    :param modifiers: Tuple of modifiers or hedges.
+
+    >>> from fuzzy_expert.operators import compile_modifiers
+    >>> compile_modifiers(('very', 'extremely'))
+    (6.0,)
+    >>> compile_modifiers(('not', 'very', 'very'))[0]
+    4.0
+
+    """
+    steps: list = []
+    for modifier in reversed(modifiers):
+        modifier = modifier.upper()
+        if modifier in _POWERS and steps and not callable(steps[-1]):
+            steps[-1] *= _POWERS[modifier]
+        elif modifier in _POWERS:
+            steps.append(_POWERS[modifier])
+        else:
+            steps.append(_MODIFIERS[modifier])
+    return tuple(steps)
 
 
 # #############################################################################
@@ -204,11 +304,28 @@ def slightly(membership: npt.ArrayLike) -> npt.ArrayLike:
 # #############################################################################
 
 
-def prob_or(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
+def _stack(
+    memberships: Union[List[npt.ArrayLike], np.ndarray], axis: int
+) -> np.ndarray:
+    """Returns the memberships as an array with the reduction axis in front."""
+    return np.moveaxis(np.asarray(memberships), axis, 0)
+
+
+def prob_or(
+    memberships: Union[List[npt.ArrayLike], np.ndarray],
+    axis: int = 0,
+    out: Union[np.ndarray, None] = None,
+) -> npt.ArrayLike:
     """
     Applies the element-wise function fn(u, v) = u + v - u * v. Also known as algebraic-sum.
 
-    :param memberships: List of arrays of membership values.
+    The n-ary case is computed in closed form as 1 - prod(1 - u).
+
+    :param memberships: List of arrays of membership values, or an array of stacked memberships.
+
+    :param axis: Axis of the stacked memberships along which the operator is applied.
+
+    :param out: Optional array where the result is stored.
 
     >>> from fuzzy_expert.operators import prob_or
     >>> x = [0.1, 0.25, 0.5, 0.75, 0.3]
@@ -217,18 +334,27 @@ def prob_or(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
     array([0.1   , 0.8125, 0.75  , 0.8125, 0.3   ])
 
     """
-    result: npt.ArrayLike = np.array(memberships[0])
-    for membership in memberships[1:]:
-        membership = np.array(membership)
-        result: npt.ArrayLike = result + membership - result * membership
-    return np.maximum(0, np.minimum(1, result))
+    memberships = _stack(memberships, axis)
+    result: npt.ArrayLike = np.prod(1 - memberships, axis=0, out=out)
+    result: npt.ArrayLike = np.subtract(1, result, out=out)
+    return np.clip(result, 0, 1, out=out)
 
 
-def bounded_prod(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
+def bounded_prod(
+    memberships: Union[List[npt.ArrayLike], np.ndarray],
+    axis: int = 0,
+    out: Union[np.ndarray, None] = None,
+) -> npt.ArrayLike:
     """
     Applies the element-wise function max(0, u + v - 1).
 
-    :param memberships: List of arrays of membership values.
+    The n-ary case is computed in closed form as max(0, sum(u) - (n - 1)).
+
+    :param memberships: List of arrays of membership values, or an array of stacked memberships.
+
+    :param axis: Axis of the stacked memberships along which the operator is applied.
+
+    :param out: Optional array where the result is stored.
 
     >>> from fuzzy_expert.operators import bounded_prod
     >>> x = [0.1, 0.25, 0.5, 0.75, 1]
@@ -236,18 +362,25 @@ def bounded_prod(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
     array([0. , 0. , 0. , 0.5, 1. ])
 
     """
-    result: npt.ArrayLike = np.array(memberships[0])
-    for membership in memberships[1:]:
-        membership: npt.ArrayLike = np.array(membership)
-        result: npt.ArrayLike = np.maximum(0, result + membership - 1)
-    return result
+    memberships = _stack(memberships, axis)
+    result: npt.ArrayLike = np.sum(memberships, axis=0, out=out)
+    result: npt.ArrayLike = np.subtract(result, len(memberships) - 1, out=out)
+    return np.maximum(0, result, out=out)
 
 
-def bounded_sum(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
+def bounded_sum(
+    memberships: Union[List[npt.ArrayLike], np.ndarray],
+    axis: int = 0,
+    out: Union[np.ndarray, None] = None,
+) -> npt.ArrayLike:
     """
     Applies the element-wise function min(1, u + v).
 
-    :param memberships: List of arrays of membership values.
+    :param memberships: List of arrays of membership values, or an array of stacked memberships.
+
+    :param axis: Axis of the stacked memberships along which the operator is applied.
+
+    :param out: Optional array where the result is stored.
 
     >>> from fuzzy_expert.operators import bounded_sum
     >>> x = [0, 0.25, 0.5, 0.75, 1]
@@ -255,18 +388,24 @@ def bounded_sum(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
     array([0.  , 0.75, 1.  , 1.  , 1.  ])
 
     """
-    result: npt.ArrayLike = np.array(memberships[0])
-    for membership in memberships[1:]:
-        membership: npt.ArrayLike = np.array(membership)
-        result: npt.ArrayLike = np.minimum(1, result + membership)
-    return result
+    memberships = _stack(memberships, axis)
+    result: npt.ArrayLike = np.sum(memberships, axis=0, out=out)
+    return np.minimum(1, result, out=out)
 
 
-def bounded_diff(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
+def bounded_diff(
+    memberships: Union[List[npt.ArrayLike], np.ndarray],
+    axis: int = 0,
+    out: Union[np.ndarray, None] = None,
+) -> npt.ArrayLike:
     """
     Applies the element-wise function max(0, u - v).
 
-    :param memberships: List of arrays of membership values.
+    :param memberships: List of arrays of membership values, or an array of stacked memberships.
+
+    :param axis: Axis of the stacked memberships along which the operator is applied.
+
+    :param out: Optional array where the result is stored.
 
     >>> from fuzzy_expert.operators import bounded_diff
     >>> x = [0, 0.25, 0.5, 0.75, 1]
@@ -275,18 +414,25 @@ def bounded_diff(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
     array([0.  , 0.  , 0.  , 0.15, 0.3 ])
 
     """
-    result: npt.ArrayLike = np.array(memberships[0])
-    for membership in memberships[1:]:
-        membership = np.array(membership)
-        result: npt.ArrayLike = np.maximum(0, result - membership)
-    return result
+    memberships = _stack(memberships, axis)
+    result: npt.ArrayLike = np.sum(memberships[1:], axis=0, out=out)
+    result: npt.ArrayLike = np.subtract(memberships[0], result, out=out)
+    return np.maximum(0, result, out=out)
 
 
-def drastic_prod(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
+def drastic_prod(
+    memberships: Union[List[npt.ArrayLike], np.ndarray],
+    axis: int = 0,
+    out: Union[np.ndarray, None] = None,
+) -> npt.ArrayLike:
     """
     Applies the element-wise function f(u, v) = u if v == 0 else v if u == 1 else 0.
 
-    :param memberships: List of arrays of membership values.
+    :param memberships: List of arrays of membership values, or an array of stacked memberships.
+
+    :param axis: Axis of the stacked memberships along which the operator is applied.
+
+    :param out: Optional array where the result is stored.
 
 
     >>> from fuzzy_expert.operators import drastic_prod
@@ -296,22 +442,29 @@ def drastic_prod(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
     array([0., 0., 0., 0., 1.])
 
     """
-    result: npt.ArrayLike = np.array(memberships[0])
+    memberships = _stack(memberships, axis)
+    if out is None:
+        out = np.array(memberships[0], dtype=np.float64)
+    else:
+        np.copyto(out, memberships[0])
     for membership in memberships[1:]:
-        membership = np.array(membership)
-        result: npt.ArrayLike = np.where(
-            membership == np.float64(0),
-            result,
-            np.where(result == np.float64(1), membership, 0),
-        )
-    return result
+        np.copyto(out, np.where(out == 1, membership, 0), where=membership != 0)
+    return out
 
 
-def drastic_sum(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
+def drastic_sum(
+    memberships: Union[List[npt.ArrayLike], np.ndarray],
+    axis: int = 0,
+    out: Union[np.ndarray, None] = None,
+) -> npt.ArrayLike:
     """
     Applies the element-wise function f(u, v) = u if v == 0 else v if u == 0 else 1.
 
-    :param memberships: List of arrays of membership values.
+    :param memberships: List of arrays of membership values, or an array of stacked memberships.
+
+    :param axis: Axis of the stacked memberships along which the operator is applied.
+
+    :param out: Optional array where the result is stored.
 
     >>> from fuzzy_expert.operators import drastic_sum
     >>> x = [0.1, 0.25, 0.5, 0.75, 0.3]
@@ -320,21 +473,29 @@ def drastic_sum(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
     array([0.1, 1. , 1. , 1. , 0.3])
 
     """
-    result: npt.ArrayLike = memberships[0]
+    memberships = _stack(memberships, axis)
+    if out is None:
+        out = np.array(memberships[0], dtype=np.float64)
+    else:
+        np.copyto(out, memberships[0])
     for membership in memberships[1:]:
-        result: npt.ArrayLike = np.where(
-            membership == np.float64(0),
-            result,
-            np.where(result == np.float64(0), membership, 1),
-        )
-    return result
+        np.copyto(out, np.where(out == 0, membership, 1), where=membership != 0)
+    return out
 
 
-def product(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
+def product(
+    memberships: Union[List[npt.ArrayLike], np.ndarray],
+    axis: int = 0,
+    out: Union[np.ndarray, None] = None,
+) -> npt.ArrayLike:
     """
     Applies the element-wise function f(u, v) = u * v.
 
-    :param memberships: List of arrays of membership values.
+    :param memberships: List of arrays of membership values, or an array of stacked memberships.
+
+    :param axis: Axis of the stacked memberships along which the operator is applied.
+
+    :param out: Optional array where the result is stored.
 
     >>> from fuzzy_expert.operators import product
     >>> x = [0, 0.25, 0.5, 0.75, 1]
@@ -342,18 +503,22 @@ def product(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
     array([0.      , 0.015625, 0.125   , 0.421875, 1.      ])
 
     """
-    result: npt.ArrayLike = np.array(memberships[0])
-    for membership in memberships[1:]:
-        membership = np.array(membership)
-        result: npt.ArrayLike = result * membership
-    return result
+    return np.prod(memberships, axis=axis, out=out)
 
 
-def maximum(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
+def maximum(
+    memberships: Union[List[npt.ArrayLike], np.ndarray],
+    axis: int = 0,
+    out: Union[np.ndarray, None] = None,
+) -> npt.ArrayLike:
     """
     Applies the element-wise function f(u, v) = max(u, v).
 
-    :param memberships: List of arrays of membership values.
+    :param memberships: List of arrays of membership values, or an array of stacked memberships.
+
+    :param axis: Axis of the stacked memberships along which the operator is applied.
+
+    :param out: Optional array where the result is stored.
 
     >>> from fuzzy_expert.operators import maximum
     >>> x = [0.1, 0.25, 0.5, 0.75, 0.3]
@@ -361,19 +526,32 @@ def maximum(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
     >>> maximum([x, y])
     array([0.1 , 0.75, 0.5 , 0.75, 0.3 ])
 
+    Stacked memberships can be reduced along any axis, and the result can be
+    written into a preallocated array:
+
+    >>> import numpy as np
+    >>> out = np.zeros(2)
+    >>> _ = maximum(np.array([x, y]), axis=1, out=out)
+    >>> out
+    array([0.75, 0.75])
+
     """
-    result: npt.ArrayLike = np.array(memberships[0])
-    for membership in memberships[1:]:
-        membership = np.array(membership)
-        result: npt.ArrayLike = np.maximum(result, membership)
-    return result
+    return np.max(memberships, axis=axis, out=out)
 
 
-def minimum(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
+def minimum(
+    memberships: Union[List[npt.ArrayLike], np.ndarray],
+    axis: int = 0,
+    out: Union[np.ndarray, None] = None,
+) -> npt.ArrayLike:
     """
     Applies the element-wise function f(u, v) = min(u, v).
 
-    :param memberships: List of arrays of membership values.
+    :param memberships: List of arrays of membership values, or an array of stacked memberships.
+
+    :param axis: Axis of the stacked memberships along which the operator is applied.
+
+    :param out: Optional array where the result is stored.
 
     >>> from fuzzy_expert.operators import minimum
     >>> x = [0.1, 0.25, 0.5, 0.75, 0.3]
@@ -382,18 +560,16 @@ def minimum(memberships: List[npt.ArrayLike]) -> npt.ArrayLike:
     array([0.  , 0.25, 0.5 , 0.25, 0.  ])
 
     """
-    result: npt.ArrayLike = np.array(memberships[0])
-    for membership in memberships[1:]:
-        membership = np.array(membership)
-        result: npt.ArrayLike = np.minimum(result, membership)
-    return result
+    return np.min(memberships, axis=axis, out=out)
 
 
-def defuzzificate(universe, membership, operator="cog") -> dict:
+def defuzzificate(
+    universe: npt.ArrayLike, membership: npt.ArrayLike, operator: str = "cog"
+) -> Union[float, np.ndarray]:
     """Computes a representative crisp value for the fuzzy set.
 
     :param universe: Array of values representing the universe of discourse.
-    :param membership: Array of values representing the membership function.
+    :param membership: Array of values representing the membership function. A 2-D array (batch x universe) is defuzzificated row by row.
     :param operator: Method used for computing the crisp representative value of the fuzzy set.
 
         * `"cog"`: Center of gravity.
@@ -420,95 +596,102 @@ def defuzzificate(universe, membership, operator="cog") -> dict:
     >>> defuzzificate(u, m, "som")
     3
 
+    >>> defuzzificate(u, [m, [1, 1, 0, 0, 0]], "mom")
+    array([3.5, 0.5])
+
     """
 
     def cog():
 
-        n_areas = len(universe) - 1
-
-        areas = []
-        centroids = []
-
-        for i in range(n_areas):
-            base = universe[i + 1] - universe[i]
-            area_rect = np.minimum(membership[i], membership[i + 1]) * base
-            centr_rect = universe[i] + base / 2.0
-            if membership[i + 1] == membership[i]:
-                area_tria = 0
-                centr_tri = 0
-            elif membership[i + 1] > membership[i]:
-                area_tria = base * np.abs(membership[i + 1] - membership[i]) / 2.0
-                centr_tri = universe[i] + 2.0 / 3.0 * base
-            else:
-                area_tria = base * np.abs(membership[i + 1] - membership[i]) / 2.0
-                centr_tri = universe[i] + 1.0 / 3.0 * base
-
-            area = area_rect + area_tria
-            if area == np.float64(0):
-                centr = np.float64(0)
-            else:
-                centr = (area_rect * centr_rect + area_tria * centr_tri) / (
-                    area_rect + area_tria
-                )
-
-            areas.append(area)
-            centroids.append(centr)
-
-        num = sum([area * centroid for area, centroid in zip(areas, centroids)])
-        den = sum(areas)
-        return num / den
-
-    def boa():
-
-        n_areas = len(universe) - 1
-
-        areas = []
-
-        for i_area in range(n_areas):
-            base = universe[i_area + 1] - universe[i_area]
-            area = (membership[i_area] + membership[i_area + 1]) * base / 2.0
-            areas.append(area)
-
-        total_area = sum(areas)
-
-        target = total_area / 2.0
+        base = np.diff(universe)
+        left = membership[:, :-1]
+        right = membership[:, 1:]
+
+        area_rect = np.minimum(left, right) * base
+        centr_rect = universe[:-1] + base / 2.0
+        area_tria = base * np.abs(right - left) / 2.0
+        centr_tri = np.where(
+            right > left,
+            universe[:-1] + 2.0 / 3.0 * base,
+            universe[:-1] + 1.0 / 3.0 * base,
+        )
 
-        cum_area = 0
-        for i_area in range(n_areas):
-            cum_area += areas[i_area]
-            if cum_area >= target:
-                break
+        areas = area_rect + area_tria
+        with np.errstate(invalid="ignore", divide="ignore"):
+            centroids = np.where(
+                areas == np.float64(0),
+                np.float64(0),
+                (area_rect * centr_rect + area_tria * centr_tri) / areas,
+            )
+
+        #
+        # cumsum accumulates sequentially, as the pure Python sum does
+        #
+        num = np.cumsum(areas * centroids, axis=1)[:, -1]
+        den = np.cumsum(areas, axis=1)[:, -1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return num / den
 
-        xp = [universe[i_area], universe[i_area + 1]]
-        fp = [cum_area - areas[i_area], cum_area]
+    def boa():
 
-        return np.interp(target, xp=fp, fp=xp)
+        base = np.diff(universe)
+        areas = (membership[:, :-1] + membership[:, 1:]) * base / 2.0
+        cum_areas = np.cumsum(areas, axis=1)
+        target = cum_areas[:, -1:] / 2.0
+
+        #
+        # Index of the first interval where the cumulated area reaches the
+        # target (a row-wise searchsorted over the non decreasing cum_areas)
+        #
+        i_area = np.minimum(
+            np.sum(cum_areas < target, axis=1, keepdims=True), len(base) - 1
+        )
+        area = np.take_along_axis(areas, i_area, axis=1)
+        cum_area = np.take_along_axis(cum_areas, i_area, axis=1)
+        left = universe[i_area]
+        right = universe[i_area + 1]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = np.where(
+                target >= cum_area,
+                right,
+                left + (right - left) / area * (target - (cum_area - area)),
+            )
+        return result[:, 0]
+
+    def is_maximum():
+        return membership == np.max(membership, axis=1, keepdims=True)
 
     def mom():
-        maximum = np.max(membership)
-        maximum = np.array([u for u, m in zip(universe, membership) if m == maximum])
-        return np.mean(maximum)
+        mask = is_maximum()
+        return np.sum(np.where(mask, universe, 0), axis=1) / np.sum(mask, axis=1)
 
     def lom():
-        maximum = np.max(membership)
-        maximum = np.array([u for u, m in zip(universe, membership) if m == maximum])
-        return np.max(maximum)
+        mask = is_maximum()
+        return universe[-1 - np.argmax(mask[:, ::-1], axis=1)]
 
     def som():
-        maximum = np.max(membership)
-        maximum = np.array([u for u, m in zip(universe, membership) if m == maximum])
-        return np.min(maximum)
+        mask = is_maximum()
+        return universe[np.argmax(mask, axis=1)]
 
-    universe = np.array(universe)
-    membership = np.array(membership)
+    universe = np.asarray(universe)
+    membership = np.asarray(membership)
 
-    if np.sum(membership) == 0.0:
-        return np.mean(universe)
+    batched = membership.ndim == 2
+    membership = np.atleast_2d(membership)
 
-    return {
+    result = {
         "cog": cog,
         "boa": boa,
         "mom": mom,
         "lom": lom,
         "som": som,
     }[operator]()
+
+    empty = np.sum(membership, axis=1) == 0.0
+    if empty.any():
+        result = np.where(empty, np.mean(universe), result)
+
+    if batched:
+        return result
+    return result[0]
@@ -6,6 +6,13 @@ Zadeh-Mamdani Rules
 
 from __future__ import annotations
 
+import weakref
+
+#
+# Attributes that define the rule; setting them increases the version
+#
+_DEFINITION = ("premise", "consequence", "rule_cf", "threshold_cf")
+
 
 class FuzzyRule:
     """Creates a Zadeh-Mamdani fuzzy rule.
@@ -22,6 +29,12 @@ class FuzzyRule:
     :param threshold_cf:
         Minimum certainty factor for rule firing.
 
+    The `version` counter increases each time the premise, the consequence or
+    the certainty factors are set, so results cached for the rule can be
+    invalidated (lists modified in place must be assigned again). The rule bases
+    built with the rule are kept (as weak references) in `rulebases`, and their
+    `version` increases too.
+
     >>> from fuzzy_expert.rule import FuzzyRule
     >>> rule = FuzzyRule(
     ...     premise=[
@@ -49,10 +62,71 @@ class FuzzyRule:
         cf: float = 1.0,
         threshold_cf: float = 0,
     ):
+        self.rulebases: weakref.WeakSet = weakref.WeakSet()
         self.premise = premise
         self.consequence = consequence
         self.rule_cf: float = cf
         self.threshold_cf: float = threshold_cf
+        self.version: int = 0
+
+    def __setattr__(self, name, value):
+        if name in _DEFINITION:
+            object.__setattr__(self, "version", getattr(self, "version", 0) + 1)
+            for rulebase in getattr(self, "rulebases", ()):
+                rulebase.version += 1
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["rulebases"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.__dict__["rulebases"] = weakref.WeakSet()
+
+    def parse_premise(self) -> list:
+        """Returns the premise as a list of tuples (connective, variable, modifiers, term).
+
+        The connective of the first proposition is None, and modifiers is a
+        (possibly empty) tuple of hedges.
+
+        >>> from fuzzy_expert.rule import FuzzyRule
+        >>> rule = FuzzyRule(
+        ...     premise=[("score", "High"), ("OR", "ratio", "very", "Goodr")],
+        ...     consequence=[("decision", "Approve")],
+        ... )
+        >>> rule.parse_premise()
+        [(None, 'score', (), 'High'), ('OR', 'ratio', ('very',), 'Goodr')]
+
+        """
+        result: list = []
+        for i_proposition, proposition in enumerate(self.premise):
+            if i_proposition == 0:
+                connective = None
+            else:
+                connective, *proposition = proposition
+            result.append(
+                (connective, proposition[0], tuple(proposition[1:-1]), proposition[-1])
+            )
+        return result
+
+    def parse_consequence(self) -> list:
+        """Returns the consequence as a list of tuples (variable, modifiers, term).
+
+        >>> from fuzzy_expert.rule import FuzzyRule
+        >>> rule = FuzzyRule(
+        ...     premise=[("score", "High")],
+        ...     consequence=[("decision", "Approve")],
+        ... )
+        >>> rule.parse_consequence()
+        [('decision', (), 'Approve')]
+
+        """
+        return [
+            (proposition[0], tuple(proposition[1:-1]), proposition[-1])
+            for proposition in self.consequence
+        ]
 
     def __repr__(self):
 
@@ -0,0 +1,687 @@
+"""
+Rule bases
+===============================================================================
+
+"""
+from __future__ import annotations
+
+import itertools
+from typing import List, Union
+
+import numpy as np
+
+from fuzzy_expert.backend import OPERATORS
+from fuzzy_expert.rule import FuzzyRule
+
+#
+# Connective codes
+#
+NONE: int = -1
+FIRST: int = 0
+AND: int = 1
+OR: int = 2
+
+#
+# Connectives given as operator names (e.g., "prod") are coded from OPERATOR
+# on, in the order of fuzzy_expert.backend.OPERATORS
+#
+OPERATOR: int = 3
+
+_OPERATOR_NAMES = list(OPERATORS.keys())
+_CONNECTIVES = {None: FIRST, "AND": AND, "OR": OR}
+_CONNECTIVES.update(
+    {name: OPERATOR + i_name for i_name, name in enumerate(_OPERATOR_NAMES)}
+)
+
+#
+# Operators for which a rule with a zero premise contributes nothing to the
+# output fuzzy sets: the composition with "Rc" is zero, the AND operator keeps
+# it zero, and the production link ignores it.
+#
+_T_NORMS = ("min", "prod", "bounded_prod", "bunded_prod", "drastic_prod")
+_S_NORMS = ("max", "prob_or", "bounded_sum", "drastic_sum")
+
+
+def can_skip_rules(
+    and_operator: str, implication_operator: str, production_link: str
+) -> bool:
+    """Returns True when the rules that cannot fire can be skipped without changing the output fuzzy sets.
+
+    :param and_operator: AND operator of the inference engine.
+    :param implication_operator: Implication operator of the inference engine.
+    :param production_link: Production link of the inference engine.
+
+    >>> from fuzzy_expert.rulebase import can_skip_rules
+    >>> can_skip_rules("min", "Rc", "max")
+    True
+    >>> can_skip_rules("min", "Rm", "max")
+    False
+
+    """
+    return (
+        implication_operator == "Rc"
+        and and_operator in _T_NORMS
+        and production_link in _S_NORMS
+    )
+
+
+class RuleBase:
+    """Integer-coded, array-backed representation of a list of fuzzy rules.
+
+    :param rules:
+        List of fuzzy rules.
+
+    :param variables:
+        Dictionary of fuzzy variables used by the rules.
+
+    Propositions are stored as (n_rules x n_propositions) integer arrays padded
+    with -1: `premise_variables`, `premise_terms` and `premise_hedges` hold the
+    ids of the variable (position in `variable_names`), of the term (row in the
+    membership matrix of the variable) and of the chain of hedges (position in
+    `hedge_chains`); `connectives` holds `FIRST`, `AND` or `OR`, or `OPERATOR`
+    plus the position in `fuzzy_expert.backend.OPERATORS` for connectives given
+    as operator names (e.g., `"prod"`). The consequences are stored likewise,
+    and `cf` and `threshold_cf` are float arrays.
+
+    Each distinct (variable, term, hedges) proposition of the premises has an
+    id in `propositions`; `premise_propositions` maps the premises to them.
+
+    The terms of the variables are coded when the rule base is built; it must
+    be built again if the terms of the variables change. The `version` counter
+    increases each time one of the rules is modified (see
+    `fuzzy_expert.rule.FuzzyRule`), so results cached for the rule base are
+    dropped without visiting its rules; like for the terms, the rule base must
+    be built again to use the modified rules.
+
+    >>> from fuzzy_expert.rule import FuzzyRule
+    >>> from fuzzy_expert.rulebase import RuleBase
+    >>> from fuzzy_expert.variable import FuzzyVariable
+    >>> variables = {
+    ...     "score": FuzzyVariable(
+    ...         universe_range=(150, 200),
+    ...         terms={"High": [(175, 0), (190, 1)], "Low": [(155, 1), (175, 0)]},
+    ...     ),
+    ...     "decision": FuzzyVariable(
+    ...         universe_range=(0, 10),
+    ...         terms={"Approve": [(5, 0), (8, 1)], "Reject": [(2, 1), (5, 0)]},
+    ...     ),
+    ... }
+    >>> rules = [
+    ...     FuzzyRule(premise=[("score", "High")], consequence=[("decision", "Approve")]),
+    ...     FuzzyRule(premise=[("score", "very", "Low")], consequence=[("decision", "Reject")], cf=0.8),
+    ... ]
+    >>> rulebase = RuleBase(rules, variables)
+    >>> rulebase.premise_terms
+    array([[0],
+           [1]])
+    >>> rulebase.infered_cf({"score": 0.9})
+    array([0.9 , 0.72])
+    >>> rulebase.firing_degrees(and_operator="min", or_operator="max", score=160)
+    array([0.    , 0.5625])
+
+    """
+
+    def __init__(self, rules: List[FuzzyRule], variables: dict) -> None:
+
+        self.rules: List[FuzzyRule] = list(rules)
+        self.variables: dict = variables
+        self.version: int = 0
+        self.variable_names: list = list(variables.keys())
+        self.hedge_chains: list = [()]
+        self.propositions: list = []
+
+        for rule in self.rules:
+            rule.rulebases.add(self)
+
+        variable_ids: dict = {name: i for i, name in enumerate(self.variable_names)}
+        hedge_ids: dict = {(): 0}
+        proposition_ids: dict = {}
+
+        premises: list = [rule.parse_premise() for rule in self.rules]
+        consequences: list = [rule.parse_consequence() for rule in self.rules]
+
+        n_rules = len(self.rules)
+        n_premises = max([len(premise) for premise in premises], default=0)
+        n_consequences = max([len(cons) for cons in consequences], default=0)
+
+        self.premise_variables = np.full((n_rules, n_premises), NONE)
+        self.premise_terms = np.full((n_rules, n_premises), NONE)
+        self.premise_hedges = np.full((n_rules, n_premises), NONE)
+        self.premise_propositions = np.full((n_rules, n_premises), NONE)
+        self.connectives = np.full((n_rules, n_premises), NONE)
+        self.consequence_variables = np.full((n_rules, n_consequences), NONE)
+        self.consequence_terms = np.full((n_rules, n_consequences), NONE)
+        self.consequence_hedges = np.full((n_rules, n_consequences), NONE)
+
+        def code(fuzzyvar, modifiers, term):
+            if modifiers not in hedge_ids.keys():
+                hedge_ids[modifiers] = len(self.hedge_chains)
+                self.hedge_chains.append(modifiers)
+            return (
+                variable_ids[fuzzyvar],
+                self.variables[fuzzyvar].term_index[term],
+                hedge_ids[modifiers],
+            )
+
+        for i_rule, premise in enumerate(premises):
+            for i_prop, (connective, fuzzyvar, modifiers, term) in enumerate(premise):
+                key = code(fuzzyvar, modifiers, term)
+                if key not in proposition_ids.keys():
+                    proposition_ids[key] = len(self.propositions)
+                    self.propositions.append(key)
+                (
+                    self.premise_variables[i_rule, i_prop],
+                    self.premise_terms[i_rule, i_prop],
+                    self.premise_hedges[i_rule, i_prop],
+                ) = key
+                self.premise_propositions[i_rule, i_prop] = proposition_ids[key]
+                if connective not in _CONNECTIVES.keys():
+                    raise ValueError(
+                        "Unknown connective '{}' in rule {}".format(connective, i_rule)
+                    )
+                self.connectives[i_rule, i_prop] = _CONNECTIVES[connective]
+
+        for i_rule, consequence in enumerate(consequences):
+            for i_prop, (fuzzyvar, modifiers, term) in enumerate(consequence):
+                (
+                    self.consequence_variables[i_rule, i_prop],
+                    self.consequence_terms[i_rule, i_prop],
+                    self.consequence_hedges[i_rule, i_prop],
+                ) = code(fuzzyvar, modifiers, term)
+
+        self.cf = np.array([rule.rule_cf for rule in self.rules], dtype=np.float64)
+        self.threshold_cf = np.array(
+            [rule.threshold_cf for rule in self.rules], dtype=np.float64
+        )
+        self.premise_names: list = [
+            self.variable_names[i_var]
+            for i_var in np.unique(self.premise_variables)
+            if i_var != NONE
+        ]
+        self._output_rules: dict = {}
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def candidates(self, fact_values: dict) -> np.ndarray:
+        """Returns the ids of the rules that must be evaluated for the facts.
+
+        :param fact_values:
+            Dictionary with the value of the fact of each premise variable.
+
+        All the rules are candidates; subclasses narrow the selection.
+
+        """
+        return np.arange(len(self.rules))
+
+    def _fold_premises(
+        self,
+        values: np.ndarray,
+        connectives: np.ndarray,
+        and_fn,
+        or_fn,
+        apply_operators: bool = False,
+    ) -> Union[float, np.ndarray]:
+        """Combines the values of the premises (n_rules x n_premises x ...) with their connectives.
+
+        Connectives given as operator names are applied when `apply_operators` is
+        True; otherwise they keep the value of the previous premises, as the
+        certainty factors computed by the engine.
+
+        """
+        result = values[:, 0]
+
+        for i_prop in range(1, values.shape[1]):
+            connective = connectives[:, i_prop].reshape(
+                (-1,) + (1,) * (values.ndim - 2)
+            )
+            other = values[:, i_prop]
+            folded = np.where(
+                connective == AND,
+                and_fn(np.stack([result, other])),
+                np.where(connective == OR, or_fn(np.stack([result, other])), result),
+            )
+            if apply_operators:
+                for code in np.unique(connectives[:, i_prop]):
+                    if code >= OPERATOR:
+                        operator_fn = OPERATORS[_OPERATOR_NAMES[code - OPERATOR]]
+                        folded = np.where(
+                            connective == code,
+                            operator_fn(np.stack([result, other])),
+                            folded,
+                        )
+            result = folded
+
+        return result
+
+    def infered_cf(
+        self, fact_cf: dict, rule_ids: Union[np.ndarray, None] = None
+    ) -> np.ndarray:
+        """Computes the certainty factor inferred by each rule.
+
+        :param fact_cf:
+            Dictionary with the certainty factor of the fact of each premise variable. Values can be arrays for a batch of facts.
+
+        :param rule_ids:
+            Ids of the rules to evaluate. All the rules are evaluated by default.
+
+        Returns an array with one row per rule (and one column per fact for batches).
+
+        """
+        if rule_ids is None:
+            rule_ids = slice(None)
+        premise_variables = self.premise_variables[rule_ids]
+
+        names = [name for name in self.variable_names if name in fact_cf.keys()]
+        table = np.stack(
+            [np.asarray(fact_cf[name], dtype=np.float64) for name in names]
+        )
+        positions = np.full(len(self.variable_names), NONE)
+        for i_name, name in enumerate(names):
+            positions[self.variable_names.index(name)] = i_name
+
+        ids = positions[premise_variables]
+        if np.any((ids == NONE) & (premise_variables != NONE)):
+            missing = set(premise_variables[ids == NONE]) - {NONE}
+            raise KeyError([self.variable_names[i] for i in sorted(missing)])
+
+        values = table[ids]
+        aggregated = self._fold_premises(
+            values,
+            self.connectives[rule_ids],
+            and_fn=lambda u: np.min(u, axis=0),
+            or_fn=lambda u: np.max(u, axis=0),
+        )
+        cf = self.cf[rule_ids]
+        return aggregated * cf.reshape((-1,) + (1,) * (aggregated.ndim - 1))
+
+    def aggregated_cf(
+        self, fact_cf: dict, outputs: Union[List[str], None] = None
+    ) -> Union[float, None]:
+        """Computes the certainty factor of the rule base: the maximum of the certainty factors inferred by the rules.
+
+        :param fact_cf:
+            Dictionary with the certainty factor of the fact of each premise variable.
+
+        :param outputs:
+            Names of output variables. Only the rules with a consequence on them are used. All the rules are used by default.
+
+        When all the facts have the same certainty factor, the result is
+        computed from the maximum cf of the rules without evaluating them.
+
+        """
+        key = None if outputs is None else tuple(sorted(set(outputs)))
+
+        if key not in self._output_rules.keys():
+            if key is None:
+                rule_ids = np.arange(len(self.rules))
+            else:
+                output_ids = [self.variable_names.index(name) for name in key]
+                rule_ids = np.nonzero(
+                    np.any(np.isin(self.consequence_variables, output_ids), axis=1)
+                )[0]
+            max_cf = np.max(self.cf[rule_ids]) if len(rule_ids) > 0 else None
+            self._output_rules[key] = (rule_ids, max_cf)
+
+        rule_ids, max_cf = self._output_rules[key]
+
+        if max_cf is None:
+            return None
+
+        values = {fact_cf[name] for name in self.premise_names}
+        if len(values) == 1:
+            return values.pop() * max_cf
+
+        return np.max(self.infered_cf(fact_cf, rule_ids))
+
+    def proposition_degrees(self, **values) -> np.ndarray:
+        """Computes the membership of crisp values in each distinct premise proposition.
+
+        :param values:
+            Crisp value (or array of crisp values) of each premise variable.
+
+        Returns an array with one row per proposition in `propositions`.
+
+        """
+        degrees = []
+        for i_var, i_term, i_hedge in self.propositions:
+            name = self.variable_names[i_var]
+            fuzzyvar = self.variables[name]
+            term = {i: term for term, i in fuzzyvar.term_index.items()}[i_term]
+            degrees.append(
+                fuzzyvar.get_modified_membership_at(
+                    term=term, value=values[name], modifiers=self.hedge_chains[i_hedge]
+                )
+            )
+        return np.array(degrees, dtype=np.float64)
+
+    def firing_degrees(
+        self, and_operator: str, or_operator: str, **values
+    ) -> np.ndarray:
+        """Computes the degree of fulfillment of the premise of each rule for crisp inputs.
+
+        :param and_operator: AND operator (e.g. `"min"`, `"prod"`).
+        :param or_operator: OR operator (e.g. `"max"`, `"prob_or"`).
+        :param values: Crisp value (or array of crisp values) of each premise variable.
+
+        Each distinct proposition is evaluated once; the degrees of the rules
+        are then obtained with a gather and a fold over the premise positions.
+
+        """
+        degrees = self.proposition_degrees(**values)
+        return self._fold_premises(
+            degrees[self.premise_propositions],
+            self.connectives,
+            and_fn=OPERATORS[and_operator],
+            or_fn=OPERATORS[or_operator],
+            apply_operators=True,
+        )
+
+
+class GridRuleBase(RuleBase):
+    """Rule base whose premises form a grid over partitions of the input variables.
+
+    :param rules:
+        List of fuzzy rules.
+
+    :param variables:
+        Dictionary of fuzzy variables used by the rules.
+
+    Each rule premise must be a conjunction (AND) with one proposition for each
+    input variable, and the terms of each input variable must form a partition
+    where a term is zero beyond the peaks of its neighbours (e.g., triangular
+    partitions). A crisp input then lies between the peaks of at most two terms
+    of each variable, and only the rules in the (at most 2^d) matching cells of
+    the grid can fire. `candidates` finds them with a search over the term peaks
+    and a lookup of the cells, so its cost does not depend on the number of rules.
+
+    Rules outside the active cells are skipped by the engine only for the
+    operators where a rule with a zero premise contributes nothing to the output
+    fuzzy sets (see `can_skip_rules`); with other operators, all the rules are
+    evaluated. The certainty factor is always aggregated over all the rules (see
+    `aggregated_cf`). Fuzzy facts select every rule.
+
+    >>> from fuzzy_expert.rule import FuzzyRule
+    >>> from fuzzy_expert.rulebase import GridRuleBase
+    >>> from fuzzy_expert.variable import FuzzyVariable
+    >>> partition = {
+    ...     "Low": [(0, 1), (5, 0)],
+    ...     "Medium": [(0, 0), (5, 1), (10, 0)],
+    ...     "High": [(5, 0), (10, 1)],
+    ... }
+    >>> variables = {
+    ...     "x": FuzzyVariable(universe_range=(0, 10), terms=partition),
+    ...     "y": FuzzyVariable(universe_range=(0, 10), terms=partition),
+    ...     "z": FuzzyVariable(universe_range=(0, 10), terms=partition),
+    ... }
+    >>> rules = [
+    ...     FuzzyRule(premise=[("x", tx), ("AND", "y", ty)], consequence=[("z", tx)])
+    ...     for tx in partition.keys()
+    ...     for ty in partition.keys()
+    ... ]
+    >>> rulebase = GridRuleBase(rules, variables)
+    >>> rulebase.candidates({"x": 2.5, "y": 7.5})
+    array([1, 2, 4, 5])
+
+    """
+
+    def __init__(self, rules: List[FuzzyRule], variables: dict) -> None:
+
+        super().__init__(rules, variables)
+
+        if np.any(self.connectives > AND):
+            raise ValueError("Premises of a grid rule base must use only AND")
+
+        for chain in self.hedge_chains:
+            if any(modifier.upper() == "NOT" for modifier in chain):
+                raise ValueError("Hedge 'not' is not allowed in a grid rule base")
+
+        #
+        # Input variables of the grid
+        #
+        self.grid_variables: list = sorted(
+            set(self.premise_variables.flatten()) - {NONE}
+        )
+        n_dims = len(self.grid_variables)
+
+        #
+        # Terms of each input variable sorted by the position of their peaks
+        #
+        self.peaks: list = []
+        self.sorted_terms: list = []
+
+        for i_var in self.grid_variables:
+            fuzzyvar = self.variables[self.variable_names[i_var]]
+            memberships = fuzzyvar.memberships
+            is_peak = memberships == np.max(memberships, axis=1, keepdims=True)
+            peaks = (is_peak @ fuzzyvar.universe) / np.sum(is_peak, axis=1)
+            order = np.argsort(peaks, kind="stable")
+            peaks = peaks[order]
+
+            for i_sorted, i_term in enumerate(order):
+                lower = peaks[max(i_sorted - 1, 0)]
+                upper = peaks[min(i_sorted + 1, len(order) - 1)]
+                outside = (fuzzyvar.universe < lower) | (fuzzyvar.universe > upper)
+                if np.any(memberships[i_term][outside] > 0):
+                    raise ValueError(
+                        "Terms of variable '{}' are not a grid partition".format(
+                            self.variable_names[i_var]
+                        )
+                    )
+
+            self.peaks.append(peaks)
+            self.sorted_terms.append(order)
+
+        #
+        # Cells of the grid
+        #
+        self.cells: dict = {}
+
+        for i_rule in range(len(self.rules)):
+            cell = [NONE] * n_dims
+            for i_prop in range(self.premise_variables.shape[1]):
+                i_var = self.premise_variables[i_rule, i_prop]
+                if i_var == NONE:
+                    continue
+                i_dim = self.grid_variables.index(i_var)
+                if cell[i_dim] != NONE:
+                    raise ValueError(
+                        "Rule {} uses variable '{}' twice".format(
+                            i_rule, self.variable_names[i_var]
+                        )
+                    )
+                cell[i_dim] = self.premise_terms[i_rule, i_prop]
+            if NONE in cell:
+                raise ValueError(
+                    "Rule {} does not use all the input variables".format(i_rule)
+                )
+            self.cells.setdefault(tuple(cell), []).append(i_rule)
+
+    def candidates(self, fact_values: dict) -> np.ndarray:
+        """Returns the ids of the rules in the grid cells active for crisp facts.
+
+        :param fact_values:
+            Dictionary with the value of the fact of each premise variable.
+
+        """
+        active_terms: list = []
+
+        for i_dim, i_var in enumerate(self.grid_variables):
+            value = fact_values[self.variable_names[i_var]]
+            if not isinstance(value, (int, float, np.number)):
+                return super().candidates(fact_values)
+            peaks = self.peaks[i_dim]
+            i_left = np.searchsorted(peaks, value, side="right") - 1
+            positions = {min(max(i, 0), len(peaks) - 1) for i in (i_left, i_left + 1)}
+            active_terms.append([self.sorted_terms[i_dim][i] for i in positions])
+
+        rule_ids: list = []
+        for cell in itertools.product(*active_terms):
+            rule_ids += self.cells.get(tuple(cell), [])
+
+        return np.array(sorted(rule_ids), dtype=int)
+
+
+class IndexedRuleBase(RuleBase):
+    """Rule base with a spatial index over the supports of the rule premises.
+
+    :param rules:
+        List of fuzzy rules.
+
+    :param variables:
+        Dictionary of fuzzy variables used by the rules.
+
+    The support of a conjunctive premise is a hyper-rectangle: the intersection,
+    for each input variable, of the intervals where the modified memberships of
+    its propositions are positive. The endpoints of the supports split the axis
+    of each variable into slots, and each slot stores the ids of the rules whose
+    support covers it. For a crisp input, `candidates` locates the slot of each
+    value with a binary search, takes the shortest list of rules among the axes,
+    and keeps the rules whose hyper-rectangle contains the input point. Learned
+    rule bases use few distinct terms, so the number of slots stays small while
+    the number of rules grows.
+
+    Rules with an OR connective (or a connective given as an operator name) can
+    have non-rectangular supports and are always candidates, as are all the
+    rules for fuzzy facts. As in `GridRuleBase`, the
+    engine skips the other rules only when `can_skip_rules` holds.
+
+    >>> from fuzzy_expert.rule import FuzzyRule
+    >>> from fuzzy_expert.rulebase import IndexedRuleBase
+    >>> from fuzzy_expert.variable import FuzzyVariable
+    >>> variables = {
+    ...     "x": FuzzyVariable(
+    ...         universe_range=(0, 10),
+    ...         terms={"Low": [(0, 1), (4, 0)], "High": [(6, 0), (10, 1)]},
+    ...     ),
+    ...     "z": FuzzyVariable(
+    ...         universe_range=(0, 10),
+    ...         terms={"Low": [(0, 1), (4, 0)], "High": [(6, 0), (10, 1)]},
+    ...     ),
+    ... }
+    >>> rules = [
+    ...     FuzzyRule(premise=[("x", "Low")], consequence=[("z", "High")]),
+    ...     FuzzyRule(premise=[("x", "High")], consequence=[("z", "Low")]),
+    ... ]
+    >>> rulebase = IndexedRuleBase(rules, variables)
+    >>> rulebase.candidates({"x": 2.0})
+    array([0])
+    >>> rulebase.candidates({"x": 5.0})
+    array([], dtype=int64)
+
+    """
+
+    def __init__(self, rules: List[FuzzyRule], variables: dict) -> None:
+
+        super().__init__(rules, variables)
+
+        n_rules = len(self.rules)
+        n_variables = len(self.variable_names)
+
+        #
+        # Supports of the distinct propositions
+        #
+        supports: list = [self._support(*key) for key in self.propositions]
+
+        #
+        # Hyper-rectangles of the conjunctive premises
+        #
+        self.lower = np.full((n_rules, n_variables), -np.inf)
+        self.upper = np.full((n_rules, n_variables), np.inf)
+        self.unindexed = np.any(self.connectives > AND, axis=1)
+        self.unindexed_ids = np.nonzero(self.unindexed)[0]
+
+        for i_rule, i_prop in zip(*np.nonzero(self.premise_propositions != NONE)):
+            i_var = self.premise_variables[i_rule, i_prop]
+            lower, upper = supports[self.premise_propositions[i_rule, i_prop]]
+            self.lower[i_rule, i_var] = max(self.lower[i_rule, i_var], lower)
+            self.upper[i_rule, i_var] = min(self.upper[i_rule, i_var], upper)
+
+        #
+        # Slots of each axis: slot 2i is the open interval before the endpoint i,
+        # and slot 2i + 1 is the endpoint i
+        #
+        indexed = np.nonzero(~self.unindexed)[0]
+        self.endpoints: list = []
+        self.slots: list = []
+
+        for i_var in range(n_variables):
+            lower = self.lower[indexed, i_var]
+            upper = self.upper[indexed, i_var]
+            endpoints = np.unique(np.concatenate((lower, upper)))
+            endpoints = endpoints[np.isfinite(endpoints)]
+            if len(endpoints) == 0:
+                points = np.zeros(1)
+            else:
+                midpoints = (endpoints[:-1] + endpoints[1:]) / 2
+                points = np.empty(2 * len(endpoints) + 1)
+                points[0] = endpoints[0] - 1
+                points[1:-1:2] = endpoints
+                points[2:-1:2] = midpoints
+                points[-1] = endpoints[-1] + 1
+            covers = (lower <= points[:, np.newaxis]) & (points[:, np.newaxis] <= upper)
+            self.endpoints.append(endpoints)
+            self.slots.append([indexed[mask] for mask in covers])
+
+    def _support(self, i_var: int, i_term: int, i_hedge: int) -> tuple:
+        """Returns the interval where the modified membership of a proposition is positive."""
+
+        fuzzyvar = self.variables[self.variable_names[i_var]]
+        term = {i: term for term, i in fuzzyvar.term_index.items()}[i_term]
+        membership = fuzzyvar.get_modified_membeship(
+            term, list(self.hedge_chains[i_hedge])
+        )
+        positive = np.nonzero(membership > 0)[0]
+        if len(positive) == 0:
+            return np.inf, -np.inf
+
+        universe = fuzzyvar.universe
+        first, last = positive[0], positive[-1]
+        lower = -np.inf if first == 0 else universe[first - 1]
+        upper = np.inf if last == len(universe) - 1 else universe[last + 1]
+        return lower, upper
+
+    def candidates(self, fact_values: dict) -> np.ndarray:
+        """Returns the ids of the rules whose premise support contains the crisp facts.
+
+        :param fact_values:
+            Dictionary with the value of the fact of each premise variable.
+
+        """
+        point = np.full(len(self.variable_names), np.nan)
+        rule_ids = None
+
+        for i_var, name in enumerate(self.variable_names):
+            if name not in fact_values.keys():
+                continue
+            value = fact_values[name]
+            if not isinstance(value, (int, float, np.number)):
+                return super().candidates(fact_values)
+            point[i_var] = value
+            endpoints = self.endpoints[i_var]
+            i_endpoint = np.searchsorted(endpoints, value, side="left")
+            if i_endpoint < len(endpoints) and endpoints[i_endpoint] == value:
+                slot = self.slots[i_var][2 * i_endpoint + 1]
+            else:
+                slot = self.slots[i_var][
+                    min(2 * i_endpoint, len(self.slots[i_var]) - 1)
+                ]
+            if rule_ids is None or len(slot) < len(rule_ids):
+                rule_ids = slot
+
+        if rule_ids is None:
+            return super().candidates(fact_values)
+
+        known = ~np.isnan(point)
+        inside = np.all(
+            (self.lower[np.ix_(rule_ids, known)] <= point[known])
+            & (point[known] <= self.upper[np.ix_(rule_ids, known)]),
+            axis=1,
+        )
+        rule_ids = rule_ids[inside]
+        if len(self.unindexed_ids) > 0:
+            rule_ids = np.union1d(rule_ids, self.unindexed_ids)
+        return rule_ids.astype(int)
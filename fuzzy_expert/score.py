@@ -0,0 +1,340 @@
+"""
+Batch Scoring
+===============================================================================
+
+Scores the rows of a file with a fuzzy inference system, reading the file in
+chunks of rows and computing the chunks in a pool of worker processes, so the
+memory used does not depend on the size of the file.
+
+The model is a module (given by its import path or a path to a ``.py`` file)
+defining `variables`, `rules` and `model` (an inference engine). The input file
+has one column per premise variable, and can be a CSV file, a ``.npy`` file
+(with a structured array, or a 2-D array with the names of the columns given by
+`names`) read with memory mapping, or a Parquet file (requires pyarrow). The
+outputs and the certainty factor of each row are written, in the order of the
+input, to a CSV or Parquet file.
+
+.. code-block:: bash
+
+    $ python -m fuzzy_expert.score records.csv scores.csv --model loans.py --workers 8
+
+"""
+from __future__ import annotations
+
+import argparse
+import collections
+import importlib
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Union
+
+import numpy as np
+
+from fuzzy_expert.rulebase import RuleBase
+
+_WORKER: dict = {}
+
+
+def load_model(path: str) -> tuple:
+    """Returns the variables, the rules and the inference engine defined in a module.
+
+    :param path: Import path of the module (e.g. `"models.loans"`) or path to a ``.py`` file.
+
+    """
+    if path.endswith(".py"):
+        name = os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(path)
+    return module.variables, module.rules, module.model
+
+
+def premise_variables(rules) -> List[str]:
+    """Returns the names of the premise variables of the rules, in order of appearance."""
+
+    names: list = []
+    for rule in rules:
+        for _, fuzzyvar, _, _ in rule.parse_premise():
+            if fuzzyvar not in names:
+                names.append(fuzzyvar)
+    return names
+
+
+def read_chunks(
+    path: str,
+    chunk_size: int,
+    columns: Union[List[str], None] = None,
+    names: Union[List[str], None] = None,
+) -> Iterator[dict]:
+    """Reads a file in chunks of rows.
+
+    :param path: CSV (``.csv``), NumPy (``.npy``) or Parquet (``.parquet``) file.
+    :param chunk_size: Number of rows of each chunk.
+    :param columns: Columns to read (all the columns by default).
+    :param names: Names of the columns of a 2-D ``.npy`` file.
+
+    Yields dictionaries with an array of values for each column.
+
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".csv":
+        import pandas as pd
+
+        for df in pd.read_csv(path, usecols=columns, chunksize=chunk_size):
+            yield {name: df[name].to_numpy() for name in df.columns}
+
+    elif extension == ".npy":
+        array = np.load(path, mmap_mode="r")
+        if array.dtype.names is not None:
+            fields = {name: array[name] for name in array.dtype.names}
+        else:
+            if names is None or len(names) != array.shape[1]:
+                raise ValueError(
+                    "The names of the {} columns of {} must be given".format(
+                        array.shape[1], path
+                    )
+                )
+            fields = {name: array[:, i_col] for i_col, name in enumerate(names)}
+        if columns is not None:
+            fields = {name: fields[name] for name in columns}
+        for start in range(0, len(array), chunk_size):
+            yield {
+                name: np.array(values[start : start + chunk_size])
+                for name, values in fields.items()
+            }
+
+    elif extension == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet files requires pyarrow") from None
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield {
+                name: batch.column(name).to_numpy(zero_copy_only=False)
+                for name in batch.schema.names
+            }
+
+    else:
+        raise ValueError("Unsupported input file: {}".format(path))
+
+
+class _Writer:
+    """Appends chunks of results to a CSV or Parquet file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.extension = os.path.splitext(path)[1].lower()
+        if self.extension not in (".csv", ".parquet"):
+            raise ValueError("Unsupported output file: {}".format(path))
+        self.file = None
+
+    def write(self, results: dict) -> None:
+        import pandas as pd
+
+        df = pd.DataFrame(results)
+
+        if self.extension == ".csv":
+            if self.file is None:
+                self.file = open(self.path, "w", newline="")
+                df.to_csv(self.file, index=False)
+            else:
+                df.to_csv(self.file, index=False, header=False)
+        else:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Writing Parquet files requires pyarrow") from None
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.file is None:
+                self.file = pq.ParquetWriter(self.path, table.schema)
+            self.file.write_table(table)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+
+def _load_worker(model_path: str, cf_columns: dict, outputs) -> dict:
+    """Returns the state used for scoring chunks with the model."""
+
+    variables, rules, model = load_model(model_path)
+    if not isinstance(rules, RuleBase):
+        rules = RuleBase(rules, variables)
+    return dict(
+        variables=variables,
+        rules=rules,
+        model=model,
+        names=premise_variables(rules),
+        cf_columns=cf_columns,
+        outputs=outputs,
+    )
+
+
+def _init_worker(model_path: str, cf_columns: dict, outputs) -> None:
+    """Loads the model once in each worker process."""
+
+    _WORKER.update(_load_worker(model_path, cf_columns, outputs))
+
+
+def _score_chunk(chunk: dict, worker: Union[dict, None] = None) -> dict:
+    """Scores a chunk of rows with the model of the worker (the model of the process by default)."""
+
+    if worker is None:
+        worker = _WORKER
+    cf_columns = worker["cf_columns"]
+    input_values = {
+        name: (chunk[name], chunk[cf_columns[name]])
+        if name in cf_columns
+        else chunk[name]
+        for name in worker["names"]
+    }
+    outputs, infered_cf = worker["model"].evaluate_batch(
+        worker["variables"],
+        worker["rules"],
+        outputs=worker["outputs"],
+        **input_values,
+    )
+    n_rows = len(next(iter(chunk.values())))
+    return dict(outputs, cf=np.broadcast_to(infered_cf, (n_rows,)))
+
+
+def score_file(
+    input_path: str,
+    output_path: str,
+    model_path: str,
+    chunk_size: int = 8192,
+    workers: Union[int, None] = None,
+    max_in_flight: Union[int, None] = None,
+    cf_columns: Union[dict, None] = None,
+    outputs: Union[List[str], None] = None,
+    names: Union[List[str], None] = None,
+) -> dict:
+    """Scores the rows of a file and writes the results to another file.
+
+    :param input_path: Input file (see `read_chunks`).
+    :param output_path: Output CSV or Parquet file, with one column per output variable and a `"cf"` column.
+    :param model_path: Module defining `variables`, `rules` and `model` (see `load_model`).
+    :param chunk_size: Number of rows scored at once.
+    :param workers: Number of worker processes (all the cores by default). With 0, the chunks are scored in the current process.
+    :param max_in_flight: Maximum number of chunks read but not written (twice the number of workers by default). It bounds the memory used.
+    :param cf_columns: Optional dictionary with the name of the column holding the certainty factors of the facts of each variable.
+    :param outputs: Optional list with the names of the output variables to compute.
+    :param names: Names of the columns of a 2-D ``.npy`` input file.
+
+    Returns a dictionary with the number of `rows`, the elapsed `seconds` and the
+    throughput in `rows_per_sec`.
+
+    """
+    if cf_columns is None:
+        cf_columns = {}
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_in_flight is None:
+        max_in_flight = 2 * max(1, workers)
+
+    _, rules, _ = load_model(model_path)
+    columns = premise_variables(rules) + list(cf_columns.values())
+
+    start = time.perf_counter()
+    n_rows = 0
+    writer = _Writer(output_path)
+    initargs = (model_path, cf_columns, outputs)
+
+    try:
+        chunks = read_chunks(input_path, chunk_size, columns, names)
+
+        if workers == 0:
+            _init_worker(*initargs)
+            for chunk in chunks:
+                results = _score_chunk(chunk)
+                writer.write(results)
+                n_rows += len(results["cf"])
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=initargs
+            ) as executor:
+                pending: collections.deque = collections.deque()
+                for chunk in chunks:
+                    if len(pending) >= max_in_flight:
+                        results = pending.popleft().result()
+                        writer.write(results)
+                        n_rows += len(results["cf"])
+                    pending.append(executor.submit(_score_chunk, chunk))
+                while pending:
+                    results = pending.popleft().result()
+                    writer.write(results)
+                    n_rows += len(results["cf"])
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    return {
+        "rows": n_rows,
+        "seconds": seconds,
+        "rows_per_sec": n_rows / seconds if seconds > 0 else float("inf"),
+    }
+
+
+def main(argv: Union[List[str], None] = None) -> None:
+    """Command line entry point."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m fuzzy_expert.score",
+        description="Scores the rows of a CSV, NPY or Parquet file with a fuzzy inference system.",
+    )
+    parser.add_argument("input", help="input file (.csv, .npy or .parquet)")
+    parser.add_argument("output", help="output file (.csv or .parquet)")
+    parser.add_argument(
+        "--model",
+        required=True,
+        help="module or .py file defining variables, rules and model",
+    )
+    parser.add_argument("--chunk-size", type=int, default=8192)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="0 scores in the current process"
+    )
+    parser.add_argument("--max-in-flight", type=int, default=None)
+    parser.add_argument(
+        "--cf-column",
+        action="append",
+        default=[],
+        metavar="VARIABLE=COLUMN",
+        help="column with the certainty factors of a variable",
+    )
+    parser.add_argument(
+        "--outputs", nargs="+", default=None, help="output variables to compute"
+    )
+    parser.add_argument(
+        "--names", nargs="+", default=None, help="column names of a 2-D .npy file"
+    )
+    args = parser.parse_args(argv)
+
+    stats = score_file(
+        input_path=args.input,
+        output_path=args.output,
+        model_path=args.model,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        cf_columns=dict(item.split("=", 1) for item in args.cf_column),
+        outputs=args.outputs,
+        names=args.names,
+    )
+    print(
+        "{rows} rows in {seconds:.2f} s ({rows_per_sec:.0f} rows/sec)".format(**stats),
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+"""
+Scoring Server
+===============================================================================
+
+Lightweight HTTP server, built on the standard library, that scores JSON
+records with a fuzzy inference system. Concurrent requests are grouped in
+micro-batches that are computed with a single vectorized evaluation
+(`DecompositionalInference.evaluate_batch`) in a pool of threads or processes.
+
+The model is a module defining `variables`, `rules` and `model` (see
+`fuzzy_expert.score.load_model`); it is loaded and its rules are compiled into
+a `fuzzy_expert.rulebase.RuleBase` when the server starts.
+
+* ``POST /score``: the body is a record, or a list of records, with the value of
+  each premise variable given as a number or as a pair ``[value, cf]``. The
+  response has the outputs and the certainty factor (``"cf"``) of each record.
+
+* ``GET /metrics``: counters, latency and batch size histograms, and throughput,
+  in the Prometheus text format.
+
+* ``GET /health``: returns ``ok``.
+
+.. code-block:: bash
+
+    $ python -m fuzzy_expert.server --model loans.py --port 8000 --workers 4
+    $ curl -d '{"score": 190, "ratio": [0.39, 0.9], "credit": 1.5}' localhost:8000/score
+    {"decision": 8.010492631084489, "cf": 0.9}
+
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import functools
+import itertools
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Union
+
+import numpy as np
+
+from fuzzy_expert.score import _init_worker, _load_worker, _score_chunk
+
+_LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5]
+_BATCH_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds.
+
+    >>> from fuzzy_expert.server import Histogram
+    >>> histogram = Histogram([1, 5, 10])
+    >>> for value in [0.5, 3, 3, 20]:
+    ...     histogram.observe(value)
+    >>> histogram.cumulative_counts()
+    [1, 3, 3, 4]
+
+    """
+
+    def __init__(self, buckets: List[float]) -> None:
+        self.buckets: List[float] = list(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        """Adds a value to the histogram."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> List[int]:
+        """Returns the number of values less or equal than each bound (and the total)."""
+        return list(itertools.accumulate(self.counts))
+
+    def render(self, name: str) -> List[str]:
+        """Returns the lines of the histogram in the Prometheus text format."""
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        lines = ["# TYPE {} histogram".format(name)]
+        for bound, count in zip(bounds, self.cumulative_counts()):
+            lines.append('{}_bucket{{le="{}"}} {}'.format(name, bound, count))
+        lines.append("{}_sum {}".format(name, self.sum))
+        lines.append("{}_count {}".format(name, self.count))
+        return lines
+
+
+class Metrics:
+    """Counters and histograms of a scoring server."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.start: float = time.monotonic()
+        self.requests: int = 0
+        self.errors: int = 0
+        self.rows: int = 0
+        self.batches: int = 0
+        self.request_latency = Histogram(_LATENCY_BUCKETS)
+        self.batch_latency = Histogram(_LATENCY_BUCKETS)
+        self.batch_size = Histogram(_BATCH_BUCKETS)
+
+    def observe_request(self, seconds: float, error: bool = False) -> None:
+        """Records the latency of a request."""
+        with self.lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.request_latency.observe(seconds)
+
+    def observe_batch(self, n_rows: int, seconds: float) -> None:
+        """Records the size and the computing time of a batch."""
+        with self.lock:
+            self.batches += 1
+            self.rows += n_rows
+            self.batch_size.observe(n_rows)
+            self.batch_latency.observe(seconds)
+
+    def render(self) -> str:
+        """Returns the metrics in the Prometheus text format."""
+        with self.lock:
+            uptime = time.monotonic() - self.start
+            lines = [
+                "# TYPE fuzzy_expert_requests_total counter",
+                "fuzzy_expert_requests_total {}".format(self.requests),
+                "# TYPE fuzzy_expert_errors_total counter",
+                "fuzzy_expert_errors_total {}".format(self.errors),
+                "# TYPE fuzzy_expert_rows_total counter",
+                "fuzzy_expert_rows_total {}".format(self.rows),
+                "# TYPE fuzzy_expert_batches_total counter",
+                "fuzzy_expert_batches_total {}".format(self.batches),
+                "# TYPE fuzzy_expert_uptime_seconds gauge",
+                "fuzzy_expert_uptime_seconds {}".format(uptime),
+                "# TYPE fuzzy_expert_rows_per_second gauge",
+                "fuzzy_expert_rows_per_second {}".format(
+                    self.rows / uptime if uptime > 0 else 0.0
+                ),
+            ]
+            lines += self.request_latency.render("fuzzy_expert_request_latency_seconds")
+            lines += self.batch_latency.render("fuzzy_expert_batch_latency_seconds")
+            lines += self.batch_size.render("fuzzy_expert_batch_size")
+        return "\n".join(lines) + "\n"
+
+
+class _Request:
+    """Records of a request waiting to be scored."""
+
+    def __init__(self, columns: dict, n_rows: int) -> None:
+        self.columns = columns
+        self.n_rows = n_rows
+        self.future: Future = Future()
+
+
+class ScoringServer:
+    """HTTP server scoring JSON records in micro-batches.
+
+    :param model_path: Module defining `variables`, `rules` and `model` (see `fuzzy_expert.score.load_model`).
+    :param host: Address of the server.
+    :param port: Port of the server (0 selects a free port).
+    :param max_batch_size: Maximum number of records computed at once.
+    :param max_wait: Maximum time, in seconds, that the first request of a batch waits for other requests.
+    :param workers: Number of threads or processes computing the batches.
+    :param executor: `"thread"` or `"process"`.
+    :param outputs: Optional list with the names of the output variables to compute.
+    :param backlog: Maximum number of connections waiting to be accepted; bursts of clients beyond it are refused by the operating system.
+
+    >>> from fuzzy_expert.server import ScoringServer
+    >>> server = ScoringServer("loans.py", port=8000)  # doctest: +SKIP
+    >>> server.serve_forever()  # doctest: +SKIP
+
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        max_batch_size: int = 256,
+        max_wait: float = 0.005,
+        workers: int = 1,
+        executor: str = "thread",
+        outputs: Union[List[str], None] = None,
+        backlog: int = 1024,
+    ) -> None:
+
+        if executor not in ("thread", "process"):
+            raise ValueError("Unknown executor: {}".format(executor))
+
+        self.max_batch_size: int = max_batch_size
+        self.max_wait: float = max_wait
+        self.metrics = Metrics()
+        self.serving: bool = False
+
+        #
+        # CF of the facts are always given, in the column "<variable>.cf"
+        #
+        self.worker: dict = _load_worker(model_path, {}, outputs)
+        self.names: List[str] = self.worker["names"]
+        self.worker["cf_columns"] = {name: name + ".cf" for name in self.names}
+        initargs = (model_path, self.worker["cf_columns"], outputs)
+
+        #
+        # The listen backlog is read when the socket is activated (the default
+        # of socketserver is 5 connections)
+        #
+        self.httpd = ThreadingHTTPServer(
+            (host, port), _Handler, bind_and_activate=False
+        )
+        self.httpd.request_queue_size = backlog
+        self.httpd.daemon_threads = True
+        self.httpd.scoring_server = self
+        try:
+            self.httpd.server_bind()
+            self.httpd.server_activate()
+        except OSError:
+            self.httpd.server_close()
+            raise
+
+        #
+        # Threads and processes are started once the socket is listening, so
+        # a bind failure leaves nothing running
+        #
+        if executor == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+            self.score_fn = functools.partial(_score_chunk, worker=self.worker)
+        else:
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=initargs
+            )
+            self.score_fn = _score_chunk
+
+        self.queue: queue.Queue = queue.Queue()
+        self.batcher = threading.Thread(target=self._run_batcher, daemon=True)
+        self.batcher.start()
+
+
+    @property
+    def server_address(self) -> tuple:
+        """Address (host, port) where the server listens."""
+        return self.httpd.server_address
+
+    def serve_forever(self) -> None:
+        """Handles requests until `shutdown` is called."""
+        self.serving = True
+        self.httpd.serve_forever()
+
+    def start(self) -> threading.Thread:
+        """Handles requests in a background thread."""
+        self.serving = True
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self) -> None:
+        """Stops the server, the batcher and the workers."""
+        #
+        # socketserver waits for the end of serve_forever, which never
+        # returns if it was not called
+        #
+        if self.serving:
+            self.httpd.shutdown()
+        self.httpd.server_close()
+        self.queue.put(None)
+        self.batcher.join()
+        self.executor.shutdown()
+
+    def parse_records(self, records: Union[dict, list]) -> tuple:
+        """Returns the columns of values and certainty factors of the records.
+
+        :param records: Record, or list of records, with a number or a pair [value, cf] for each premise variable.
+
+        Raises ValueError when a record is not valid.
+
+        """
+        if isinstance(records, dict):
+            records = [records]
+        if not isinstance(records, list) or not records:
+            raise ValueError("Expected a record or a non-empty list of records")
+
+        columns: dict = {}
+        for name in self.names:
+            values, cfs = [], []
+            for record in records:
+                if not isinstance(record, dict) or name not in record:
+                    raise ValueError("Missing variable: {}".format(name))
+                value = record[name]
+                if isinstance(value, list) and len(value) == 2:
+                    value, cf = value
+                else:
+                    cf = 1.0
+                if not all(
+                    isinstance(item, (int, float)) and not isinstance(item, bool)
+                    for item in (value, cf)
+                ):
+                    raise ValueError("Invalid value for variable: {}".format(name))
+                if not 0 <= cf <= 1:
+                    raise ValueError(
+                        "Certainty factor out of [0, 1] for variable: {}".format(name)
+                    )
+                values.append(value)
+                cfs.append(cf)
+            columns[name] = np.array(values, dtype=np.float64)
+            columns[name + ".cf"] = np.array(cfs, dtype=np.float64)
+
+        return columns, len(records)
+
+    def submit(self, records: Union[dict, list]) -> Future:
+        """Queues the records for the next batch.
+
+        Returns a future with the list of results of the records.
+
+        """
+        columns, n_rows = self.parse_records(records)
+        request = _Request(columns, n_rows)
+        self.queue.put(request)
+        return request.future
+
+    def _run_batcher(self) -> None:
+        """Groups the queued requests in batches and sends them to the workers."""
+
+        while True:
+            request = self.queue.get()
+            if request is None:
+                return
+
+            batch = [request]
+            n_rows = request.n_rows
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+
+            while n_rows < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                n_rows += request.n_rows
+
+            self._dispatch(batch, n_rows)
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[_Request], n_rows: int) -> None:
+        """Computes a batch of requests in the pool."""
+
+        chunk = {
+            name: np.concatenate([request.columns[name] for request in batch])
+            for name in batch[0].columns.keys()
+        }
+        start = time.monotonic()
+
+        def done(future: Future) -> None:
+            self.metrics.observe_batch(n_rows, time.monotonic() - start)
+            try:
+                results = future.result()
+            except Exception as error:
+                for request in batch:
+                    request.future.set_exception(error)
+                return
+
+            results = {
+                name: np.asarray(value).tolist() for name, value in results.items()
+            }
+            position = 0
+            for request in batch:
+                request.future.set_result(
+                    [
+                        {name: value[i_row] for name, value in results.items()}
+                        for i_row in range(position, position + request.n_rows)
+                    ]
+                )
+                position += request.n_rows
+
+        self.executor.submit(self.score_fn, chunk).add_done_callback(done)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Handler of the requests to a scoring server."""
+
+    def _send(self, status: int, body: str, content_type: str) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status: int, body) -> None:
+        self._send(status, json.dumps(body), "application/json")
+
+    def do_GET(self) -> None:
+        server = self.server.scoring_server
+        if self.path == "/metrics":
+            self._send(200, server.metrics.render(), "text/plain; version=0.0.4")
+        elif self.path == "/health":
+            self._send(200, "ok\n", "text/plain")
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        server = self.server.scoring_server
+        if self.path != "/score":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        start = time.monotonic()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            records = json.loads(self.rfile.read(length))
+            results = server.submit(records).result()
+        except ValueError as error:
+            server.metrics.observe_request(time.monotonic() - start, error=True)
+            self._send_json(400, {"error": str(error)})
+            return
+        except Exception as error:
+            server.metrics.observe_request(time.monotonic() - start, error=True)
+            self._send_json(500, {"error": str(error)})
+            return
+
+        server.metrics.observe_request(time.monotonic() - start)
+        self._send_json(200, results if isinstance(records, list) else results[0])
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def main(argv: Union[List[str], None] = None) -> None:
+    """Command line entry point."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m fuzzy_expert.server",
+        description="Serves a fuzzy inference system over HTTP.",
+    )
+    parser.add_argument(
+        "--model",
+        required=True,
+        help="module or .py file defining variables, rules and model",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument(
+        "--outputs", nargs="+", default=None, help="output variables to compute"
+    )
+    parser.add_argument(
+        "--backlog",
+        type=int,
+        default=1024,
+        help="maximum number of connections waiting to be accepted",
+    )
+    args = parser.parse_args(argv)
+
+    server = ScoringServer(
+        model_path=args.model,
+        host=args.host,
+        port=args.port,
+        max_batch_size=args.max_batch_size,
+        max_wait=args.max_wait_ms / 1000,
+        workers=args.workers,
+        executor=args.executor,
+        outputs=args.outputs,
+        backlog=args.backlog,
+    )
+    host, port = server.server_address[:2]
+    print("Serving on http://{}:{}".format(host, port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
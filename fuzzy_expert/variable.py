@@ -5,15 +5,61 @@ Fuzzy Variables
 """
 from __future__ import annotations
 
+from collections.abc import MutableMapping
 from typing import List, Union
 
 import numpy as np
+import numpy.typing as npt
 
+from fuzzy_expert.interning import registry
 from fuzzy_expert.mf import MembershipFunction
-from fuzzy_expert.operators import apply_modifiers
+from fuzzy_expert.operators import apply_modifiers, apply_modifiers_at
 from fuzzy_expert.plots import plot_crisp_input, plot_fuzzy_input, plot_fuzzy_variable
 
 
+def _interp_rows(x: npt.ArrayLike, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """Linear interpolation of each row of fp (n_rows x len(xp)) at the points x.
+
+    Equivalent to calling np.interp(x, xp, row) for every row, but computed with
+    a single search over xp and a gather of the neighbouring columns.
+
+    """
+    x = np.clip(x, xp[0], xp[-1])
+    j = np.searchsorted(xp, x, side="right") - 1
+    k = np.minimum(j + 1, len(xp) - 1)
+    dx = xp[k] - xp[j]
+    dy = fp[:, k] - fp[:, j]
+    slope = np.divide(dy, dx, out=np.zeros(dy.shape), where=dx > 0)
+    return slope * (x - xp[j]) + fp[:, j]
+
+
+class _Terms(MutableMapping):
+    """Dictionary-like access to the rows of the membership matrix of a fuzzy variable."""
+
+    def __init__(self, variable: FuzzyVariable) -> None:
+        self._variable = variable
+
+    def __getitem__(self, term: str) -> np.ndarray:
+        if self._variable.interned:
+            return self._variable.rows[term]
+        return self._variable.memberships[self._variable.term_index[term]]
+
+    def __setitem__(self, term: str, membership: npt.ArrayLike) -> None:
+        self._variable._set_rows({term: membership})
+
+    def __delitem__(self, term: str) -> None:
+        self._variable._delete_row(term)
+
+    def __iter__(self):
+        return iter(self._variable.term_index)
+
+    def __len__(self) -> int:
+        return len(self._variable.term_index)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
 class FuzzyVariable:
     """Creates a fuzzy variable.
 
@@ -26,6 +72,15 @@ class FuzzyVariable:
     :param step:
         Value controling the resolution for the discrete representation of the universe.
 
+    :param analytic_mf:
+        When True, terms specified as functions (e.g. `("gaussmf", 175, 5)`) are evaluated with their analytic formula directly on the universe, instead of being sampled as a list of points and interpolated.
+
+    :param mf_tol:
+        When specified, terms specified as functions are sampled with the fewest points that keep the interpolation error less than `mf_tol` (see `MembershipFunction`).
+
+    :param interned:
+        When True, the universe, the membership matrix, the membership of each term and the modified memberships are shared (as read-only arrays) with the other interned variables with the same content. Terms with the same values share their arrays (and their modified memberships) even when the variables have other terms. The arrays are copied before being modified.
+
     >>> from fuzzy_expert.variable import FuzzyVariable
     >>> v = FuzzyVariable(
     ...     universe_range=(150, 200),
@@ -40,6 +95,11 @@ class FuzzyVariable:
         :width: 350px
         :align: center
 
+    The memberships of all terms are stored as the rows of a single
+    (n_terms x n_universe) array, `memberships`, and `term_index` maps each
+    term to its row. The `terms` attribute gives dictionary-style access to the rows.
+    The `version` counter increases each time the universe or the terms change.
+
     """
 
     def __init__(
@@ -47,43 +107,157 @@ class FuzzyVariable:
         universe_range: tuple[float, float],
         terms: Union[dict, None] = None,
         step: float = 0.1,
+        analytic_mf: bool = False,
+        mf_tol: Union[float, None] = None,
+        interned: bool = False,
     ) -> None:
 
         if terms is None:
             terms: dict = {}
         self.universe_range: tuple[int, int] = universe_range
-        self.terms: dict = terms
+        self.step: float = step
+        self.version: int = 0
+        self.analytic_mf: bool = analytic_mf
+        self.mf_tol: Union[float, None] = mf_tol
+        self.interned: bool = interned
+        self.mfspecs: dict = {}
 
         self.min_u, self.max_u = universe_range
         num = int((self.max_u - self.min_u) / step) + 1
         self.universe = np.linspace(start=self.min_u, stop=self.max_u, num=num)
 
-        for term in terms.keys():
-            self.__setitem__(term, terms[term])
+        self.memberships: np.ndarray = np.empty((0, num))
+        self.term_index: dict = {}
+        self.rows: dict = {}
+        self.modified_memberships: dict = {}
+        self.terms: _Terms = _Terms(self)
+
+        self.set_terms(terms)
 
     def __setitem__(self, term: str, membership: Union[tuple, list]) -> None:
         """Sets the membership function values for the specified fuzzy set."""
 
-        if isinstance(membership, tuple):
-            self._set_term_from_tuple(term=term, membership=membership)
-        if isinstance(membership, list):
-            self._set_term_from_list(term=term, membership=membership)
+        self.set_terms({term: membership})
 
-    def _set_term_from_tuple(self, term: str, membership: type) -> None:
-        """Sets the membership of a term when it is specified as a function"""
+    def set_terms(self, terms: dict) -> None:
+        """Sets the membership functions of several terms at once.
 
-        mf = MembershipFunction()
-        self._set_term_from_list(term=term, membership=mf(membership))
+        The breakpoints of all the terms are added to the universe in a single
+        step, and each term is interpolated only once on the final universe.
 
-    def _set_term_from_list(
-        self, term: str, membership: list[tuple[float, float]]
-    ) -> None:
-        """Sets the membership of a term when it is specified as a function"""
+        :param terms:
+            Dictionary where each term is the key of the dictionary, and the values is the membership function.
+
+        >>> from fuzzy_expert.variable import FuzzyVariable
+        >>> v = FuzzyVariable(universe_range=(0, 1), step=0.5)
+        >>> v.set_terms({"Low": [(0, 1), (0.25, 0)], "High": ("trimf", 0.5, 1, 1)})
+        >>> v.universe
+        array([0.  , 0.25, 0.5 , 1.  ])
+        >>> v["Low"]
+        array([1., 0., 0., 0.])
+
+        """
+        mf = MembershipFunction(tol=self.mf_tol)
+
+        points: dict = {}
+        mfspecs: dict = {}
+
+        for term, membership in terms.items():
+
+            self.mfspecs.pop(term, None)
+
+            if isinstance(membership, tuple) and self.analytic_mf:
+                mfspecs[term] = membership
+                continue
+
+            if isinstance(membership, tuple):
+                membership = mf(membership)
+
+            if isinstance(membership, list):
+                points[term] = membership
+
+        #
+        # Builds the final universe with the breakpoints of all terms
+        #
+        new_points: list[float] = []
+        for membership in points.values():
+            new_points += [xp for xp, _ in membership]
+        for membership in mfspecs.values():
+            new_points += mf.knots(membership)
+        self.add_points_to_universe(points=new_points)
+
+        #
+        # Computes each new membership function on the final universe
+        #
+        rows: dict = dict(
+            zip(
+                mfspecs.keys(),
+                mf.evaluate_all(list(mfspecs.values()), self.universe),
+            )
+        )
+
+        for term in terms.keys():
+
+            if term in points.keys():
+                xp: list[float] = [xp for xp, _ in points[term]]
+                fp: list[float] = [fp for _, fp in points[term]]
+                rows[term] = np.interp(x=self.universe, xp=xp, fp=fp)
+
+        self._set_rows(rows)
+        self.mfspecs.update(mfspecs)
+
+    def _set_rows(self, rows: dict) -> None:
+        """Stores the membership values of the terms, adding rows for new terms."""
+
+        new_terms: list = [term for term in rows.keys() if term not in self.term_index]
+
+        if new_terms:
+            n_terms = len(self.term_index)
+            memberships = np.empty((n_terms + len(new_terms), len(self.universe)))
+            if n_terms > 0:
+                memberships[:n_terms] = self.memberships
+            for i_term, term in enumerate(new_terms):
+                self.term_index[term] = n_terms + i_term
+            self.memberships = memberships
+
+        elif not self.memberships.flags.writeable:
+            self.memberships = self.memberships.copy()
+
+        for term, membership in rows.items():
+            self.memberships[self.term_index[term]] = membership
+
+        self._clear_modified_memberships(rows.keys())
+        self._intern()
+        self.version += 1
+
+    def _intern(self) -> None:
+        """Replaces the universe, the membership matrix and its rows by the shared arrays with the same content."""
 
-        xp: list[float] = [xp for xp, _ in membership]
-        fp: list[float] = [fp for _, fp in membership]
-        self.add_points_to_universe(points=xp)
-        self.terms[term] = np.interp(x=self.universe, xp=xp, fp=fp)
+        if self.interned:
+            self.universe = registry.intern(self.universe)
+            self.memberships = registry.intern(self.memberships)
+            rows = registry.intern_rows(self.memberships)
+            self.rows = {term: rows[i] for term, i in self.term_index.items()}
+
+    def _clear_modified_memberships(self, terms) -> None:
+        """Drops the cached modified memberships of the terms."""
+
+        for key in list(self.modified_memberships.keys()):
+            if key[0] in terms:
+                del self.modified_memberships[key]
+
+    def _delete_row(self, term: str) -> None:
+        """Removes the term from the membership matrix."""
+
+        i_term = self.term_index.pop(term)
+        self.memberships = np.delete(self.memberships, i_term, axis=0)
+        for other in self.term_index.keys():
+            if self.term_index[other] > i_term:
+                self.term_index[other] -= 1
+        self._intern()
+        self.version += 1
+        self._clear_modified_memberships([term])
+        self.mfspecs.pop(term, None)
 
     def add_points_to_universe(self, points):
 
@@ -94,22 +268,31 @@ class FuzzyVariable:
         universe = np.where(universe < self.min_u, self.min_u, universe)
         universe = np.where(universe > self.max_u, self.max_u, universe)
         universe = np.unique(universe)
-        universe = np.sort(universe)
+
+        if len(universe) == len(self.universe):
+            return
 
         #
-        # Expand existent membership functions with the new points
+        # Expand existent membership functions with the new points. Terms
+        # defined by an analytic formula are evaluated exactly.
         #
-        for term in self.terms.keys():
+        mf = MembershipFunction()
 
-            if isinstance(self.terms[term], np.ndarray):
-                self.terms[term] = np.interp(
-                    x=universe, xp=self.universe, fp=self.terms[term]
-                )
+        self.memberships = _interp_rows(universe, self.universe, self.memberships)
+        self.modified_memberships = {}
+
+        if self.mfspecs:
+            rows = [self.term_index[term] for term in self.mfspecs.keys()]
+            self.memberships[rows] = mf.evaluate_all(
+                list(self.mfspecs.values()), universe
+            )
 
         #
         # Update the universe with the new points
         #
         self.universe = universe
+        self._intern()
+        self.version += 1
 
     def __getitem__(self, term: str) -> np.ndarray:
         """
@@ -118,6 +301,32 @@ class FuzzyVariable:
         """
         return self.terms[term]
 
+    def fuzzificate(self, value: npt.ArrayLike) -> np.ndarray:
+        """Returns the membership of crisp values in every term of the variable.
+
+        :param value:
+            Crisp value, or array of crisp values.
+
+        The result has one column per term (in the order of `term_index`), and
+        one row per crisp value when an array of values is given.
+
+        >>> from fuzzy_expert.variable import FuzzyVariable
+        >>> v = FuzzyVariable(
+        ...     universe_range=(150, 200),
+        ...     terms={
+        ...         "High": [(175, 0), (180, 0.2), (185, 0.7), (190, 1)],
+        ...         "Low": [(155, 1), (160, 0.8), (165, 0.5), (170, 0.2), (175, 0)],
+        ...     },
+        ... )
+        >>> v.fuzzificate(182.5)
+        array([0.45, 0.  ])
+        >>> v.fuzzificate([150, 172.5])
+        array([[0. , 1. ],
+               [0. , 0.1]])
+
+        """
+        return _interp_rows(value, self.universe, self.memberships).T
+
     def get_modified_membeship(
         self, term: str, modifiers: Union[None, List[str]] = None
     ) -> np.ndarray:
@@ -129,6 +338,9 @@ class FuzzyVariable:
         :param modifiers:
             List of modifiers.
 
+        Modified memberships are cached (as read-only arrays) until the term or
+        the universe changes.
+
         >>> import matplotlib.pyplot as plt
         >>> from fuzzy_expert.variable import FuzzyVariable
         >>> v = FuzzyVariable(
@@ -150,10 +362,70 @@ class FuzzyVariable:
 
         """
 
-        membership: np.ndarray = self.terms[term]
+        if modifiers is None:
+            return self.terms[term]
+
+        key: tuple = (term, tuple(modifiers))
+
+        if key not in self.modified_memberships.keys():
+            if self.interned:
+                membership = registry.derive(
+                    self.terms[term],
+                    key[1],
+                    lambda membership: apply_modifiers(membership, modifiers),
+                )
+            else:
+                membership = apply_modifiers(self.terms[term], modifiers)
+                membership.flags.writeable = False
+            self.modified_memberships[key] = membership
+
+        return self.modified_memberships[key]
+
+    def get_modified_membership_at(
+        self,
+        term: str,
+        value: npt.ArrayLike,
+        modifiers: Union[None, List[str]] = None,
+    ) -> np.ndarray:
+        """Returns the modified membership of the term at one or many crisp values.
+
+        :param term:
+            Name of the fuzzy set.
+
+        :param value:
+            Crisp value, or array of crisp values.
+
+        :param modifiers:
+            List of modifiers.
+
+        The membership is interpolated at the values before applying the
+        modifiers, as if the values were added to the universe (terms defined by
+        an analytic formula are evaluated exactly). For `norm` and `slightly`,
+        which depend on the whole membership function, the maximum is taken on
+        the universe and the values (see `fuzzy_expert.operators.apply_modifiers_at`).
+
+        >>> from fuzzy_expert.variable import FuzzyVariable
+        >>> v = FuzzyVariable(
+        ...     universe_range=(150, 200),
+        ...     terms={"High": [(175, 0), (180, 0.2), (185, 0.7), (190, 1)]},
+        ... )
+        >>> v.get_modified_membership_at('High', [182.5, 200], ['very'])
+        array([0.2025, 1.    ])
+
+        """
+        if term in self.mfspecs.keys():
+            value = np.clip(value, self.min_u, self.max_u)
+            membership = MembershipFunction().evaluate(self.mfspecs[term], value)
+        else:
+            membership = np.interp(value, self.universe, self.terms[term])
+
+        if modifiers and any(
+            modifier.upper() in ("NORM", "SLIGHTLY") for modifier in modifiers
+        ):
+            return apply_modifiers_at(membership, self.terms[term], modifiers)
 
-        if modifiers is not None:
-            membership: np.ndarray = apply_modifiers(membership, modifiers)
+        if modifiers:
+            membership = apply_modifiers(membership, modifiers)
 
         return membership
 
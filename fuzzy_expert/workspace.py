@@ -0,0 +1,102 @@
+"""
+Workspaces
+===============================================================================
+
+"""
+from __future__ import annotations
+
+from typing import Hashable, Tuple
+
+import numpy as np
+
+
+class Workspace:
+    """Named buffers reused across calls of an inference engine.
+
+    Each intermediate array of the engine is stored in a buffer identified by a
+    hashable name. A buffer is allocated the first time it is requested and
+    reused while its shape does not change; `allocations` counts the buffers
+    created, so a steady engine performs no allocation per call.
+
+    Arrays that only live during a call are taken from scratch buffers keyed by
+    their shape: `take` returns a different buffer each time until `release`
+    makes them all available again, so the number of buffers is bounded by the
+    largest number of arrays of a shape used in one call.
+
+    >>> from fuzzy_expert.workspace import Workspace
+    >>> workspace = Workspace()
+    >>> a = workspace.get(("composition", "x"), (5,))
+    >>> b = workspace.get(("composition", "x"), (5,))
+    >>> a is b
+    True
+    >>> workspace.allocations
+    1
+    >>> c = workspace.take((5,))
+    >>> c is workspace.take((5,))
+    False
+    >>> workspace.release()
+    >>> c is workspace.take((5,))
+    True
+
+    """
+
+    def __init__(self) -> None:
+        self.buffers: dict = {}
+        self.allocations: int = 0
+        self.taken: dict = {}
+
+    def get(self, name: Hashable, shape: Tuple[int, ...]) -> np.ndarray:
+        """Returns the buffer with the specified name and shape.
+
+        :param name: Name of the buffer.
+        :param shape: Shape of the buffer.
+
+        The content of the buffer is undefined.
+
+        """
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.float64)
+            self.buffers[name] = buffer
+            self.allocations += 1
+        return buffer
+
+    def take(self, shape: Tuple[int, ...]) -> np.ndarray:
+        """Returns a scratch buffer with the specified shape not taken since the last release.
+
+        :param shape: Shape of the buffer.
+
+        The content of the buffer is undefined.
+
+        """
+        i_buffer = self.taken.get(shape, 0)
+        self.taken[shape] = i_buffer + 1
+        return self.get(("scratch", shape, i_buffer), shape)
+
+    def release(self, trim: bool = False) -> None:
+        """Makes all the scratch buffers available to `take` again.
+
+        :param trim: When True, the scratch buffers not taken since the last release are dropped.
+
+        """
+        if trim:
+            self.buffers = {
+                name: buffer
+                for name, buffer in self.buffers.items()
+                if not (
+                    isinstance(name, tuple)
+                    and name[0] == "scratch"
+                    and name[2] >= self.taken.get(name[1], 0)
+                )
+            }
+        self.taken = {}
+
+    def clear(self) -> None:
+        """Releases all the buffers."""
+        self.buffers = {}
+        self.taken = {}
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the buffers in bytes."""
+        return sum(buffer.nbytes for buffer in self.buffers.values())
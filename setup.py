@@ -20,6 +20,9 @@ setup(
         "pandas",
         "ipywidgets",
     ],
+    extras_require={
+        "numba": ["numba"],
+    },
     packages=find_packages(),
     package_dir={"fuzzy_expert": "fuzzy_expert"},
     include_package_data=True,
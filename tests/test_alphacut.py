@@ -0,0 +1,163 @@
+"""Tests for the alpha-cut inference"""
+
+import timeit
+
+import numpy as np
+import pytest
+
+from fuzzy_expert.alphacut import (
+    AlphaCutInference,
+    alpha_cuts,
+    defuzzificate,
+    intersects,
+    union,
+)
+from fuzzy_expert.rule import FuzzyRule
+from fuzzy_expert.variable import FuzzyVariable
+
+
+def test_alpha_cuts() -> None:
+    """Cuts of non-convex sets are unions of intervals."""
+
+    cuts = alpha_cuts([0, 1, 2, 3, 4], [0, 1, 0.5, 1, 0], n_levels=4)
+    assert [len(cut) for cut in cuts] == [1, 1, 2, 2]
+    assert np.allclose(cuts[3], [[0.875, 1.25], [2.75, 3.125]])
+
+    assert union(cuts[3], cuts[0]).tolist() == cuts[0].tolist()
+    assert intersects(cuts[3], np.array([[1.0, 2.0]]))
+    assert not intersects(cuts[3], np.array([[1.5, 2.5]]))
+
+
+def test_defuzzificate() -> None:
+    """Defuzzification from the cuts converges with the number of levels."""
+
+    x = np.linspace(0, 10, 10001)
+    y = np.interp(x, [0, 2, 4, 6, 10], [0, 0.3, 0.3, 0.9, 0])
+    cog = np.sum(x * y) / np.sum(y)
+
+    errors = [
+        abs(defuzzificate(alpha_cuts(x, y, n_levels), "cog") - cog)
+        for n_levels in (4, 16, 64)
+    ]
+    assert errors[0] > errors[2]
+    assert errors[2] < 1e-2
+
+    cuts = alpha_cuts(x, y, 64)
+    assert np.isclose(defuzzificate(cuts, "mom"), 6, atol=0.1)
+    assert defuzzificate(cuts, "som") < 6 < defuzzificate(cuts, "lom")
+    assert 4 < defuzzificate(cuts, "boa") < 6
+
+
+def test_alphacut_inference() -> None:
+    """The alpha-cut engine approximates the discrete engine for fuzzy facts."""
+
+    def make_variables():
+        terms = {
+            "Low": [(0, 1), (3, 1), (5, 0)],
+            "Medium": [(2, 0), (5, 1), (8, 0)],
+            "High": [(5, 0), (7, 1), (10, 1)],
+        }
+        return {
+            name: FuzzyVariable(universe_range=(0, 10), terms=terms)
+            for name in ("x", "y", "z")
+        }
+
+    rules = [
+        FuzzyRule(
+            premise=[("x", "Low"), ("AND", "y", "Low")], consequence=[("z", "Low")]
+        ),
+        FuzzyRule(
+            premise=[("x", "Medium"), ("OR", "y", "High")],
+            consequence=[("z", "Medium")],
+        ),
+        FuzzyRule(
+            premise=[("x", "High"), ("AND", "y", "Medium")],
+            consequence=[("z", "High")],
+        ),
+    ]
+    facts = dict(x=[(3, 0), (4, 1), (6, 0)], y=(6.5, 0.8))
+
+    errors = []
+    for n_levels in (4, 64):
+        model = AlphaCutInference(
+            and_operator="min",
+            or_operator="max",
+            implication_operator="Rc",
+            composition_operator="max-min",
+            production_link="max",
+            defuzzification_operator="cog",
+            n_levels=n_levels,
+        )
+        errors.append(model.approximation_error(make_variables(), rules, **facts))
+        assert model.infered_cf == 1.0
+
+    assert errors[1]["z"] < errors[0]["z"]
+    assert errors[1]["z"] < 0.05
+
+    with pytest.raises(ValueError):
+        AlphaCutInference(
+            and_operator="prod",
+            or_operator="max",
+            implication_operator="Rc",
+            composition_operator="max-min",
+            production_link="max",
+            defuzzification_operator="cog",
+        )
+
+    with pytest.raises(ValueError):
+        model(
+            make_variables(),
+            [
+                FuzzyRule(
+                    premise=[("x", "Medium"), ("prod", "y", "High")],
+                    consequence=[("z", "Medium")],
+                )
+            ],
+            **facts,
+        )
+
+
+def test_alphacut_cost_flat() -> None:
+    """The cost of a call does not grow with the size of the universe."""
+
+    terms = {
+        "Low": [(0, 1), (3, 1), (5, 0)],
+        "Medium": [(2, 0), (5, 1), (8, 0)],
+        "High": [(5, 0), (7, 1), (10, 1)],
+    }
+    rules = [
+        FuzzyRule(
+            premise=[("x", "Medium"), ("OR", "y", "High")],
+            consequence=[("z", "Medium")],
+        ),
+        FuzzyRule(
+            premise=[("x", "High"), ("AND", "y", "somewhat", "Medium")],
+            consequence=[("z", "very", "High")],
+        ),
+    ]
+    model = AlphaCutInference(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+    facts = dict(x=[(4, 0), (6, 1), (8, 0)], y=6.5)
+
+    times = []
+    for step in [0.1, 0.0001]:
+        variables = {
+            name: FuzzyVariable(universe_range=(0, 10), terms=terms, step=step)
+            for name in ("x", "y", "z")
+        }
+        model(variables, rules, **facts)
+        times.append(
+            min(
+                timeit.repeat(
+                    lambda: model(variables, rules, **facts), number=20, repeat=5
+                )
+            )
+        )
+
+    assert times[1] < 2 * times[0]
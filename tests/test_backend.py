@@ -0,0 +1,117 @@
+"""Tests for computational backends"""
+
+import numpy as np
+import pytest
+
+from fuzzy_expert.backend import (
+    NUMBA_AVAILABLE,
+    NumpyBackend,
+    _boa_loop,
+    _cog_loop,
+    _compose_loop,
+    _fold_loop,
+    _OPERATOR_CODES,
+)
+from fuzzy_expert.inference import DecompositionalInference
+from fuzzy_expert.rule import FuzzyRule
+from fuzzy_expert.variable import FuzzyVariable
+
+
+def test_loop_kernels() -> None:
+    """The loop kernels compiled by numba match the NumPy reference backend."""
+
+    rng = np.random.default_rng(0)
+    reference = NumpyBackend()
+
+    fact = rng.uniform(size=20)
+    implication = rng.uniform(size=(20, 30))
+    for operator in ["max-min", "max-prod"]:
+        expected = reference.compose(fact, implication, operator)
+        result = _compose_loop(fact, implication, operator == "max-prod", np.empty(30))
+        assert result == pytest.approx(expected)
+
+    memberships = rng.choice([0.0, 0.2, 0.5, 1.0], size=(4, 30))
+    for operator, code in _OPERATOR_CODES.items():
+        expected = reference.combine(memberships, operator)
+        result = _fold_loop(memberships, code, np.empty(30))
+        assert result == pytest.approx(expected)
+
+    memberships = rng.uniform(size=(3, 30))
+    for operator, code in _OPERATOR_CODES.items():
+        expected = reference.combine(memberships, operator)
+        result = _fold_loop(memberships, code, np.empty(30))
+        assert np.array_equal(result, expected)
+
+    universe = np.linspace(0, 10, 30)
+    membership = memberships[0]
+    assert _cog_loop(universe, membership) == pytest.approx(
+        reference.defuzzificate(universe, membership, "cog")
+    )
+    assert _boa_loop(universe, membership) == pytest.approx(
+        reference.defuzzificate(universe, membership, "boa")
+    )
+
+
+@pytest.mark.parametrize("composition_operator", ["max-min", "max-prod"])
+@pytest.mark.parametrize(
+    "defuzzification_operator", ["cog", "boa", "mom", "lom", "som"]
+)
+@pytest.mark.parametrize(
+    "operators",
+    [
+        ("min", "max", "max"),
+        ("prod", "prob_or", "prob_or"),
+        ("bounded_prod", "bounded_sum", "bounded_sum"),
+    ],
+)
+@pytest.mark.parametrize("fact", [5.2, [(2, 0), (3.5, 1), (6, 0)]])
+def test_numba_backend(
+    composition_operator, defuzzification_operator, operators, fact
+) -> None:
+    """Both backends give the same inference results."""
+
+    if not NUMBA_AVAILABLE:
+        pytest.skip("numba is not installed")
+
+    and_operator, or_operator, production_link = operators
+
+    def infer(backend):
+        variables = {
+            "x": FuzzyVariable(
+                universe_range=(0, 10),
+                terms={"Low": [(0, 1), (5, 0)], "High": [(5, 0), (10, 1)]},
+            ),
+            "y": FuzzyVariable(
+                universe_range=(0, 10),
+                terms={"Low": [(0, 1), (6, 0)], "High": [(4, 0), (10, 1)]},
+            ),
+        }
+        rules = [
+            FuzzyRule(premise=[("x", "Low")], consequence=[("y", "High")]),
+            FuzzyRule(premise=[("x", "High")], consequence=[("y", "Low")]),
+            FuzzyRule(
+                premise=[("x", "Low"), ("AND", "x", "very", "High")],
+                consequence=[("y", "Low")],
+            ),
+            FuzzyRule(
+                premise=[("x", "somewhat", "Low"), ("OR", "x", "High")],
+                consequence=[("y", "very", "High")],
+                cf=0.8,
+            ),
+        ]
+        model = DecompositionalInference(
+            and_operator=and_operator,
+            or_operator=or_operator,
+            implication_operator="Rc",
+            composition_operator=composition_operator,
+            production_link=production_link,
+            defuzzification_operator=defuzzification_operator,
+            backend=backend,
+        )
+        return model(variables=variables, rules=rules, x=fact)
+
+    result, cf = infer("numba")
+    expected, expected_cf = infer("numpy")
+
+    assert result["y"] == pytest.approx(expected["y"])
+    assert cf == expected_cf
@@ -0,0 +1,221 @@
+"""Tests for the breakpoint inference"""
+
+import timeit
+
+import numpy as np
+import pytest
+
+from fuzzy_expert.breakpoints import (
+    BreakpointInference,
+    combine,
+    defuzzificate,
+    from_samples,
+)
+from fuzzy_expert.inference import DecompositionalInference
+from fuzzy_expert.rule import FuzzyRule
+from fuzzy_expert.variable import FuzzyVariable
+
+
+def test_set_operations() -> None:
+    """Operations add the crossing points to the breakpoints."""
+
+    x, y = from_samples(
+        np.linspace(0, 10, 101),
+        np.interp(np.linspace(0, 10, 101), [2, 5, 8], [0, 1, 0]),
+    )
+    assert x.tolist() == [0, 2, 5, 8, 10]
+
+    fuzzyset = (x, y)
+    other = ([0.0, 10.0], [1.0, 0.0])
+    x, y = combine(fuzzyset, other, "max")
+    u = np.linspace(0, 10, 1001)
+    assert np.allclose(
+        np.interp(u, x, y), np.maximum(np.interp(u, *fuzzyset), np.interp(u, *other))
+    )
+    assert np.isclose(x[1], 5 / 1.3)
+
+    x, y = combine(fuzzyset, other, "bounded_sum")
+    assert np.allclose(
+        np.interp(u, x, y),
+        np.minimum(1, np.interp(u, *fuzzyset) + np.interp(u, *other)),
+    )
+
+    with pytest.raises(ValueError):
+        combine(fuzzyset, other, "prod")
+
+
+def test_defuzzificate() -> None:
+    """Defuzzification is exact on the polygon."""
+
+    fuzzyset = ([0.0, 2.0, 4.0, 6.0, 10.0], [0.0, 0.5, 0.5, 1.0, 0.0])
+    universe = np.linspace(0, 10, 100001)
+    membership = np.interp(universe, *fuzzyset)
+
+    cog = np.sum(universe * membership) / np.sum(membership)
+    assert np.isclose(defuzzificate(fuzzyset, "cog"), cog)
+
+    areas = np.cumsum(membership)
+    boa = universe[np.searchsorted(areas, areas[-1] / 2)]
+    assert np.isclose(defuzzificate(fuzzyset, "boa"), boa, atol=1e-4)
+
+    assert defuzzificate(fuzzyset, "mom") == 6
+    assert defuzzificate(([0.0, 2.0, 4.0, 6.0], [0.0, 1.0, 1.0, 0.0]), "mom") == 3
+    assert defuzzificate(([0.0, 2.0, 4.0, 6.0], [0.0, 1.0, 1.0, 0.0]), "lom") == 4
+
+
+def test_breakpoint_inference() -> None:
+    """The breakpoint engine matches the discrete engine on a fine universe."""
+
+    def make_variables():
+        terms = {
+            "Low": [(0, 1), (3, 1), (5, 0)],
+            "Medium": [(2, 0), (5, 1), (8, 0)],
+            "High": [(5, 0), (7, 1), (10, 1)],
+        }
+        return {
+            name: FuzzyVariable(universe_range=(0, 10), terms=terms, step=0.001)
+            for name in ("x", "y", "z")
+        }
+
+    rules = [
+        FuzzyRule(
+            premise=[("x", "Low"), ("AND", "y", "Low")], consequence=[("z", "Low")]
+        ),
+        FuzzyRule(
+            premise=[("x", "Medium"), ("OR", "y", "High")],
+            consequence=[("z", "Medium")],
+            cf=0.8,
+        ),
+        FuzzyRule(
+            premise=[("x", "High"), ("AND", "y", "somewhat", "Medium")],
+            consequence=[("z", "very", "High")],
+        ),
+    ]
+
+    for implication_operator in ["Rc", "Rm"]:
+
+        kwargs = dict(
+            and_operator="min",
+            or_operator="max",
+            implication_operator=implication_operator,
+            composition_operator="max-min",
+            production_link="max",
+            defuzzification_operator="cog",
+        )
+        model = BreakpointInference(**kwargs)
+        reference = DecompositionalInference(**kwargs)
+
+        for x, y in [(2.5, 3.5), (6.0, 4.2), (4.0, (9.0, 0.7))]:
+            result = model(make_variables(), rules, x=x, y=y)
+            expected = reference(make_variables(), rules, x=x, y=y)
+            assert result[1] == expected[1]
+            assert np.isclose(result[0]["z"], expected[0]["z"], atol=1e-3)
+            assert model.diagnostics["breakpoints"] < 1000
+
+    with pytest.raises(ValueError):
+        BreakpointInference(**dict(kwargs, production_link="prob_or"))
+
+    named = [
+        FuzzyRule(
+            premise=[("x", "Medium"), ("bounded_prod", "y", "High")],
+            consequence=[("z", "Low")],
+        )
+    ]
+    result = model(make_variables(), named, x=4.5, y=6.5)
+    expected = reference(make_variables(), named, x=4.5, y=6.5)
+    assert np.isclose(result[0]["z"], expected[0]["z"], atol=1e-3)
+
+    with pytest.raises(ValueError):
+        model(
+            make_variables(),
+            [
+                FuzzyRule(
+                    premise=[("x", "Medium"), ("prod", "y", "High")],
+                    consequence=[("z", "Medium")],
+                )
+            ],
+            x=4.5,
+            y=6.5,
+        )
+
+
+def test_breakpoint_cost_flat() -> None:
+    """The cost of a call does not grow as the step of the universe shrinks."""
+
+    terms = {
+        "Low": [(0, 1), (3, 1), (5, 0)],
+        "Medium": [(2, 0), (5, 1), (8, 0)],
+        "High": [(5, 0), (7, 1), (10, 1)],
+    }
+    rules = [
+        FuzzyRule(
+            premise=[("x", "Medium"), ("OR", "y", "High")],
+            consequence=[("z", "Medium")],
+        ),
+        FuzzyRule(
+            premise=[("x", "High"), ("AND", "y", "somewhat", "Medium")],
+            consequence=[("z", "very", "High")],
+        ),
+    ]
+    model = BreakpointInference(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+
+    times, breakpoints = [], []
+    for step in [0.1, 0.0001]:
+        variables = {
+            name: FuzzyVariable(universe_range=(0, 10), terms=terms, step=step)
+            for name in ("x", "y", "z")
+        }
+        model(variables, rules, x=6.0, y=6.5)
+        breakpoints.append(model.diagnostics["breakpoints"])
+        times.append(
+            min(
+                timeit.repeat(
+                    lambda: model(variables, rules, x=6.0, y=6.5), number=20, repeat=5
+                )
+            )
+        )
+
+    assert breakpoints[0] == breakpoints[1]
+    assert times[1] < 2 * times[0]
+
+
+def test_from_samples_off_grid_knots() -> None:
+    """Knots added to the universe keep their peaks in the breakpoints."""
+
+    terms = {
+        "Low": [(4.67, 0), (5.72, 1), (7.26, 0)],
+        "Medium": [(5.34, 0), (8.2, 1), (9.23, 0)],
+        "High": [(0.29, 0), (1.6, 1), (7.45, 0)],
+    }
+    variables = {
+        name: FuzzyVariable(universe_range=(0, 10), terms=terms)
+        for name in ("x", "z")
+    }
+
+    for term, points in terms.items():
+        x, y = from_samples(variables["z"].universe, variables["z"].terms[term])
+        assert np.allclose(x, [0] + [xp for xp, _ in points] + [10])
+        assert y.tolist() == [0, 0, 1, 0, 0]
+
+    rules = [
+        FuzzyRule(premise=[("x", "Low")], consequence=[("z", "Medium")]),
+        FuzzyRule(premise=[("x", "High")], consequence=[("z", "High")]),
+    ]
+    kwargs = dict(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+    result = BreakpointInference(**kwargs)(variables, rules, x=6.1)
+    expected = DecompositionalInference(**kwargs)(variables, rules, x=6.1)
+    assert np.isclose(result[0]["z"], expected[0]["z"], atol=1e-2)
@@ -3,16 +3,16 @@ Test inferecem method
 """
 # from typing import Union
 
+import numpy as np
+
 from fuzzy_expert.rule import FuzzyRule
 from fuzzy_expert.variable import FuzzyVariable
 from fuzzy_expert.inference import DecompositionalInference
 
 
-def test_loan_decision_problem() -> None:
-    """
-    Loan Bank Decision Problem
+def make_loan_system():
+    """Variables and rules of the loan bank decision problem."""
 
-    """
     variables = {
         "score": FuzzyVariable(
             universe_range=(150, 200),
@@ -87,6 +87,29 @@ def test_loan_decision_problem() -> None:
         ),
     ]
 
+    return variables, rules
+
+
+def make_variables(*names, **kwargs):
+    """Variables with the terms Low and High on (0, 10), one per name."""
+
+    return {
+        name: FuzzyVariable(
+            universe_range=(0, 10),
+            terms={"Low": [(0, 1), (6, 0)], "High": [(4, 0), (10, 1)]},
+            **kwargs,
+        )
+        for name in names
+    }
+
+
+def test_loan_decision_problem() -> None:
+    """
+    Loan Bank Decision Problem
+
+    """
+    variables, rules = make_loan_system()
+
     model = DecompositionalInference(
         and_operator="min",
         or_operator="max",
@@ -108,3 +131,383 @@ def test_loan_decision_problem() -> None:
         {"decision": 8.010492631084489, "other_decision": 8.010492631084489},
         1.0,
     )
+
+
+def test_loan_decision_outputs() -> None:
+    """
+    Loan Bank Decision Problem computing only one of the outputs
+
+    """
+    variables, rules = make_loan_system()
+
+    model = DecompositionalInference(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+
+    model(
+        variables=variables,
+        rules=rules,
+        score=(190, 1),
+        ratio=(0.39, 1),
+        credit=(1.5, 1),
+    )
+    n_pairs = model.diagnostics["pairs"]
+
+    result = model(
+        variables=variables,
+        rules=rules,
+        outputs=["decision"],
+        score=(190, 1),
+        ratio=(0.39, 1),
+        credit=(1.5, 1),
+    )
+
+    assert result == ({"decision": 8.010492631084489}, 1.0)
+    assert model.diagnostics["pairs"] == n_pairs // 2
+
+
+def test_shared_propositions() -> None:
+    """Propositions repeated across rules are computed once."""
+
+    variables = make_variables("x", "y")
+
+    rules = [
+        FuzzyRule(premise=[("x", "Low")], consequence=[("y", "High")], cf=0.9),
+        FuzzyRule(premise=[("x", "Low")], consequence=[("y", "High")], cf=0.8),
+        FuzzyRule(premise=[("x", "High")], consequence=[("y", "High")]),
+        FuzzyRule(premise=[("x", "very", "High")], consequence=[("y", "Low")]),
+    ]
+
+    model = DecompositionalInference(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+        trace=True,
+    )
+
+    result = model(variables=variables, rules=rules, x=3.3)
+
+    assert rules[0].fuzzy_compositions is not rules[1].fuzzy_compositions
+    assert (
+        rules[0].fuzzy_compositions[("x", "y")]
+        is rules[1].fuzzy_compositions[("x", "y")]
+    )
+    assert model.diagnostics["propositions"] == 8
+    assert model.diagnostics["distinct_propositions"] == 5
+    assert model.diagnostics["pairs"] == 4
+    assert model.diagnostics["distinct_pairs"] == 3
+    assert model.diagnostics["deduplication_ratio"] == 1.5
+
+    expected = model(variables=variables, rules=rules[1:], x=3.3)
+    assert result == expected
+
+    #
+    # Interned variables with the same terms share their relations
+    #
+    variables = make_variables("x", "z", "y", interned=True)
+    rules = [
+        FuzzyRule(premise=[("x", "Low")], consequence=[("y", "High")]),
+        FuzzyRule(premise=[("z", "Low")], consequence=[("y", "High")]),
+    ]
+    fact = [(2, 0), (3, 1), (4, 0)]
+    model(variables=variables, rules=rules, x=fact, z=fact)
+    assert len(model.shared_implications) == 1
+    assert (
+        rules[0].fuzzy_implications[("x", "y")]
+        is rules[1].fuzzy_implications[("z", "y")]
+    )
+
+
+def test_streaming_aggregation() -> None:
+    """Rule memberships are folded into one accumulator per output."""
+
+    variables = make_variables("x", "y")
+
+    rules = [
+        FuzzyRule(premise=[("x", "Low")], consequence=[("y", "High")]),
+        FuzzyRule(premise=[("x", "High")], consequence=[("y", "Low")]),
+        FuzzyRule(
+            premise=[("x", "High")], consequence=[("y", "High")], threshold_cf=0.5
+        ),
+    ]
+
+    model = DecompositionalInference(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="prob_or",
+        defuzzification_operator="cog",
+        trace=True,
+    )
+
+    model(variables=variables, rules=rules, x=(4.5, 0.4))
+
+    compositions = [rule.combined_composition["y"] for rule in rules[:2]]
+    assert np.allclose(
+        model.aggregated_memberships["y"],
+        1 - (1 - compositions[0]) * (1 - compositions[1]),
+    )
+    assert not hasattr(model, "collected_rule_memberships")
+
+    model(variables=variables, rules=rules[2:], x=(4.5, 0.4))
+    assert np.all(model.aggregated_memberships["y"] == 0)
+
+
+def test_workspace_reuse() -> None:
+    """Intermediate arrays are reused across calls."""
+
+    variables = make_variables("x", "y")
+
+    rules = [
+        FuzzyRule(premise=[("x", "Low")], consequence=[("y", "High")]),
+        FuzzyRule(
+            premise=[("x", "High"), ("AND", "x", "very", "High")],
+            consequence=[("y", "Low")],
+        ),
+    ]
+
+    model = DecompositionalInference(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rm",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+
+    universe = variables["x"].universe.copy()
+    model(variables=variables, rules=rules, x=4.55)
+    assert model.diagnostics["allocations"] > 0
+    model(variables=variables, rules=rules, x=7.21)
+    assert model.diagnostics["allocations"] == 0
+    assert np.array_equal(variables["x"].universe, universe)
+
+    result = model(variables=variables, rules=rules, x=[(4, 0), (5, 1), (6, 0)])
+    assert model.diagnostics["allocations"] > 0
+    assert 0 < result[0]["y"] < 10
+
+
+def test_implication_operators() -> None:
+    """Implication operators write the fuzzy relation into the output array."""
+
+    from fuzzy_expert.inference import _IMPLICATIONS
+
+    def Rs(u, v):
+        return np.where(u <= v, 1, 0)
+
+    def Rg(u, v):
+        return np.where(u <= v, 1, v)
+
+    expected = {
+        "Ra": lambda u, v: np.minimum(1, 1 - u + v),
+        "Rm": lambda u, v: np.maximum(np.minimum(u, v), 1 - u),
+        "Rc": lambda u, v: np.minimum(u, v),
+        "Rb": lambda u, v: np.maximum(1 - u, v),
+        "Rs": Rs,
+        "Rg": Rg,
+        "Rsg": lambda u, v: np.minimum(Rs(u, v), Rg(1 - u, 1 - v)),
+        "Rgs": lambda u, v: np.minimum(Rg(u, v), Rs(1 - u, 1 - v)),
+        "Rgg": lambda u, v: np.minimum(Rg(u, v), Rg(1 - u, 1 - v)),
+        "Rss": lambda u, v: np.minimum(Rs(u, v), Rs(1 - u, 1 - v)),
+    }
+
+    u = np.linspace(0, 1, 7).reshape((-1, 1))
+    v = np.linspace(0, 1, 5)
+    for name, fn in expected.items():
+        out = np.empty((7, 5))
+        assert np.array_equal(_IMPLICATIONS[name](u, v, out=out), fn(u, v))
+
+
+def test_trace() -> None:
+    """Intermediate results are kept only in trace mode."""
+
+    variables = make_variables("x", "y")
+
+    rules = [
+        FuzzyRule(premise=[("x", "Low")], consequence=[("y", "High")]),
+        FuzzyRule(premise=[("x", "High")], consequence=[("y", "Low")]),
+    ]
+
+    kwargs = dict(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+    fact = [(3, 0), (5, 1), (7, 0)]
+
+    model = DecompositionalInference(**kwargs)
+    result = model(variables=variables, rules=rules, x=fact)
+    assert not hasattr(rules[0], "fuzzy_implications")
+    assert not hasattr(rules[0], "combined_composition")
+    assert len(model.workspace.buffers) == 4
+
+    model = DecompositionalInference(trace=True, **kwargs)
+    assert model(variables=variables, rules=rules, x=fact) == result
+    assert rules[0].fuzzy_implications[("x", "y")].shape == (
+        len(variables["x"].universe),
+        len(variables["y"].universe),
+    )
+    assert len(model.workspace.buffers) == 5
+
+
+def test_workspace_bounded() -> None:
+    """Without trace, the workspace does not grow with the number of rules."""
+
+    variables = make_variables("x", "y", "z")
+
+    model = DecompositionalInference(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+
+    sizes = []
+    for n_rules in (10, 100, 1000):
+        rules = [
+            FuzzyRule(
+                premise=[
+                    ("x", ("Low", "High")[i_rule % 2]),
+                    ("AND", "y", ("Low", "High")[i_rule // 2 % 2]),
+                ],
+                consequence=[("z", ("Low", "High")[i_rule // 4 % 2])],
+                cf=(i_rule + 1) / n_rules,
+            )
+            for i_rule in range(n_rules)
+        ]
+        model(variables=variables, rules=rules, x=3.2, y=(5.1, 0.8))
+        sizes.append((len(model.workspace.buffers), model.workspace.nbytes))
+
+    assert sizes[0] == sizes[1] == sizes[2]
+
+    model.trace = True
+    model(variables=variables, rules=rules, x=3.2, y=(5.1, 0.8))
+    assert len(model.workspace.buffers) > sizes[0][0]
+
+    model.trace = False
+    model(variables=variables, rules=rules, x=3.2, y=(5.1, 0.8))
+    assert (len(model.workspace.buffers), model.workspace.nbytes) == sizes[0]
+
+
+def test_evaluate_batch() -> None:
+    """Batch evaluation and DataFrame scoring match calls on each fact."""
+
+    import pandas as pd
+
+    variables = make_variables("x", "y", "z")
+
+    rules = [
+        FuzzyRule(
+            premise=[("x", "Low"), ("AND", "y", "very", "Low")],
+            consequence=[("z", "High")],
+        ),
+        FuzzyRule(
+            premise=[("x", "High"), ("OR", "y", "Low")],
+            consequence=[("z", "Low")],
+            cf=0.8,
+        ),
+        FuzzyRule(
+            premise=[("x", "High")], consequence=[("z", "High")], threshold_cf=0.5
+        ),
+    ]
+
+    model = DecompositionalInference(
+        and_operator="prod",
+        or_operator="max",
+        implication_operator="Rm",
+        composition_operator="max-min",
+        production_link="prob_or",
+        defuzzification_operator="cog",
+    )
+
+    x = np.array([1.5, 4.5, 8.0, 12.0])
+    y = np.array([2.0, 7.0, 3.0, 5.0])
+    y_cf = np.array([1.0, 0.4, 0.9, 0.3])
+    outputs, cf = model.evaluate_batch(variables, rules, x=x, y=(y, y_cf))
+
+    for i in range(len(x)):
+        expected = model(
+            variables, rules, x=float(x[i]), y=(float(y[i]), float(y_cf[i]))
+        )
+        assert np.isclose(outputs["z"][i], expected[0]["z"])
+        assert np.isclose(cf[i], expected[1])
+
+    df = pd.DataFrame({"x": x, "y": y, "y_cf": y_cf}, index=list("abcd"))
+    result = model.predict(df, variables, rules, cf_columns={"y": "y_cf"}, chunk_size=3)
+    assert list(result.index) == list("abcd")
+    assert np.allclose(result["z"], outputs["z"])
+    assert np.allclose(result["cf"], cf)
+
+
+def test_result_cache() -> None:
+    """Results of quantized crisp facts are cached until the model changes."""
+
+    from fuzzy_expert.cache import ResultCache
+
+    variables = make_variables("x", "z", step=0.5)
+    rules = [
+        FuzzyRule(premise=[("x", "Low")], consequence=[("z", "High")]),
+        FuzzyRule(premise=[("x", "High")], consequence=[("z", "Low")]),
+    ]
+    kwargs = dict(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+
+    now = [0.0]
+    cache = ResultCache(maxsize=2, ttl=60, clock=lambda: now[0])
+    model = DecompositionalInference(**kwargs, cache=cache)
+    reference = DecompositionalInference(**kwargs)
+
+    result = model(variables, rules, x=(4.4, 0.8))
+    assert result == reference(variables, rules, x=(4.5, 0.8))
+    assert model(variables, list(rules), x=(4.6, 0.8)) == result
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    model(variables, rules, x=(4.6, 0.9))
+    model(variables, rules, x=7.0)
+    assert len(cache) == 2 and cache.evictions == 1
+    model(variables, rules, x=(4.5, 0.8))
+    assert cache.misses == 4
+
+    now[0] = 100.0
+    model(variables, rules, x=7.0)
+    assert cache.expirations == 1
+
+    rules[1].rule_cf = 0.5
+    assert model(variables, rules, x=7.0) == reference(variables, rules, x=7.0)
+    assert cache.invalidations == 1
+
+    variables["x"]["High"] = [(5, 0), (10, 1)]
+    assert model(variables, rules, x=7.0) == reference(variables, rules, x=7.0)
+    assert cache.invalidations == 2
+    assert cache.hit_rate == 1 / 8
+
+    from fuzzy_expert.rulebase import RuleBase
+
+    rulebase = RuleBase(rules, variables)
+    result = model(variables, rulebase, x=7.0)
+    assert model(variables, rulebase, x=7.0) == result
+    hits = cache.hits
+    rules[0].rule_cf = 0.5
+    assert rulebase.version == 1
+    assert model(variables, rulebase, x=7.0) == reference(variables, rulebase, x=7.0)
+    assert cache.hits == hits and cache.invalidations == 4
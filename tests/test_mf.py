@@ -1,5 +1,6 @@
 """Test for standard membership functions"""
 
+import numpy as np
 import pytest
 from fuzzy_expert.mf import MembershipFunction
 
@@ -225,3 +226,80 @@ def test_zmf():
 
     assert expected_xp == comp_xp
     assert expected_fp == comp_fp
+
+
+def test_evaluate_array():
+    """
+    Families of membership functions evaluated in one pass.
+
+    """
+    obj: MembershipFunction = MembershipFunction()
+    x = np.linspace(0, 10, 101)
+    rng = np.random.default_rng(0)
+
+    params = {
+        "gaussmf": np.stack((rng.uniform(0, 10, 50), rng.uniform(0.5, 2, 50)), axis=1),
+        "gbellmf": np.stack(
+            (rng.uniform(0, 10, 50), rng.uniform(1, 2, 50), rng.uniform(1, 3, 50)),
+            axis=1,
+        ),
+        "sigmf": np.stack((rng.uniform(0, 10, 50), rng.uniform(-2, 2, 50)), axis=1),
+        "smf": np.sort(rng.uniform(0, 10, (50, 2)), axis=1),
+        "zmf": np.sort(rng.uniform(0, 10, (50, 2)), axis=1),
+        "pimf": np.sort(rng.uniform(0, 10, (50, 4)), axis=1),
+        "trapmf": np.sort(rng.uniform(0, 10, (50, 4)), axis=1),
+        "trimf": np.sort(rng.integers(0, 10, (50, 3)), axis=1),
+    }
+
+    for fn, values in params.items():
+        result = obj.evaluate_array(fn, values, x)
+        expected = [obj.evaluate((fn, *row), x) for row in values]
+        assert result.shape == (50, 101)
+        assert np.array_equal(result, expected)
+
+    mfspecs = [("trimf", 1, 2, 4), ("gaussmf", 5, 1), ("trimf", 0, 1, 2)]
+    assert np.array_equal(
+        obj.evaluate_all(mfspecs, x), [obj.evaluate(mfspec, x) for mfspec in mfspecs]
+    )
+
+
+def test_adaptive():
+    """
+    Adaptive sampling keeps the interpolation error below the tolerance.
+
+    """
+    mfspecs = [
+        ("gaussmf", 5, 0.01),
+        ("gaussmf", 5, 4),
+        ("gbellmf", 5, 2, 3),
+        ("sigmf", 5, 1),
+        ("pimf", 1, 2, 3, 4),
+        ("zmf", 1, 3),
+    ]
+
+    for tol in [0.05, 0.001]:
+        obj: MembershipFunction = MembershipFunction(tol=tol)
+        for mfspec in mfspecs:
+            xp, fp = zip(*obj(mfspec))
+            assert list(xp) == sorted(xp)
+            x = np.linspace(xp[0], xp[-1], 10001)
+            error = np.abs(np.interp(x, xp, fp) - obj.evaluate(mfspec, x))
+            assert error.max() <= tol
+
+    #
+    # The bound holds between the points checked inside each segment
+    #
+    rng = np.random.default_rng(0)
+    obj = MembershipFunction(tol=0.01)
+    for _ in range(300):
+        mfspec = ("gbellmf", 0, rng.uniform(0.1, 5), rng.uniform(0.3, 6))
+        xp, fp = zip(*obj(mfspec))
+        x = np.linspace(xp[0], xp[-1], 100001)
+        error = np.abs(np.interp(x, xp, fp) - obj.evaluate(mfspec, x))
+        assert error.max() <= 0.01
+
+    fixed = MembershipFunction()(("gaussmf", 5, 1))
+    assert len(MembershipFunction(tol=0.01)(("gaussmf", 5, 1))) <= len(fixed)
+    assert MembershipFunction(tol=0.01)(("trimf", 1, 2, 3)) == MembershipFunction()(
+        ("trimf", 1, 2, 3)
+    )
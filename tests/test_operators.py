@@ -0,0 +1,90 @@
+"""Tests for fuzzy operators"""
+
+import numpy as np
+import pytest
+
+from fuzzy_expert.operators import (
+    apply_modifiers,
+    bounded_diff,
+    bounded_prod,
+    bounded_sum,
+    defuzzificate,
+    drastic_prod,
+    drastic_sum,
+    intensify,
+    maximum,
+    minimum,
+    more_or_less,
+    plus,
+    prob_or,
+    product,
+)
+
+
+def _fold(memberships, fn):
+    result = np.array(memberships[0])
+    for membership in memberships[1:]:
+        result = fn(result, np.array(membership))
+    return result
+
+
+FOLDS = [
+    (maximum, np.maximum),
+    (minimum, np.minimum),
+    (product, lambda u, v: u * v),
+    (prob_or, lambda u, v: u + v - u * v),
+    (bounded_sum, lambda u, v: np.minimum(1, u + v)),
+    (bounded_prod, lambda u, v: np.maximum(0, u + v - 1)),
+    (bounded_diff, lambda u, v: np.maximum(0, u - v)),
+    (drastic_sum, lambda u, v: np.where(v == 0, u, np.where(u == 0, v, 1))),
+    (drastic_prod, lambda u, v: np.where(v == 0, u, np.where(u == 1, v, 0))),
+]
+
+
+@pytest.mark.parametrize("operator,fn", FOLDS)
+def test_stacked_reduction(operator, fn) -> None:
+    """Stacked reductions match the pairwise definition of the operator."""
+
+    rng = np.random.default_rng(0)
+    memberships = rng.choice([0.0, 0.2, 0.5, 0.9, 1.0], size=(6, 40))
+
+    expected = _fold(list(memberships), fn)
+
+    assert operator(list(memberships)) == pytest.approx(expected)
+    assert operator(memberships.T, axis=1) == pytest.approx(expected)
+
+    out = np.empty(40)
+    result = operator(memberships, out=out)
+    assert result is out
+    assert out == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("operator", ["cog", "boa", "mom", "lom", "som"])
+def test_batched_defuzzificate(operator) -> None:
+    """A batch of memberships is defuzzificated as each row on its own."""
+
+    rng = np.random.default_rng(0)
+    universe = np.linspace(0, 10, 31)
+    memberships = rng.choice([0.0, 0.3, 0.7, 1.0], size=(8, 31))
+    memberships[2] = 0
+
+    result = defuzzificate(universe, memberships, operator)
+    expected = [defuzzificate(universe, m, operator) for m in memberships]
+
+    assert result.shape == (8,)
+    assert result == pytest.approx(expected)
+    assert result[2] == pytest.approx(5.0)
+
+
+def test_compiled_modifiers() -> None:
+    """Chains of power hedges are equivalent to applying each hedge."""
+
+    x = np.linspace(0, 1, 11)
+
+    assert apply_modifiers(x, ["very", "extremely"]) == pytest.approx(x ** 6)
+    assert apply_modifiers(x, ["not", "very", "somewhat"]) == pytest.approx(
+        1 - x ** (2 / 3)
+    )
+    assert apply_modifiers(x, ["Plus", "intensify", "more_or_less"]) == pytest.approx(
+        plus(intensify(more_or_less(x)))
+    )
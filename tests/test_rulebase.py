@@ -0,0 +1,334 @@
+"""Tests for rule bases"""
+
+import numpy as np
+import pytest
+
+from fuzzy_expert.backend import OPERATORS
+from fuzzy_expert.inference import DecompositionalInference
+from fuzzy_expert.rule import FuzzyRule
+from fuzzy_expert.rulebase import (
+    AND,
+    FIRST,
+    NONE,
+    OPERATOR,
+    OR,
+    GridRuleBase,
+    IndexedRuleBase,
+    RuleBase,
+)
+from fuzzy_expert.variable import FuzzyVariable
+
+
+def make_system():
+    """Small system with hedges and mixed connectives."""
+
+    variables = {
+        "x": FuzzyVariable(
+            universe_range=(0, 10),
+            terms={"Low": [(0, 1), (6, 0)], "High": [(4, 0), (10, 1)]},
+        ),
+        "y": FuzzyVariable(
+            universe_range=(0, 10),
+            terms={"Low": [(0, 1), (6, 0)], "High": [(4, 0), (10, 1)]},
+        ),
+        "z": FuzzyVariable(
+            universe_range=(0, 10),
+            terms={"Low": [(0, 1), (6, 0)], "High": [(4, 0), (10, 1)]},
+        ),
+    }
+    rules = [
+        FuzzyRule(
+            premise=[("x", "Low"), ("AND", "y", "very", "High")],
+            consequence=[("z", "High")],
+            cf=0.9,
+        ),
+        FuzzyRule(
+            premise=[("x", "High"), ("OR", "y", "Low"), ("AND", "x", "not", "Low")],
+            consequence=[("z", "Low")],
+            cf=0.6,
+        ),
+        FuzzyRule(premise=[("y", "High")], consequence=[("z", "High")]),
+    ]
+    return variables, rules
+
+
+def test_rulebase_coding() -> None:
+    """Rules are coded as integer arrays."""
+
+    variables, rules = make_system()
+    rulebase = RuleBase(rules, variables)
+
+    assert rulebase.variable_names == ["x", "y", "z"]
+    assert rulebase.hedge_chains == [(), ("very",), ("not",)]
+    assert rulebase.connectives.tolist() == [
+        [FIRST, AND, NONE],
+        [FIRST, OR, AND],
+        [FIRST, NONE, NONE],
+    ]
+    assert rulebase.premise_variables.tolist() == [[0, 1, -1], [0, 1, 0], [1, -1, -1]]
+    assert rulebase.premise_terms.tolist() == [[0, 1, -1], [1, 0, 0], [1, -1, -1]]
+    assert rulebase.premise_hedges.tolist() == [[0, 1, -1], [0, 0, 2], [0, -1, -1]]
+    assert rulebase.consequence_terms.tolist() == [[1], [0], [1]]
+    assert len(rulebase.propositions) == 6
+    assert rulebase.cf.tolist() == [0.9, 0.6, 1.0]
+
+
+def test_rulebase_cf_and_degrees() -> None:
+    """Vectorized CF and firing degrees match the rule by rule computation."""
+
+    variables, rules = make_system()
+    rulebase = RuleBase(rules, variables)
+
+    fact_cf = {"x": np.array([0.5, 1.0]), "y": np.array([0.8, 0.3])}
+    result = rulebase.infered_cf(fact_cf)
+    assert np.allclose(result, [[0.45, 0.27], [0.3, 0.6], [0.8, 0.3]])
+
+    x, y = np.array([2.0, 5.5]), np.array([7.5, 1.0])
+    degrees = rulebase.firing_degrees("min", "max", x=x, y=y)
+
+    def low(v):
+        return np.interp(v, [0, 6], [1, 0])
+
+    def high(v):
+        return np.interp(v, [4, 10], [0, 1])
+
+    expected = [
+        np.minimum(low(x), high(y) ** 2),
+        np.minimum(np.maximum(high(x), low(y)), 1 - low(x)),
+        high(y),
+    ]
+    assert np.allclose(degrees, expected)
+
+
+def test_rulebase_operator_connectives() -> None:
+    """Connectives given as operator names are coded and applied."""
+
+    variables, rules = make_system()
+    rules[0].premise = [("x", "Low"), ("prod", "y", "very", "High")]
+    rulebase = RuleBase(rules, variables)
+    assert rulebase.connectives[0, 1] == OPERATOR + list(OPERATORS.keys()).index(
+        "prod"
+    )
+
+    x, y = np.array([2.0, 5.5]), np.array([7.5, 1.0])
+    degrees = rulebase.firing_degrees("min", "max", x=x, y=y)
+    low = np.interp(x, [0, 6], [1, 0])
+    high = np.interp(y, [4, 10], [0, 1])
+    assert np.allclose(degrees[0], low * high ** 2)
+
+    model = DecompositionalInference(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+    expected = model(variables, rules, x=(3.3, 0.7), y=(6.1, 0.9))
+    assert model(variables, rulebase, x=(3.3, 0.7), y=(6.1, 0.9)) == expected
+
+    rules[0].premise = [("x", "Low"), ("XOR", "y", "High")]
+    with pytest.raises(ValueError):
+        RuleBase(rules, variables)
+
+
+def test_engine_with_rulebase() -> None:
+    """The engine gives the same results for a list of rules and a rule base."""
+
+    model = DecompositionalInference(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+
+    variables, rules = make_system()
+    expected = model(variables, rules, x=(3.3, 0.7), y=(6.1, 0.9))
+
+    variables, rules = make_system()
+    result = model(variables, RuleBase(rules, variables), x=(3.3, 0.7), y=(6.1, 0.9))
+
+    assert result == expected
+
+
+def make_grid_system():
+    """System with triangular partitions and a complete grid of rules."""
+
+    partition = {
+        "Low": [(0, 1), (5, 0)],
+        "Medium": [(0, 0), (5, 1), (10, 0)],
+        "High": [(5, 0), (10, 1)],
+    }
+    variables = {
+        name: FuzzyVariable(universe_range=(0, 10), terms=partition)
+        for name in ("x", "y", "z")
+    }
+    terms = list(partition.keys())
+    rules = [
+        FuzzyRule(
+            premise=[("x", tx), ("AND", "y", ty)],
+            consequence=[("z", terms[min(2, (i + j) // 2)])],
+        )
+        for i, tx in enumerate(terms)
+        for j, ty in enumerate(terms)
+    ]
+    return variables, rules
+
+
+def test_grid_rulebase() -> None:
+    """The grid rule base evaluates only the active cells with the same results."""
+
+    model = DecompositionalInference(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+
+    variables, rules = make_grid_system()
+    rulebase = GridRuleBase(rules, variables)
+    assert rulebase.candidates({"x": 0.0, "y": 10.0}).tolist() == [2, 5]
+    assert rulebase.candidates({"x": 5.0, "y": 5.0}).tolist() == [4, 5, 7, 8]
+    assert len(rulebase.candidates({"x": [(0, 1), (5, 0)], "y": 5.0})) == 9
+
+    for x, y in [(1.2, 3.4), (5.0, 9.9), (7.7, 0.0)]:
+        variables, rules = make_grid_system()
+        expected = model(variables, rules, x=x, y=y)
+        variables, rules = make_grid_system()
+        result = model(variables, GridRuleBase(rules, variables), x=x, y=y)
+        assert model.diagnostics["candidate_rules"] <= 4
+        assert result[1] == expected[1]
+        assert np.isclose(result[0]["z"], expected[0]["z"])
+
+
+def test_grid_rulebase_operators() -> None:
+    """Rules are skipped only when the operators ignore rules that cannot fire."""
+
+    kwargs = dict(
+        and_operator="min",
+        or_operator="max",
+        composition_operator="max-min",
+        defuzzification_operator="cog",
+    )
+
+    for implication_operator, production_link, n_candidates in [
+        ("Rc", "max", 4),
+        ("Rm", "max", 9),
+        ("Rc", "min", 9),
+    ]:
+        model = DecompositionalInference(
+            implication_operator=implication_operator,
+            production_link=production_link,
+            **kwargs,
+        )
+        for x, y in [(1.2, 3.4), ((5.0, 0.6), (9.9, 0.8))]:
+            variables, rules = make_grid_system()
+            for i_rule, rule in enumerate(rules):
+                rule.rule_cf = 1 - i_rule / 10
+            expected = model(variables, rules, x=x, y=y)
+            variables, rules = make_grid_system()
+            for i_rule, rule in enumerate(rules):
+                rule.rule_cf = 1 - i_rule / 10
+            result = model(variables, GridRuleBase(rules, variables), x=x, y=y)
+            assert model.diagnostics["candidate_rules"] <= n_candidates
+            assert np.isclose(result[1], expected[1])
+            assert np.isclose(result[0]["z"], expected[0]["z"])
+
+
+def test_grid_rulebase_validation() -> None:
+    """Rule bases that are not grids are rejected."""
+
+    variables, rules = make_system()
+    with pytest.raises(ValueError):
+        GridRuleBase(rules, variables)
+
+
+def test_indexed_rulebase() -> None:
+    """The index retrieves every rule with a positive firing degree."""
+
+    variables, _ = make_grid_system()
+    terms = ["Low", "Medium", "High"]
+    hedges = [[], ["very"], ["somewhat"]]
+    rng = np.random.default_rng(0)
+    rules = [
+        FuzzyRule(
+            premise=[
+                ("x", *hedges[rng.integers(3)], terms[rng.integers(3)]),
+                ("AND", "y", *hedges[rng.integers(3)], terms[rng.integers(3)]),
+            ],
+            consequence=[("z", terms[rng.integers(3)])],
+        )
+        for _ in range(200)
+    ]
+    rules.append(
+        FuzzyRule(
+            premise=[("x", "Low"), ("OR", "y", "High")],
+            consequence=[("z", "Low")],
+        )
+    )
+    rulebase = IndexedRuleBase(rules, variables)
+
+    for x, y in [(0.0, 0.0), (2.5, 5.0), (5.0, 7.3), (9.9, 10.0), (12.0, -1.0)]:
+        degrees = rulebase.firing_degrees("min", "max", x=x, y=y)
+        candidates = rulebase.candidates({"x": x, "y": y})
+        assert set(np.nonzero(degrees > 0)[0]) <= set(candidates)
+        assert len(rules) - 1 in candidates
+
+    model = DecompositionalInference(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+    variables, _ = make_grid_system()
+    expected = model(variables, rules[:40], x=2.5, y=6.2)
+    variables, _ = make_grid_system()
+    result = model(variables, IndexedRuleBase(rules[:40], variables), x=2.5, y=6.2)
+    assert model.diagnostics["candidate_rules"] < 40
+    assert np.isclose(result[0]["z"], expected[0]["z"])
+
+    model.implication_operator = "Rb"
+    variables, _ = make_grid_system()
+    expected = model(variables, rules[:40], x=2.5, y=6.2)
+    variables, _ = make_grid_system()
+    result = model(variables, IndexedRuleBase(rules[:40], variables), x=2.5, y=6.2)
+    assert model.diagnostics["candidate_rules"] == 40
+    assert np.isclose(result[0]["z"], expected[0]["z"])
+
+
+def test_engine_compute_cf() -> None:
+    """Certainty factors are computed without the membership pipeline."""
+
+    model = DecompositionalInference(
+        and_operator="min",
+        or_operator="max",
+        implication_operator="Rc",
+        composition_operator="max-min",
+        production_link="max",
+        defuzzification_operator="cog",
+    )
+
+    variables, rules = make_system()
+    _, expected = model(variables, rules, x=(3.3, 0.7), y=(6.1, 0.9))
+
+    variables, rules = make_system()
+    rule_cf, infered_cf = model.compute_cf(variables, rules, x=(3.3, 0.7), y=(6.1, 0.9))
+    assert infered_cf == expected
+    assert np.allclose(rule_cf, [0.63, 0.42, 0.9])
+    assert not hasattr(rules[0], "modified_premise_memberships")
+
+    rule_cf, infered_cf = model.compute_cf(
+        variables,
+        RuleBase(rules, variables),
+        x=(np.zeros(3), np.array([0.2, 0.5, 1.0])),
+        y=4.0,
+    )
+    assert rule_cf.shape == (3, 3)
+    assert np.allclose(infered_cf, [1.0, 1.0, 1.0])
+    assert np.allclose(rule_cf[0], [0.18, 0.45, 0.9])
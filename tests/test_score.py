@@ -0,0 +1,94 @@
+"""Tests for the batch scoring pipeline"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fuzzy_expert.score import load_model, main, read_chunks, score_file
+
+MODEL = '''
+from fuzzy_expert.inference import DecompositionalInference
+from fuzzy_expert.rule import FuzzyRule
+from fuzzy_expert.variable import FuzzyVariable
+
+terms = {"Low": [(0, 1), (6, 0)], "High": [(4, 0), (10, 1)]}
+variables = {
+    name: FuzzyVariable(universe_range=(0, 10), terms=terms)
+    for name in ("x", "y", "z")
+}
+rules = [
+    FuzzyRule(premise=[("x", "Low"), ("AND", "y", "Low")], consequence=[("z", "High")]),
+    FuzzyRule(premise=[("x", "High"), ("OR", "y", "High")], consequence=[("z", "Low")]),
+]
+model = DecompositionalInference(
+    and_operator="min",
+    or_operator="max",
+    implication_operator="Rc",
+    composition_operator="max-min",
+    production_link="max",
+    defuzzification_operator="cog",
+)
+'''
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    path = tmp_path / "model.py"
+    path.write_text(MODEL)
+    return str(path)
+
+
+def test_score_file(tmp_path, model_path) -> None:
+    """Files are scored in chunks, in the order of the rows."""
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "x": rng.uniform(0, 10, 250),
+            "y": rng.uniform(0, 10, 250),
+            "y_cf": rng.uniform(0.5, 1, 250),
+            "other": 0,
+        }
+    )
+    df.to_csv(tmp_path / "input.csv", index=False)
+
+    variables, rules, model = load_model(model_path)
+    expected = model.predict(df, variables, rules, cf_columns={"y": "y_cf"})
+
+    for workers in (0, 2):
+        output = str(tmp_path / "output_{}.csv".format(workers))
+        stats = score_file(
+            str(tmp_path / "input.csv"),
+            output,
+            model_path,
+            chunk_size=64,
+            workers=workers,
+            cf_columns={"y": "y_cf"},
+        )
+        assert stats["rows"] == 250
+        assert stats["rows_per_sec"] > 0
+        result = pd.read_csv(output)
+        assert list(result.columns) == ["z", "cf"]
+        assert np.allclose(result["z"], expected["z"])
+        assert np.allclose(result["cf"], expected["cf"])
+
+    np.save(tmp_path / "input.npy", df[["x", "y"]].to_numpy())
+    chunks = list(read_chunks(str(tmp_path / "input.npy"), 100, names=["x", "y"]))
+    assert [len(chunk["x"]) for chunk in chunks] == [100, 100, 50]
+
+    main(
+        [
+            str(tmp_path / "input.npy"),
+            str(tmp_path / "output.csv"),
+            "--model",
+            model_path,
+            "--workers",
+            "0",
+            "--names",
+            "x",
+            "y",
+        ]
+    )
+    result = pd.read_csv(tmp_path / "output.csv")
+    expected = model.predict(df, variables, rules)
+    assert np.allclose(result["z"], expected["z"])
@@ -0,0 +1,131 @@
+"""Tests for the scoring server"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from fuzzy_expert.score import load_model
+from fuzzy_expert.server import ScoringServer
+from tests.test_score import MODEL
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"))
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_scoring_server(tmp_path, executor) -> None:
+    """Concurrent requests are scored in batches."""
+
+    model_path = str(tmp_path / "model.py")
+    (tmp_path / "model.py").write_text(MODEL)
+    variables, rules, model = load_model(model_path)
+
+    server = ScoringServer(
+        model_path, port=0, max_wait=0.05, workers=2, executor=executor
+    )
+    server.start()
+    url = "http://{}:{}".format(*server.server_address[:2])
+
+    try:
+        x = np.linspace(0, 10, 20)
+        y = np.linspace(10, 0, 20)
+        expected, expected_cf = model.evaluate_batch(variables, rules, x=x, y=(y, 0.5))
+
+        results = [None] * len(x)
+
+        def score(i):
+            results[i] = post(url + "/score", {"x": x[i], "y": [y[i], 0.5]})
+
+        threads = [threading.Thread(target=score, args=(i,)) for i in range(len(x))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert np.allclose([result["z"] for result in results], expected["z"])
+        assert np.allclose([result["cf"] for result in results], expected_cf)
+
+        records = [{"x": 1.0, "y": 2.0}, {"x": 8.0, "y": 3.0}]
+        assert len(post(url + "/score", records)) == 2
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(url + "/score", {"x": 1.0})
+        assert error.value.code == 400
+
+        with urllib.request.urlopen(url + "/metrics") as response:
+            metrics = response.read().decode("utf-8")
+        assert "fuzzy_expert_requests_total 22" in metrics
+        assert "fuzzy_expert_errors_total 1" in metrics
+        assert "fuzzy_expert_rows_total 22" in metrics
+        batches = int(metrics.split("\nfuzzy_expert_batches_total ")[1].split()[0])
+        assert batches < 21
+        assert 'fuzzy_expert_request_latency_seconds_bucket{le="+Inf"} 22' in metrics
+
+    finally:
+        server.shutdown()
+
+
+def test_scoring_server_burst(tmp_path) -> None:
+    """Bursts of clients beyond the default listen backlog are accepted."""
+
+    (tmp_path / "model.py").write_text(MODEL)
+    server = ScoringServer(str(tmp_path / "model.py"), port=0, max_wait=0.01)
+    assert server.httpd.request_queue_size == 1024
+    server.start()
+    url = "http://{}:{}".format(*server.server_address[:2])
+
+    try:
+        results = [None] * 200
+
+        def score(i):
+            results[i] = post(url + "/score", {"x": i / 20, "y": 5.0})
+
+        threads = [threading.Thread(target=score, args=(i,)) for i in range(200)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(result is not None for result in results)
+
+    finally:
+        server.shutdown()
+
+
+def test_scoring_server_lifecycle(tmp_path) -> None:
+    """Servers shut down without serving, and bind failures leave no threads."""
+
+    (tmp_path / "model.py").write_text(MODEL)
+    model_path = str(tmp_path / "model.py")
+
+    server = ScoringServer(model_path, port=0)
+    future = server.submit({"x": 1.0, "y": 2.0})
+    stopper = threading.Thread(target=server.shutdown, daemon=True)
+    stopper.start()
+    stopper.join(timeout=10)
+    assert not stopper.is_alive()
+    assert future.result(timeout=10)[0]["z"] > 0
+
+    server = ScoringServer(model_path, port=0)
+    n_threads = threading.active_count()
+    with pytest.raises(OSError):
+        ScoringServer(model_path, port=server.server_address[1])
+    assert threading.active_count() == n_threads
+
+    server.start()
+    url = "http://{}:{}".format(*server.server_address[:2])
+    try:
+        with pytest.raises(ValueError):
+            server.parse_records({"x": [3.0, 1.5], "y": 2.0})
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(url + "/score", {"x": [3.0, 1.5], "y": 2.0})
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
@@ -57,6 +57,17 @@ def test_set_term_from_list() -> None:
     assert (fuzzyvar.terms["A"] == np.linspace(start=0, stop=1, num=3)).all()
 
 
+def test_set_term_after_replacing_universe() -> None:
+    """Terms of a variable without terms take the width of a replaced universe"""
+
+    fuzzyvar: FuzzyVariable = FuzzyVariable(universe_range=(0, 1), step=0.5)
+    fuzzyvar.universe = np.array([0, 0.25, 0.5, 0.75, 1])
+
+    fuzzyvar.terms["A"] = np.linspace(start=0, stop=1, num=5)
+
+    assert fuzzyvar.memberships.shape == (1, 5)
+
+
 def test_set_term_from_tuple() -> None:
     """Check term addition speecified as a list"""
 
@@ -75,3 +86,166 @@ def test_set_term_from_tuple() -> None:
 
     assert list(fuzzyvar.terms.keys()) == [term]
     assert (fuzzyvar.terms["A"] == [0, 1, 0]).all()
+
+
+def test_set_term_from_analytic_tuple() -> None:
+    """Check term addition specified by an analytic formula"""
+
+    fuzzyvar: FuzzyVariable = FuzzyVariable(
+        universe_range=(0, 10), step=0.5, analytic_mf=True
+    )
+
+    fuzzyvar["A"] = ("gaussmf", 5.2, 1)
+
+    assert len(fuzzyvar.universe) == 22
+    assert fuzzyvar.universe.max() == 10
+    assert (fuzzyvar.terms["A"] == np.exp(-((fuzzyvar.universe - 5.2) ** 2) / 2)).all()
+
+    fuzzyvar.add_points_to_universe(points=[7.3])
+    assert (fuzzyvar.terms["A"] == np.exp(-((fuzzyvar.universe - 5.2) ** 2) / 2)).all()
+
+
+def test_set_terms_in_bulk() -> None:
+    """Bulk registration matches adding the terms one by one."""
+
+    terms: dict = {
+        "T{}".format(i): [(i, 0), (i + 0.33, 1), (i + 1.17, 0)] for i in range(8)
+    }
+    terms["G"] = ("gaussmf", 4.1, 0.5)
+
+    fuzzyvar: FuzzyVariable = FuzzyVariable(universe_range=(0, 10), terms=terms)
+
+    other: FuzzyVariable = FuzzyVariable(universe_range=(0, 10))
+    for term, membership in terms.items():
+        other[term] = membership
+
+    assert list(fuzzyvar.terms.keys()) == list(terms.keys())
+    assert (fuzzyvar.universe == other.universe).all()
+    for term in terms.keys():
+        assert np.allclose(fuzzyvar[term], other[term])
+
+
+def test_fuzzificate() -> None:
+    """Crisp values are fuzzificated against all terms at once."""
+
+    fuzzyvar: FuzzyVariable = FuzzyVariable(
+        universe_range=(0, 10),
+        terms={
+            "Low": [(0, 1), (2.5, 0.4), (5, 0)],
+            "High": [(5, 0), (7.5, 0.6), (10, 1)],
+        },
+    )
+
+    values = np.array([0, 1.23, 5, 6.789, 10, 12])
+    result = fuzzyvar.fuzzificate(values)
+
+    assert result.shape == (6, 2)
+    for term in ["Low", "High"]:
+        expected = np.interp(values, fuzzyvar.universe, fuzzyvar[term])
+        assert np.allclose(result[:, fuzzyvar.term_index[term]], expected)
+
+    assert fuzzyvar.memberships.shape == (2, len(fuzzyvar.universe))
+    assert fuzzyvar.memberships.flags["C_CONTIGUOUS"]
+
+
+def test_modified_membership_cache() -> None:
+    """Modified memberships are cached until the term changes."""
+
+    fuzzyvar: FuzzyVariable = FuzzyVariable(
+        universe_range=(0, 1), terms={"A": [(0, 0), (1, 1)]}, step=0.25
+    )
+
+    result = fuzzyvar.get_modified_membeship("A", ["very", "extremely"])
+    assert np.allclose(result, fuzzyvar["A"] ** 6)
+    assert fuzzyvar.get_modified_membeship("A", ["very", "extremely"]) is result
+
+    fuzzyvar["A"] = [(0, 1), (1, 0)]
+    result = fuzzyvar.get_modified_membeship("A", ["very", "extremely"])
+    assert np.allclose(result, fuzzyvar["A"] ** 6)
+
+
+def test_mf_tol() -> None:
+    """Terms sampled with a tolerance add fewer points to the universe."""
+
+    fixed = FuzzyVariable(universe_range=(0, 10), terms={"A": ("gaussmf", 5, 1)})
+    adaptive = FuzzyVariable(
+        universe_range=(0, 10), terms={"A": ("gaussmf", 5, 1)}, mf_tol=0.05
+    )
+    assert len(adaptive.universe) < len(fixed.universe)
+    expected = np.exp(-((adaptive.universe - 5) ** 2) / 2)
+    assert np.allclose(adaptive["A"], expected, rtol=0, atol=0.05)
+    assert adaptive["A"][0] == adaptive["A"][-1] == 0
+
+    adaptive = FuzzyVariable(
+        universe_range=(0, 10), terms={"B": ("sigmf", 5, 2)}, mf_tol=0.05
+    )
+    expected = 1 / (1 + np.exp(-2 * (adaptive.universe - 5)))
+    assert np.allclose(adaptive["B"], expected, rtol=0, atol=0.05)
+    assert (adaptive["B"][0], adaptive["B"][-1]) == (0, 1)
+
+
+def test_interned() -> None:
+    """Interned variables share read-only arrays and copy them on write."""
+
+    terms = {"Low": [(0, 1), (4, 0)], "High": ("trimf", 3, 7, 10)}
+    a = FuzzyVariable(universe_range=(0, 10), terms=terms, interned=True)
+    b = FuzzyVariable(universe_range=(0, 10), terms=terms, interned=True)
+    c = FuzzyVariable(universe_range=(0, 10), terms=terms)
+
+    assert a.universe is b.universe
+    assert a.memberships is b.memberships
+    assert not a.memberships.flags.writeable
+    assert c.universe is not a.universe
+    assert a.get_modified_membeship("Low", ["very"]) is b.get_modified_membeship(
+        "Low", ["very"]
+    )
+
+    b["Low"] = [(0, 1), (5, 0)]
+    assert a.memberships is not b.memberships
+    assert np.array_equal(a["Low"], c["Low"])
+    assert not np.array_equal(b["Low"], c["Low"])
+
+    b.add_points_to_universe([2.55])
+    assert a.universe is not b.universe
+    assert len(b.universe) == len(a.universe) + 1
+
+    d = FuzzyVariable(
+        universe_range=(0, 10), terms={"Low": terms["Low"]}, interned=True
+    )
+    e = FuzzyVariable(
+        universe_range=(0, 10),
+        terms={"High": terms["High"], "Low": terms["Low"]},
+        interned=True,
+    )
+    assert d["Low"] is a["Low"] and e["Low"] is a["Low"] and e["High"] is a["High"]
+    assert np.shares_memory(d["Low"], a.memberships)
+    assert d.get_modified_membeship("Low", ["very"]) is a.get_modified_membeship(
+        "Low", ["very"]
+    )
+
+    del e.terms["High"]
+    assert e["Low"] is a["Low"]
+
+
+def test_get_modified_membership_at() -> None:
+    """Modified memberships at crisp values match the values added to the universe."""
+
+    terms = {
+        "A": [(1, 0), (3.33, 0.6), (6, 0)],
+        "B": ("gaussmf", 5, 2),
+    }
+    chains = [["very"], ["norm"], ["slightly"], ["very", "norm"], ["slightly", "not"]]
+
+    for value in [2.71, 3.33, 3.5, 5.05, 7.9]:
+
+        variable = FuzzyVariable(universe_range=(0, 10), terms=terms, step=0.5)
+        expected = FuzzyVariable(universe_range=(0, 10), terms=terms, step=0.5)
+        expected.add_points_to_universe([value])
+        i_value = np.searchsorted(expected.universe, value)
+
+        for term in terms.keys():
+            for modifiers in chains:
+                assert np.isclose(
+                    variable.get_modified_membership_at(term, value, modifiers),
+                    expected.get_modified_membeship(term, modifiers)[i_value],
+                )